@@ -1,58 +1,176 @@
+import heapq
 import random
-from kivy.uix.image import Image
-from kivy.animation import Animation
-from kivy.core.window import Window
+from kivy.clock import Clock
+from kivy.core.image import Image as CoreImage
+from kivy.graphics import Color, Mesh, PopMatrix, PushMatrix, Translate
+from kivy.uix.widget import Widget
 
-class Cloud(Image):
-    def __init__(self, size_factor=None, speed=None, **kwargs):
+# Parallax depth layers, far to near: size factors that go in the layer,
+# drift speed (px/s) and opacity. Smaller clouds look more distant, so they
+# are fainter and slower.
+CLOUD_LAYERS = [
+    {"max_size": 0.83, "speed": 18, "opacity": 0.83},
+    {"max_size": 1.17, "speed": 25, "opacity": 1.0},
+    {"max_size": None, "speed": 32, "opacity": 1.0},
+]
+
+# Floats per cloud in a layer's mesh: 4 corners of x, y, u, v
+QUAD = 16
+
+
+class CloudDepthLayer:
+    """
+    All clouds of one depth layer: a single Mesh of textured quads.
+
+    Every cloud in the layer drifts at the layer's speed, so the quads never
+    move inside the mesh; the whole layer is shifted by one Translate
+    ('offset'). A cloud's vertices are only rewritten when it wraps around
+    from the right edge back to the left. The heap keeps the rightmost
+    cloud on top, so finding the clouds to wrap costs nothing per frame.
+    """
+
+    def __init__(self, canvas, texture, speed, opacity):
+        self.texture = texture
+        self.speed = speed
+        self.offset = 0.0
+        # x where clouds enter (the left edge of the screen)
+        self.left = 0
+        # Per cloud (by slot): left edge in layer space, width, height
+        self.xs = []
+        self.widths = []
+        self.heights = []
+        self.vertices = []
+        self.indices = []
+        # (-left edge, slot): the rightmost cloud comes out first
+        self._heap = []
+
+        canvas.add(PushMatrix())
+        canvas.add(Color(1, 1, 1, opacity))
+        self.translate = Translate(0, 0)
+        canvas.add(self.translate)
+        self.mesh = Mesh(mode="triangles", texture=texture, fmt=[(b"vPosition", 2, "float"), (b"vTexCoords0", 2, "float")])
+        canvas.add(self.mesh)
+        canvas.add(PopMatrix())
+
+    def __len__(self):
+        return len(self.xs)
+
+    def add(self, width, height, y, left):
+        """New cloud just left of the visible area."""
+        self.left = left
+        slot = len(self.xs)
+        self.xs.append(0.0)
+        self.widths.append(width)
+        self.heights.append(height)
+        self.vertices.extend([0.0] * QUAD)
+        base = slot * 4
+        self.indices.extend((base, base + 1, base + 2, base + 2, base + 3, base))
+        self._place(slot, y)
+        self.mesh.indices = self.indices
+        self.mesh.vertices = self.vertices
+
+    def step(self, dt, left, right, y_range):
+        """Drift by dt seconds; wrap clouds that went past 'right' to 'left'."""
+        self.left = left
+        self.offset += self.speed * dt
+        heap = self._heap
+        moved = False
+        while heap and -heap[0][0] + self.offset >= right:
+            slot = heapq.heappop(heap)[1]
+            self._place(slot, random.randint(*y_range))
+            moved = True
+
+        # Keep the numbers small (float32 on the GPU): shift layer space
+        # so the translation is zero again
+        if self.offset > 100000:
+            self._rebase()
+            moved = True
+
+        self.translate.x = self.offset
+        if moved:
+            self.mesh.vertices = self.vertices
+
+    def _place(self, slot, y):
+        # Left edge one cloud width left of the screen (in layer space)
+        width, height = self.widths[slot], self.heights[slot]
+        x = self.left - self.offset - width
+        # 'y' is the bottom of the cloud's 100 x 60 box; the texture is
+        # centred in it
+        y += (width * 0.6 - height) / 2
+        self.xs[slot] = x
+        heapq.heappush(self._heap, (-x, slot))
+
+        u0, v0, u1, v1, u2, v2, u3, v3 = self.texture.tex_coords
+        self.vertices[slot * QUAD:(slot + 1) * QUAD] = [
+            x, y, u0, v0,
+            x + width, y, u1, v1,
+            x + width, y + height, u2, v2,
+            x, y + height, u3, v3,
+        ]
+
+    def _rebase(self):
+        offset = self.offset
+        self.offset = 0.0
+        self.xs = [x + offset for x in self.xs]
+        self._heap = [(-x, slot) for slot, x in enumerate(self.xs)]
+        heapq.heapify(self._heap)
+        vertices = self.vertices
+        for i in range(0, len(vertices), 4):
+            vertices[i] += offset
+
+
+class CloudLayer(Widget):
+    """
+    Every cloud on screen, drawn with one Mesh per depth layer (so a
+    handful of draw calls however many clouds there are) and moved by one
+    per-frame update instead of an Animation per cloud.
+    """
+
+    def __init__(self, source, **kwargs):
         super().__init__(**kwargs)
+        self.texture = CoreImage(source).texture
+        self.layers = [
+            CloudDepthLayer(self.canvas, self.texture, layer["speed"], layer["opacity"])
+            for layer in CLOUD_LAYERS
+        ]
+        self._event = Clock.schedule_interval(self.update, 0)
+
+    @property
+    def count(self):
+        """Number of clouds"""
+        return sum(len(layer) for layer in self.layers)
+
+    def add_cloud(self, size_factor=None, y=None):
+        """
+        Add a cloud entering from the left. Its size factor (0.5 - 1.5 by
+        default) picks the depth layer.
+        """
+        size_factor = size_factor if size_factor is not None else random.uniform(0.5, 1.5)
+        # Cloud box is 100 x 60 scaled, the texture keeps its aspect ratio
+        width = 100 * size_factor
+        height = width * self.texture.height / self.texture.width
+        if y is None:
+            y = random.randint(*self._y_range())
+
+        for layer, config in zip(self.layers, CLOUD_LAYERS):
+            if config["max_size"] is None or size_factor <= config["max_size"]:
+                layer.add(width, height, y, self.x)
+                break
+
+    def update(self, dt):
+        y_range = self._y_range()
+        for layer in self.layers:
+            layer.step(dt, self.x, self.right, y_range)
+
+    def stop(self):
+        self._event.cancel()
+
+    def _y_range(self):
+        # Wrapped clouds come back somewhere in the top half of the screen
+        top_position = int(self.top - 20)
+        bottom_position = int(self.y + self.height // 2)  # Middle of screen
 
-        # Randomize cloud size for more natural look
-        self.size_factor = size_factor if size_factor is not None else random.uniform(0.5, 1.5)
-        
-        # Apply size factor to cloud dimensions
-        base_width, base_height = 100, 60
-        self.size = (base_width * self.size_factor, base_height * self.size_factor)
-        
-        # Adjust opacity based on size (smaller clouds appear more distant)
-        self.opacity = 0.5 + (0.5 * self.size_factor)
-        
-        # Store the speed parameter (using a slower default range)
-        self.speed = speed if speed is not None else random.uniform(15, 35)
-
-        # Start the cloud animation
-        self.animate_cloud()
-
-    def animate_cloud(self):
-        # Calculate duration based on speed (slower speed = longer duration)
-        duration = Window.width / self.speed
-        
-        # Create animation to move cloud across screen
-        anim = Animation(x=Window.width, duration=duration)
-        anim.bind(on_complete=lambda *args: self.reset_and_animate())
-        anim.start(self)
-
-    def reset_and_animate(self):
-        # Reset the cloud's position to start again from the left
-        # Position vertically in the top portion of the screen
-        
-        # Calculate vertical positioning range (top third of screen)
-        # Convert to integers for randint
-        top_position = int(Window.height - 20)
-        bottom_position = int(Window.height // 2)  # Middle of screen
-        
         # Make sure bottom_position is less than top_position
         if bottom_position >= top_position:
             bottom_position = top_position - 50
-            
-        # Set random Y position
-        self.y = random.randint(bottom_position, top_position)
-        
-        # Reset X position to left of screen
-        self.x = -self.width
-        
-        # Randomize speed for next pass
-        self.speed = random.uniform(15, 35)
-        
-        # Start animation again
-        self.animate_cloud()
\ No newline at end of file
+        return bottom_position, top_position
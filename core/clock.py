@@ -0,0 +1,136 @@
+"""
+clock.py
+
+Injectable clock. PomodoroWidget, StudyData and the tree growth timer
+schedule callbacks and read the time through a clock object instead of
+using kivy's Clock and the time module directly:
+
+  - KivyClock: the real thing (default), a thin wrapper around kivy's Clock
+  - VirtualClock: simulated time for headless runs; advance() jumps from
+    one scheduled callback to the next, so hours pass in milliseconds
+
+Components take a 'clock' argument; get_clock() returns the default.
+"""
+
+import heapq
+import itertools
+import time
+
+from kivy.clock import Clock
+
+
+class KivyClock:
+    """Real time on kivy's Clock."""
+
+    def schedule_once(self, callback, timeout=0):
+        return Clock.schedule_once(callback, timeout)
+
+    def schedule_interval(self, callback, interval):
+        return Clock.schedule_interval(callback, interval)
+
+    def unschedule(self, callback):
+        Clock.unschedule(callback)
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def time(self):
+        return time.time()
+
+
+class VirtualEvent:
+    """Handle returned by VirtualClock.schedule_*; cancel() like kivy's."""
+    __slots__ = ("callback", "interval", "last", "cancelled")
+
+    def __init__(self, callback, interval, last):
+        self.callback = callback
+        self.interval = interval
+        self.last = last
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class VirtualClock:
+    """
+    Simulated clock with the same interface as KivyClock. Nothing happens
+    until advance() / run_until() is called; callbacks then run in time
+    order with 'now' set to their due time, and get the usual dt.
+    """
+
+    def __init__(self, start=0.0, wall_start=None):
+        self.now = start
+        # time() = now + offset, so timestamps still look like real dates
+        self._wall_offset = (time.time() if wall_start is None else wall_start) - start
+        self._queue = []
+        self._order = itertools.count()
+        self.callbacks_run = 0
+
+    def schedule_once(self, callback, timeout=0):
+        return self._push(callback, max(timeout, 0), None)
+
+    def schedule_interval(self, callback, interval):
+        return self._push(callback, interval, interval)
+
+    def unschedule(self, callback):
+        for _, _, event in self._queue:
+            if event.callback == callback:
+                event.cancelled = True
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now + self._wall_offset
+
+    def advance(self, seconds):
+        """Let 'seconds' of simulated time pass."""
+        end = self.now + seconds
+        self.run_until(lambda: False, end)
+        self.now = end
+
+    def run_until(self, predicate, end):
+        """
+        Run callbacks until predicate() is true (checked after each one) or
+        the next callback is due after 'end'. Returns predicate().
+        """
+        while self._queue and not predicate():
+            due, _, event = self._queue[0]
+            if due > end:
+                break
+            heapq.heappop(self._queue)
+            if event.cancelled:
+                continue
+            self.now = due
+            dt = due - event.last
+            event.last = due
+            if event.interval is not None:
+                # Next run relative to the due time, so intervals never drift
+                heapq.heappush(self._queue, (due + event.interval, next(self._order), event))
+            self.callbacks_run += 1
+            if event.callback(dt) is False and event.interval is not None:
+                event.cancelled = True  # kivy stops an interval returning False
+        return predicate()
+
+    def _push(self, callback, delay, interval):
+        event = VirtualEvent(callback, interval, self.now)
+        heapq.heappush(self._queue, (self.now + delay, next(self._order), event))
+        return event
+
+
+_default_clock = None
+
+
+def get_clock():
+    """The clock components use when none is passed in."""
+    global _default_clock
+    if _default_clock is None:
+        _default_clock = KivyClock()
+    return _default_clock
+
+
+def set_clock(clock):
+    """Replace the default clock (e.g. with a VirtualClock for a simulation)."""
+    global _default_clock
+    _default_clock = clock
@@ -0,0 +1,258 @@
+"""
+data_file_watch.py
+
+Helpers for sharing evergreen_data.json between several processes (two app
+instances, an exporter run from cron, ...):
+
+  - FileLock: advisory lock held around every write and read of the file
+  - DataFileWatcher: background thread that notices external changes
+    (inotify on Linux, mtime polling elsewhere), parses the new contents
+    off the UI thread and hands them to a callback; call() runs other
+    file work on that thread too, for a caller that has to wait for it
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # everywhere else
+    msvcrt = None
+
+# inotify(7) event bits we care about
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+_EVENT = struct.Struct("iIII")
+
+
+class FileLock:
+    """
+    Advisory inter-process lock on 'path + .lock'. Use as a context manager;
+    shared=True takes a read lock. A no-op where no locking API exists.
+    """
+
+    def __init__(self, path, shared=False):
+        self.lock_path = path + ".lock"
+        self.shared = shared
+        self._handle = None
+
+    def __enter__(self):
+        self._handle = open(self.lock_path, "a+")
+        if fcntl is not None:
+            fcntl.flock(self._handle.fileno(), fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            # msvcrt has no shared locks; readers take the exclusive one too
+            self._handle.seek(0)
+            msvcrt.locking(self._handle.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                self._handle.seek(0)
+                msvcrt.locking(self._handle.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._handle.close()
+            self._handle = None
+
+
+def file_signature(path):
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class DataFileWatcher:
+    """
+    Watches one JSON file for changes made by other processes.
+
+    'known' is the signature of the last version this process wrote or
+    merged; anything else showing up on disk is an external change. The
+    watcher parses it on its own thread and calls on_change(data, signature).
+    """
+
+    def __init__(self, path, on_change, poll_interval=1.0):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.known = file_signature(self.path)
+        # Last signature handed to on_change, so a version still waiting to
+        # be merged is not parsed and reported again
+        self._reported = None
+        self.mode = "polling"
+
+        self._stop = threading.Event()
+        # Work handed to the watcher thread by call()
+        self._calls = queue.Queue()
+        # Wakes the thread early: an event while polling, a pipe it
+        # selects on next to inotify
+        self._wake = threading.Event()
+        self._wake_pipe = None
+        if sys.platform.startswith("linux"):
+            self._wake_pipe = os.pipe()
+            # Wake-ups nobody reads (while polling) must never block
+            os.set_blocking(self._wake_pipe[1], False)
+        self._thread = threading.Thread(target=self._run, name="DataFileWatcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake_up()
+
+    def call(self, fn, timeout=None):
+        """
+        Run fn() on the watcher thread and wait for its result, so file
+        I/O stays off the calling (UI) thread. Returns None if the timeout
+        expired first or the watcher is not running.
+        """
+        if not self._thread.is_alive() or self._stop.is_set():
+            return None
+        done = threading.Event()
+        result = []
+        self._calls.put((fn, result, done))
+        self._wake_up()
+        if not done.wait(timeout):
+            return None
+        return result[0] if result else None
+
+    def mark_known(self, signature):
+        """Record a version this process wrote or merged itself."""
+        self.known = signature
+
+    def is_current(self):
+        """True if the file on disk is the last version we know about."""
+        return file_signature(self.path) == self.known
+
+    def _run(self):
+        inotify_fd = self._open_inotify()
+        if inotify_fd is not None:
+            self.mode = "inotify"
+        try:
+            while not self._stop.is_set():
+                if inotify_fd is not None:
+                    # Wakes up right away on a change; the stat in _check()
+                    # still runs on timeouts in case an event was missed
+                    changed = self._wait_inotify(inotify_fd)
+                else:
+                    self._wake.wait(self.poll_interval)
+                    self._wake.clear()
+                    changed = True
+                self._run_calls()
+                if changed and not self._stop.is_set():
+                    self._check()
+        finally:
+            self._run_calls()
+            if inotify_fd is not None:
+                os.close(inotify_fd)
+            pipe, self._wake_pipe = self._wake_pipe, None
+            if pipe is not None:
+                for fd in pipe:
+                    os.close(fd)
+
+    def _wake_up(self):
+        self._wake.set()
+        if self._wake_pipe is not None:
+            try:
+                os.write(self._wake_pipe[1], b"w")
+            except OSError:
+                pass  # closed: the thread is gone anyway
+
+    def _run_calls(self):
+        while True:
+            try:
+                fn, result, done = self._calls.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                result.append(fn())
+            except Exception as e:
+                print("Error in data file watcher:", e)
+            finally:
+                done.set()
+
+    def _check(self):
+        signature = file_signature(self.path)
+        if signature is None or signature in (self.known, self._reported):
+            return
+        try:
+            with FileLock(self.path, shared=True):
+                signature = file_signature(self.path)
+                # Our own save may have replaced the file while we waited
+                # for the lock; that version is already known
+                if signature is None or signature in (self.known, self._reported):
+                    return
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+        except Exception as e:
+            print("Error reading changed data file:", e)
+            # Don't retry a broken file forever; our next save replaces it
+            self.known = signature
+            return
+        self._reported = signature
+        self.on_change(data, signature)
+
+    def _open_inotify(self):
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+            if fd < 0:
+                return None
+            directory = os.path.dirname(self.path).encode()
+            # Watch the directory: saves replace the file via rename
+            if libc.inotify_add_watch(fd, directory, IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except Exception:
+            return None
+
+    def _wait_inotify(self, fd):
+        """
+        Wait for an event. False if all events were about other files (the
+        lock file among them) or it was only a wake-up; True for our file
+        or on timeout.
+        """
+        wake_fd = self._wake_pipe[0] if self._wake_pipe is not None else None
+        readable, _, _ = select.select([fd] + ([wake_fd] if wake_fd is not None else []),
+                                       [], [], self.poll_interval)
+        if not readable:
+            return True
+        if wake_fd in readable:
+            os.read(wake_fd, 4096)
+            if fd not in readable:
+                return False
+        try:
+            buf = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+
+        name = os.path.basename(self.path).encode()
+        offset = 0
+        touched = False
+        while offset + _EVENT.size <= len(buf):
+            _wd, _mask, _cookie, length = _EVENT.unpack_from(buf, offset)
+            event_name = buf[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            touched = touched or event_name == name
+            offset += _EVENT.size + length
+        return touched
@@ -0,0 +1,111 @@
+"""
+digit_display.py
+
+Timer digits drawn from a glyph atlas instead of a Label per character.
+
+GlyphAtlas renders "0123456789:" once, in one texture, and hands out a
+TextureRegion per character (same texture, different texture
+coordinates). DigitDisplay builds its cells once; showing a new time only
+swaps the texture region of the cells whose character changed, so the
+per-second update allocates no widgets and renders no text.
+"""
+
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Rectangle
+from kivy.metrics import dp, sp
+from kivy.uix.widget import Widget
+
+GLYPHS = "0123456789:"
+
+# (font name, font size) -> GlyphAtlas, shared by every display
+_atlases = {}
+
+
+class GlyphAtlas:
+    """
+    One texture holding every glyph in GLYPHS, rendered in white so the
+    same atlas can be tinted to any color.
+    """
+
+    def __init__(self, font_name="Munro", font_size=sp(24)):
+        label = CoreLabel(text=GLYPHS, font_name=font_name, font_size=font_size)
+        label.refresh()
+        self.texture = label.texture
+        self.glyph_height = self.texture.height
+
+        # x offset of each glyph from the width of the text before it
+        self.glyphs = {}
+        self.widths = {}
+        for i, char in enumerate(GLYPHS):
+            left = label.get_extents(GLYPHS[:i])[0] if i else 0
+            right = label.get_extents(GLYPHS[:i + 1])[0]
+            self.glyphs[char] = self.texture.get_region(left, 0, right - left, self.glyph_height)
+            self.widths[char] = right - left
+
+    @classmethod
+    def get(cls, font_name="Munro", font_size=sp(24)):
+        """Shared atlas for a font / size (rendered on first use)."""
+        key = (font_name, font_size)
+        if key not in _atlases:
+            _atlases[key] = cls(font_name, font_size)
+        return _atlases[key]
+
+
+class DigitDisplay(Widget):
+    """
+    Row of fixed digit cells (a light box with one glyph each), centred in
+    the widget. set_text() updates the cells in place.
+    """
+
+    def __init__(self, cell_size=(36, 48), spacing=dp(2), font_name="Munro", font_size=sp(24),
+                 cell_color=(0.98, 0.98, 0.98, 1), text_color=(0.1, 0.1, 0.1, 1), **kwargs):
+        super().__init__(**kwargs)
+        self.atlas = GlyphAtlas.get(font_name, font_size)
+        self.cell_size = cell_size
+        self.spacing = spacing
+        self.cell_color = cell_color
+        self.text_color = text_color
+
+        self.text = ""
+        # Per cell: [background Rectangle, glyph Rectangle, shown char]
+        self.cells = []
+        self.bind(pos=self._layout, size=self._layout)
+
+    def set_text(self, text):
+        """Show 'text' (e.g. "24:59"); only changed cells are touched."""
+        if text == self.text:
+            return
+        if len(text) != len(self.cells):
+            # Only happens when the number of characters changes
+            self._build_cells(len(text))
+        for cell, char in zip(self.cells, text):
+            if cell[2] != char:
+                cell[1].texture = self.atlas.glyphs.get(char)
+                cell[1].size = (self.atlas.widths.get(char, 0), self.atlas.glyph_height)
+                cell[2] = char
+        self.text = text
+        self._layout()
+
+    def _build_cells(self, count):
+        self.canvas.clear()
+        self.cells = []
+        with self.canvas:
+            for _ in range(count):
+                Color(*self.cell_color)
+                background = Rectangle(size=self.cell_size)
+                Color(*self.text_color)
+                glyph = Rectangle(size=(0, 0))
+                self.cells.append([background, glyph, None])
+
+    def _layout(self, *args):
+        if not self.cells:
+            return
+        width, height = self.cell_size
+        total = len(self.cells) * width + (len(self.cells) - 1) * self.spacing
+        x = self.center_x - total / 2
+        y = self.center_y - height / 2
+        for background, glyph, _ in self.cells:
+            background.pos = (x, y)
+            glyph_w, glyph_h = glyph.size
+            glyph.pos = (x + (width - glyph_w) / 2, y + (height - glyph_h) / 2)
+            x += width + self.spacing
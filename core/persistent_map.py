@@ -0,0 +1,256 @@
+"""
+persistent_map.py
+
+Immutable, copy-on-write mapping used for StudyData's nested dicts.
+
+A PersistentMap is a plain dict loaded once ("base", never mutated again)
+plus a small hash array mapped trie ("overlay") holding every change made
+since. set()/delete() return a new map that shares everything untouched
+with the old one, so:
+  - taking a snapshot is just keeping a reference (O(1), no copying)
+  - a mutation copies only one short trie path (O(log32 n))
+  - a thread holding an old version always sees a consistent one
+"""
+
+from collections.abc import Mapping
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_MASK = (1 << 64) - 1
+
+# Overlay marker for a base key that has been deleted
+_DELETED = object()
+# Lookup result for keys the overlay knows nothing about
+_MISSING = object()
+
+
+class _Leaf:
+    __slots__ = ("hash", "key", "value")
+
+    def __init__(self, key_hash, key, value):
+        self.hash = key_hash
+        self.key = key
+        self.value = value
+
+
+class _Collision:
+    """Several keys sharing one full 64-bit hash."""
+    __slots__ = ("hash", "pairs")
+
+    def __init__(self, key_hash, pairs):
+        self.hash = key_hash
+        self.pairs = pairs
+
+
+class _Branch:
+    """Bitmap-indexed node: only the occupied slots are stored."""
+    __slots__ = ("bitmap", "children")
+
+    def __init__(self, bitmap, children):
+        self.bitmap = bitmap
+        self.children = children
+
+
+def _hash(key):
+    return hash(key) & _HASH_MASK
+
+
+def _lookup(node, shift, key_hash, key):
+    while node is not None:
+        if isinstance(node, _Branch):
+            bit = 1 << ((key_hash >> shift) & _MASK)
+            if not node.bitmap & bit:
+                return _MISSING
+            node = node.children[bin(node.bitmap & (bit - 1)).count("1")]
+            shift += _BITS
+        elif isinstance(node, _Leaf):
+            if node.hash == key_hash and node.key == key:
+                return node.value
+            return _MISSING
+        else:
+            if node.hash == key_hash:
+                for k, v in node.pairs:
+                    if k == key:
+                        return v
+            return _MISSING
+    return _MISSING
+
+
+def _merge(a, b, shift):
+    """Branch holding two nodes with different hashes."""
+    index_a = (a.hash >> shift) & _MASK
+    index_b = (b.hash >> shift) & _MASK
+    if index_a == index_b:
+        return _Branch(1 << index_a, (_merge(a, b, shift + _BITS),))
+    children = (a, b) if index_a < index_b else (b, a)
+    return _Branch((1 << index_a) | (1 << index_b), children)
+
+
+def _assoc(node, shift, key_hash, key, value):
+    """Return (new node, True if the key was not there before)."""
+    if node is None:
+        return _Leaf(key_hash, key, value), True
+
+    if isinstance(node, _Branch):
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        index = bin(node.bitmap & (bit - 1)).count("1")
+        children = node.children
+        if node.bitmap & bit:
+            child = children[index]
+            new_child, added = _assoc(child, shift + _BITS, key_hash, key, value)
+            if new_child is child:
+                return node, False
+            return _Branch(node.bitmap, children[:index] + (new_child,) + children[index + 1:]), added
+        leaf = _Leaf(key_hash, key, value)
+        return _Branch(node.bitmap | bit, children[:index] + (leaf,) + children[index:]), True
+
+    if isinstance(node, _Leaf):
+        if node.hash == key_hash and node.key == key:
+            if node.value is value:
+                return node, False
+            return _Leaf(key_hash, key, value), False
+        if node.hash == key_hash:
+            return _Collision(key_hash, ((node.key, node.value), (key, value))), True
+        return _merge(node, _Leaf(key_hash, key, value), shift), True
+
+    # _Collision
+    if node.hash != key_hash:
+        return _merge(node, _Leaf(key_hash, key, value), shift), True
+    pairs = tuple(p for p in node.pairs if p[0] != key)
+    return _Collision(key_hash, pairs + ((key, value),)), len(pairs) == len(node.pairs)
+
+
+def _dissoc(node, shift, key_hash, key):
+    """Return the node with 'key' removed (None if it became empty)."""
+    if isinstance(node, _Branch):
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        if not node.bitmap & bit:
+            return node
+        index = bin(node.bitmap & (bit - 1)).count("1")
+        child = node.children[index]
+        new_child = _dissoc(child, shift + _BITS, key_hash, key)
+        if new_child is child:
+            return node
+        if new_child is None:
+            if node.bitmap == bit:
+                return None
+            return _Branch(node.bitmap & ~bit, node.children[:index] + node.children[index + 1:])
+        return _Branch(node.bitmap, node.children[:index] + (new_child,) + node.children[index + 1:])
+
+    if isinstance(node, _Leaf):
+        if node.hash == key_hash and node.key == key:
+            return None
+        return node
+
+    # _Collision
+    pairs = tuple(p for p in node.pairs if p[0] != key)
+    if len(pairs) == len(node.pairs):
+        return node
+    if len(pairs) == 1:
+        return _Leaf(node.hash, pairs[0][0], pairs[0][1])
+    return _Collision(node.hash, pairs)
+
+
+def _walk(node):
+    """Yield (key, value) for every entry in the overlay."""
+    if node is None:
+        return
+    if isinstance(node, _Branch):
+        for child in node.children:
+            yield from _walk(child)
+    elif isinstance(node, _Leaf):
+        yield node.key, node.value
+    else:
+        yield from node.pairs
+
+
+class PersistentMap(Mapping):
+    """
+    Read-only mapping with set()/delete() returning new versions.
+    Behaves like a dict for reading (get, [], in, len, items, ...).
+    """
+    __slots__ = ("_base", "_root", "_size")
+
+    def __init__(self, base=None):
+        # The base dict is adopted as-is: callers must not mutate it afterwards
+        self._base = base if base is not None else {}
+        self._root = None
+        self._size = len(self._base)
+
+    def _derive(self, root, size):
+        new_map = PersistentMap.__new__(PersistentMap)
+        new_map._base = self._base
+        new_map._root = root
+        new_map._size = size
+        return new_map
+
+    def set(self, key, value):
+        """Return a new map with key set to value."""
+        key_hash = _hash(key)
+        had_key = key in self
+        root, _ = _assoc(self._root, 0, key_hash, key, value)
+        if root is self._root:
+            return self
+        return self._derive(root, self._size if had_key else self._size + 1)
+
+    def delete(self, key):
+        """Return a new map without key (the same map if key is absent)."""
+        if key not in self:
+            return self
+        key_hash = _hash(key)
+        if key in self._base:
+            root, _ = _assoc(self._root, 0, key_hash, key, _DELETED)
+        else:
+            root = _dissoc(self._root, 0, key_hash, key)
+        return self._derive(root, self._size - 1)
+
+    def __getitem__(self, key):
+        value = _lookup(self._root, 0, _hash(key), key)
+        if value is _MISSING:
+            return self._base[key]
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        value = _lookup(self._root, 0, _hash(key), key)
+        if value is _MISSING:
+            return key in self._base
+        return value is not _DELETED
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for key, _ in self.items():
+            yield key
+
+    def items(self):
+        """Iterate (key, value) pairs; base order first, then new keys."""
+        if self._root is None:
+            yield from self._base.items()
+            return
+        root = self._root
+        base = self._base
+        for key, value in base.items():
+            changed = _lookup(root, 0, _hash(key), key)
+            if changed is _MISSING:
+                yield key, value
+            elif changed is not _DELETED:
+                yield key, changed
+        for key, value in _walk(root):
+            if key not in base:
+                yield key, value
+
+    def values(self):
+        for _, value in self.items():
+            yield value
+
+    def to_dict(self):
+        """Plain dict copy (e.g. for json.dump)."""
+        if self._root is None:
+            return dict(self._base)
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"PersistentMap({self.to_dict()!r})"
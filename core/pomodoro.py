@@ -1,21 +1,26 @@
 # File: /core/pomodoro.py
 
-from enum import Enum
-from kivy.clock import Clock
+import math
 from kivy.uix.widget import Widget
-from kivy.properties import NumericProperty, StringProperty
+from kivy.properties import BooleanProperty, NumericProperty, ObjectProperty, StringProperty
 
+from core.clock import get_clock
+from core.pomodoro_schedule import PomodoroSchedule
+from core.pomodoro_state import PomodoroState
 from core.subject import Subject
 
-class PomodoroState(Enum):
-    WORK = 1
-    BREAK = 2
-    DONE = 3
-
 class PomodoroWidget(Subject, Widget):
     """
     Advanced Pomodoro timer with a Work + Break cycle (25 min + 5 min).
     It computes how many laps fit into study_hours (e.g., 5 hours => 10 laps).
+
+    Each block runs against a deadline on the monotonic clock, and the time
+    left is derived from it, so stalled frames never make the timer late.
+    The widget only wakes up when the displayed second changes.
+
+    The blocks come from a PomodoroSchedule template (classic 25/5 unless a
+    schedule is passed in), so long breaks or a warm-up are just a
+    different template.
     """
 
     # If user enters how many hours they plan to study:
@@ -26,15 +31,21 @@ class PomodoroWidget(Subject, Widget):
     break_duration = NumericProperty(5 * 60)   # 5 minutes
 
     # Track progress
+    total_laps = NumericProperty(1)
     laps_completed = NumericProperty(0)        
     current_block_time_left = NumericProperty(0)
+    # Full length of the current block (for progress displays)
+    current_block_duration = NumericProperty(0)
+    # Position of the current block in the session
+    current_block_index = NumericProperty(0)
 
     # For UI display
     time_left_str = StringProperty("25:00")    
-    timer_running = False
+    timer_running = BooleanProperty(False)
 
-    # Finite State for the Pomodoro block
-    current_state = PomodoroState.WORK        
+    # Finite State for the Pomodoro block (a property, so displays can
+    # bind to it instead of polling)
+    current_state = ObjectProperty(PomodoroState.WORK)
 
     def __init__(
         self,
@@ -43,14 +54,20 @@ class PomodoroWidget(Subject, Widget):
         break_duration=5 * 60,
         total_laps=None, 
         update_callback=None,
+        schedule=None,
+        clock=None,
         **kwargs
     ):
         super().__init__(**kwargs)
 
+        # Time source (kivy's Clock unless e.g. a VirtualClock is injected)
+        self.clock = clock or get_clock()
+
         # Store parameters
         self.study_hours = study_hours or 1.0
         self.work_duration = work_duration
         self.break_duration = break_duration
+        self.schedule = schedule or PomodoroSchedule.classic(work_duration, break_duration)
 
         # If total_laps is not provided, compute from hours
         if total_laps is None:
@@ -64,6 +81,12 @@ class PomodoroWidget(Subject, Widget):
         # Build the list of blocks (WORK + BREAK pairs)
         self._build_circular_blocks()
 
+        # Monotonic time the current block ends at (while running)
+        self._deadline = None
+        # Exact time left of a paused block (None: the full block)
+        self._remaining = None
+        self._tick_event = None
+
         # Start at block index 0
         self.current_block_index = 0
         self._apply_current_block()
@@ -74,42 +97,30 @@ class PomodoroWidget(Subject, Widget):
     
     def _compute_laps_from_hours(self):
         """
-        We assume 1 Pomodoro cycle = (work_duration + break_duration) = 30 minutes by default.
-        If user enters X hours, we compute how many full cycles fit.
-        E.g. 5 hours => 5 * 60 = 300 minutes => 300 // 30 = 10 laps.
+        Count how many full laps of the schedule fit into study_hours.
+        With the classic 25 + 5 minute cycle: 5 hours => 300 minutes => 10 laps.
         """
-        # Convert hours to minutes
+        # Convert hours to whole minutes
         total_minutes = int(self.study_hours * 60)
-        
-        # Each lap is work + break, typically 25 + 5 = 30 minutes
-        minutes_per_lap = (self.work_duration + self.break_duration) / 60  # Convert seconds to minutes
-        
-        # Calculate how many full laps fit in the time
-        possible_laps = int(total_minutes / minutes_per_lap)
-        
-        # Ensure at least 1 lap
-        if possible_laps < 1:
-            possible_laps = 1
-        
+
+        # Walk the schedule template (at least 1 lap)
+        possible_laps = self.schedule.laps_for_seconds(total_minutes * 60)
+
         # Set the total laps
         self.total_laps = possible_laps
-        
+
         # Debug output to verify
         print(f"Study hours: {self.study_hours}")
         print(f"Total minutes: {total_minutes}")
-        print(f"Minutes per lap: {minutes_per_lap}")
         print(f"Calculated laps: {possible_laps}")
 
     def _build_circular_blocks(self):
         """
-        Build a list of (PomodoroState, duration) for each lap:
-         - For each lap => WORK + BREAK
-        So 5 laps => 10 blocks total.
+        Blocks of the session as a lazy (PomodoroState, duration) sequence:
+        nothing is materialised, block i is computed from the template
+        when it is needed. Classic 5 laps => 10 blocks (WORK + BREAK each).
         """
-        self.blocks = []
-        for _ in range(self.total_laps):
-            self.blocks.append((PomodoroState.WORK, self.work_duration))
-            self.blocks.append((PomodoroState.BREAK, self.break_duration))
+        self.blocks = self.schedule.blocks(self.total_laps)
 
     def _apply_current_block(self):
         """
@@ -124,20 +135,79 @@ class PomodoroWidget(Subject, Widget):
 
         state, duration = self.blocks[self.current_block_index]
         self.current_state = state
+        self.current_block_duration = duration
         self.current_block_time_left = duration
+        self._remaining = None
         self._update_time_str()
 
     def start_timer(self):
         """Begin counting down if not already running and not DONE."""
         if not self.timer_running and self.current_state != PomodoroState.DONE:
             self.timer_running = True
-            Clock.schedule_interval(self._tick, 1)
+            remaining = self._remaining
+            if remaining is None:
+                remaining = self.current_block_time_left
+            self._deadline = self.clock.monotonic() + remaining
+            self._schedule_tick(remaining)
 
     def stop_timer(self):
-        """Stop the countdown."""
+        """Stop the countdown (start_timer resumes where it stopped)."""
         if self.timer_running:
             self.timer_running = False
-            Clock.unschedule(self._tick)
+            if self._tick_event is not None:
+                self._tick_event.cancel()
+                self._tick_event = None
+            if self.current_state != PomodoroState.DONE:
+                self._remaining = max(0.0, self._deadline - self.clock.monotonic())
+
+    def elapsed(self):
+        """Seconds of the session behind us (for checkpoints / resume)."""
+        if self.current_state == PomodoroState.DONE:
+            return self.schedule.block_start(len(self.blocks))
+        remaining = self._remaining
+        if self.timer_running:
+            remaining = self._deadline - self.clock.monotonic()
+        elif remaining is None:
+            remaining = self.current_block_time_left
+        start = self.schedule.block_start(self.current_block_index)
+        return start + self.current_block_duration - max(0.0, remaining)
+
+    def block_elapsed(self):
+        """Seconds into the current block (for smooth progress displays)."""
+        if self.current_state == PomodoroState.DONE:
+            return self.current_block_duration
+        return self.elapsed() - self.schedule.block_start(self.current_block_index)
+
+    def seek(self, elapsed):
+        """
+        Jump to 'elapsed' seconds into the session, e.g. to resume one.
+        The block is looked up from the template, without walking blocks.
+        """
+        running = self.timer_running
+        self.stop_timer()
+        index, offset = self.schedule.locate(elapsed)
+        if index >= len(self.blocks):
+            self.laps_completed = self.total_laps
+            self.current_block_index = len(self.blocks)
+            self._apply_current_block()  # => DONE
+            return
+
+        self.current_block_index = index
+        self.laps_completed = self.schedule.laps_before(index)
+        self._apply_current_block()
+        self._remaining = self.current_block_duration - offset
+        self.current_block_time_left = math.ceil(self._remaining)
+        self._update_time_str()
+        if running:
+            self.start_timer()
+
+    def _schedule_tick(self, remaining):
+        """Wake up when the displayed second next changes."""
+        # The display shows ceil(remaining), which drops by one once
+        # remaining reaches the next lower whole second
+        seconds = math.ceil(remaining)
+        delay = remaining - (seconds - 1) if seconds > 0 else 0
+        self._tick_event = self.clock.schedule_once(self._tick, delay)
 
     def reset_timer(self, new_hours=None):
         """
@@ -159,8 +229,12 @@ class PomodoroWidget(Subject, Widget):
         self.timer_running = False
 
     def _tick(self, dt):
-        """Called every second by Kivy's Clock."""
-        if self.current_state == PomodoroState.DONE:
+        """
+        Called by the clock whenever the displayed second changes. 'dt' is
+        ignored: the time left always comes from the block deadline.
+        """
+        self._tick_event = None
+        if not self.timer_running or self.current_state == PomodoroState.DONE:
             return
 
         # If we've completed enough laps, mark DONE
@@ -169,14 +243,20 @@ class PomodoroWidget(Subject, Widget):
             self._notify_done()
             return
 
-        # Count down
-        if self.current_block_time_left > 0:
-            self.current_block_time_left -= 1
-            self._update_time_str()
-            self._notify_update()
-        else:
-            # The current block ended => move to next
+        now = self.clock.monotonic()
+        # After a long stall several blocks may have ended; each next block
+        # starts at the previous deadline, not "now", so nothing is lost
+        while now >= self._deadline:
             self._handle_block_end()
+            if self.current_state == PomodoroState.DONE:
+                return
+            self._deadline += self.current_block_time_left
+
+        remaining = self._deadline - now
+        self.current_block_time_left = math.ceil(remaining)
+        self._update_time_str()
+        self._notify_update()
+        self._schedule_tick(remaining)
 
     def _handle_block_end(self):
         """Advance from WORK to BREAK, or from BREAK to the next lap."""
@@ -224,10 +304,7 @@ class PomodoroWidget(Subject, Widget):
                 # For both work and break states, calculate remaining full laps
                 # This includes the current lap that's in progress
                 laps_remaining = max(0, self.total_laps - self.laps_completed)
-                
-                # Debug print to verify calculations
-                print(f"Total laps: {self.total_laps}, Completed: {self.laps_completed}, Remaining: {laps_remaining}")
-                
+
             block_type = "work" if self.current_state == PomodoroState.WORK else "break"
             self.update_callback(self.time_left_str, block_type, laps_remaining)
 
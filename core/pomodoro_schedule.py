@@ -0,0 +1,128 @@
+# File: /core/pomodoro_schedule.py
+"""
+pomodoro_schedule.py
+
+Pomodoro schedules described by a template instead of a materialised list
+of blocks. A template is an optional warm-up followed by a cycle that
+repeats forever, e.g.
+
+    # 25/5 with a 15 minute break after every 4th lap, 10 minute warm-up
+    PomodoroSchedule(
+        cycle=[(WORK, 1500), (BREAK, 300)] * 3 + [(WORK, 1500), (BREAK, 900)],
+        warmup=[(WORK, 600)],
+    )
+
+Every WORK block in the cycle is one lap (warm-up blocks are not laps).
+Blocks are computed on demand, and "which block is at elapsed time t" is
+answered with one divmod plus a search inside the template, so the cost
+does not depend on how long the session is.
+"""
+
+from bisect import bisect_right
+from collections.abc import Sequence
+
+from core.pomodoro_state import PomodoroState
+
+
+def _offsets(blocks):
+    """Start time of every block, plus the total length as last item."""
+    offsets = [0]
+    for _, duration in blocks:
+        offsets.append(offsets[-1] + duration)
+    return offsets
+
+
+class PomodoroSchedule:
+    """
+    Template-driven schedule: warm-up blocks, then 'cycle' repeated.
+    """
+
+    def __init__(self, cycle, warmup=()):
+        self.cycle = list(cycle)
+        self.warmup = list(warmup)
+        # Positions (block index / start time) of the laps inside one cycle
+        self._work_index = [i for i, (state, _) in enumerate(self.cycle) if state == PomodoroState.WORK]
+        if not self._work_index:
+            raise ValueError("a Pomodoro cycle needs at least one WORK block")
+
+        self._warmup_offsets = _offsets(self.warmup)
+        self._cycle_offsets = _offsets(self.cycle)
+        self.warmup_time = self._warmup_offsets[-1]
+        self.cycle_time = self._cycle_offsets[-1]
+        self._work_starts = [self._cycle_offsets[i] for i in self._work_index]
+
+    @classmethod
+    def classic(cls, work_duration=25 * 60, break_duration=5 * 60):
+        """The plain WORK + BREAK cycle."""
+        return cls([(PomodoroState.WORK, work_duration), (PomodoroState.BREAK, break_duration)])
+
+    def block(self, index):
+        """(PomodoroState, duration) of block 'index' (0-based)."""
+        if index < len(self.warmup):
+            return self.warmup[index]
+        return self.cycle[(index - len(self.warmup)) % len(self.cycle)]
+
+    def block_start(self, index):
+        """Elapsed time at which block 'index' starts."""
+        if index < len(self.warmup):
+            return self._warmup_offsets[index]
+        cycles, i = divmod(index - len(self.warmup), len(self.cycle))
+        return self.warmup_time + cycles * self.cycle_time + self._cycle_offsets[i]
+
+    def locate(self, elapsed):
+        """(block index, seconds into that block) at elapsed time 'elapsed'."""
+        if elapsed < self.warmup_time:
+            i = bisect_right(self._warmup_offsets, elapsed) - 1
+            return i, elapsed - self._warmup_offsets[i]
+        cycles, rest = divmod(elapsed - self.warmup_time, self.cycle_time)
+        i = bisect_right(self._cycle_offsets, rest) - 1
+        return len(self.warmup) + int(cycles) * len(self.cycle) + i, rest - self._cycle_offsets[i]
+
+    def laps_before(self, index):
+        """How many laps (WORK blocks) come before block 'index'."""
+        if index <= len(self.warmup):
+            return 0
+        cycles, i = divmod(index - len(self.warmup), len(self.cycle))
+        return cycles * len(self._work_index) + bisect_right(self._work_index, i - 1)
+
+    def lap_start(self, lap):
+        """Block index of lap number 'lap' (0-based)."""
+        cycles, i = divmod(lap, len(self._work_index))
+        return len(self.warmup) + cycles * len(self.cycle) + self._work_index[i]
+
+    def laps_for_seconds(self, seconds):
+        """
+        How many full laps fit into 'seconds': a lap counts once the blocks
+        after it (its break) are over too. At least 1.
+        """
+        # Lap n is over when lap n + 1 would start
+        rest = seconds - self.warmup_time
+        if rest < 0:
+            return 1
+        cycles, rest = divmod(rest, self.cycle_time)
+        started = int(cycles) * len(self._work_index) + bisect_right(self._work_starts, rest)
+        return max(started - 1, 1)
+
+    def blocks(self, laps):
+        """Lazy sequence of the blocks of a session with 'laps' laps."""
+        return ScheduleBlocks(self, self.lap_start(laps))
+
+
+class ScheduleBlocks(Sequence):
+    """Read-only list-like view of the first 'length' blocks of a schedule."""
+
+    def __init__(self, schedule, length):
+        self.schedule = schedule
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("block index out of range")
+        return self.schedule.block(index)
@@ -0,0 +1,8 @@
+# File: /core/pomodoro_state.py
+
+from enum import Enum
+
+class PomodoroState(Enum):
+    WORK = 1
+    BREAK = 2
+    DONE = 3
@@ -0,0 +1,175 @@
+"""
+progress_ring.py
+
+Circular progress for a timed block, filled by a fragment shader.
+
+The shader gets the block's start time and duration (and, while paused,
+the elapsed time it was paused at) as uniforms and works the fill out per
+pixel from the current time. Python sets those uniforms when the block
+changes or the timer is paused / resumed. Kivy has no built-in frame-time
+uniform, so while running the current time is handed to the shader from
+Python, but only as often as the fill can move by a pixel of arc.
+"""
+
+import math
+
+
+from kivy.clock import Clock
+from kivy.graphics import Color, RenderContext, Rectangle
+from kivy.properties import ListProperty, NumericProperty
+from kivy.uix.widget import Widget
+
+from core.clock import get_clock
+
+RING_SHADER = """
+$HEADER$
+
+uniform float time;
+uniform float block_start;
+uniform float block_duration;
+uniform float paused;
+uniform float paused_elapsed;
+uniform float thickness;
+uniform float pixel;
+uniform vec4 fill_color;
+uniform vec4 track_color;
+
+void main(void) {
+    // -1..1 across the square
+    vec2 p = tex_coord0 * 2.0 - 1.0;
+
+    // Ring coverage, with a one-pixel soft edge
+    float half_width = thickness * 0.5;
+    float edge = abs(length(p) - (1.0 - half_width));
+    float ring = 1.0 - smoothstep(half_width - pixel, half_width + pixel, edge);
+
+    float elapsed = paused > 0.5 ? paused_elapsed : time - block_start;
+    float progress = block_duration > 0.0 ? clamp(elapsed / block_duration, 0.0, 1.0) : 0.0;
+
+    // Filled clockwise from 12 o'clock
+    float angle = atan(p.x, p.y) / 6.28318530718;
+    if (angle < 0.0) {
+        angle += 1.0;
+    }
+    vec4 color = angle < progress ? fill_color : track_color;
+    gl_FragColor = vec4(color.rgb, color.a * ring) * frag_color;
+}
+"""
+
+
+class ProgressRing(Widget):
+    """
+    Ring centred in the widget (as large as fits) showing how far a block
+    of 'duration' seconds has got. set_block() / pause() / resume() are
+    the only calls it needs.
+
+    Accepted trade-off: kivy gives shaders no frame-time uniform, so a
+    running ring still needs a Python write of the 'time' uniform to move.
+    It happens once per pixel of arc the fill advances (duration divided
+    by the ring's circumference in pixels, e.g. every ~8 s for a 25 min
+    block on a 56 dp ring), never more than once a frame; anything more
+    often would redraw identical pixels.
+
+    time_updates counts those writes.
+    """
+
+    fill_color = ListProperty([1, 1, 1, 1])
+    track_color = ListProperty([1, 1, 1, 0.25])
+    # Ring width as a fraction of the radius
+    thickness = NumericProperty(0.22)
+
+    def __init__(self, clock=None, **kwargs):
+        self.canvas = RenderContext(
+            use_parent_projection=True,
+            use_parent_modelview=True,
+            use_parent_frag_modelview=True,
+        )
+        self.canvas.shader.fs = RING_SHADER
+        if not self.canvas.shader.success:
+            print("Error compiling progress ring shader")
+        super().__init__(**kwargs)
+
+        self.clock = clock or get_clock()
+        # Times are sent relative to this, small enough for float32
+        self._epoch = self.clock.monotonic()
+        self._frame_event = None
+        self._duration = 0.0
+        self._running = False
+        self.time_updates = 0
+
+        with self.canvas:
+            Color(1, 1, 1, 1)
+            self._rect = Rectangle()
+
+        self.set_block(0, 0, running=False)
+        self.bind(pos=self._update_geometry, size=self._update_geometry)
+        self.bind(fill_color=self._update_style, track_color=self._update_style,
+                  thickness=self._update_style)
+        self._update_geometry()
+        self._update_style()
+
+    def set_block(self, elapsed, duration, running=True):
+        """Show a block of 'duration' seconds, 'elapsed' seconds in."""
+        self._duration = float(duration)
+        self.canvas["block_duration"] = self._duration
+        if running:
+            self.resume(elapsed)
+        else:
+            self.pause(elapsed)
+
+    def pause(self, elapsed):
+        """Freeze the ring at 'elapsed' seconds into the block."""
+        self.canvas["paused"] = 1.0
+        self.canvas["paused_elapsed"] = float(elapsed)
+        self._running = False
+        self._unschedule()
+
+    def resume(self, elapsed):
+        """Run the ring on from 'elapsed' seconds into the block."""
+        self.canvas["block_start"] = float(self._now() - elapsed)
+        self.canvas["paused"] = 0.0
+        self._running = True
+        self._update_time(0)
+        self._schedule()
+
+    def update_interval(self):
+        """Seconds between time updates: how long the fill takes per pixel."""
+        circumference = math.pi * min(self.width, self.height)
+        if self._duration <= 0 or circumference < 1:
+            return None
+        return max(self._duration / circumference, 1 / 60.0)
+
+    def _schedule(self):
+        self._unschedule()
+        interval = self.update_interval()
+        if self._running and interval is not None:
+            self._frame_event = Clock.schedule_interval(self._update_time, interval)
+
+    def _unschedule(self):
+        if self._frame_event is not None:
+            self._frame_event.cancel()
+            self._frame_event = None
+
+    def _now(self):
+        return self.clock.monotonic() - self._epoch
+
+    def _update_time(self, dt):
+        # The only work while running
+        self.time_updates += 1
+        self.canvas["time"] = float(self._now())
+
+    def _update_geometry(self, *args):
+        side = min(self.width, self.height)
+        self._rect.size = (side, side)
+        self._rect.pos = (self.center_x - side / 2, self.center_y - side / 2)
+        # One pixel, in the shader's -1..1 units
+        self.canvas["pixel"] = 2.0 / max(side, 1)
+        if self._running:
+            # A bigger ring moves more pixels per second
+            self._update_time(0)
+            self._schedule()
+
+    def _update_style(self, *args):
+        self.canvas["fill_color"] = [float(c) for c in self.fill_color]
+        self.canvas["track_color"] = [float(c) for c in self.track_color]
+        self.canvas["thickness"] = float(self.thickness)
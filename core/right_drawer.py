@@ -4,8 +4,8 @@ from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.button import MDIconButton, MDFlatButton
 from kivy.metrics import dp
 from core.task_manager import TaskManager, Task
+from core.task_list_view import TaskListView, TaskRow
 from kivy.uix.textinput import TextInput
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.boxlayout import BoxLayout
 from core.subject import Subject  
 from kivy.properties import ObjectProperty
@@ -17,6 +17,57 @@ from kivy.uix.spinner import Spinner
 
 LabelBase.register(name="Munro", fn_regular="font/Munro.ttf")
 
+class DrawerTaskRow(TaskRow, BoxLayout):
+    """
+    One task in the drawer: label plus Complete / Delete buttons. Rows are
+    recycled, so the widgets are built once and set_task() fills them in.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(orientation='horizontal', **kwargs)
+        self.task = None
+        self.view = None
+
+        self.task_label = MDLabel(
+            halign="left",
+            size_hint_x=0.6
+        )
+        self.add_widget(self.task_label)
+
+        # Buttons container
+        buttons_box = BoxLayout(
+            orientation='horizontal',
+            size_hint_x=0.4,
+            spacing=dp(5)
+        )
+
+        # Button to complete the task
+        self.complete_btn = Button(
+            text="Complete",
+            size_hint_x=0.6
+        )
+        self.complete_btn.bind(on_release=lambda btn: self.view.complete(self.task))
+        buttons_box.add_widget(self.complete_btn)
+
+        # Button to delete the task
+        delete_btn = Button(
+            text="Delete",
+            size_hint_x=0.4,
+            background_color=(0.8, 0.2, 0.2, 1)  # Red background
+        )
+        delete_btn.bind(on_release=lambda btn: self.view.delete(self.task))
+        buttons_box.add_widget(delete_btn)
+
+        self.add_widget(buttons_box)
+
+    def set_task(self, view, task):
+        self.view = view
+        self.task = task
+        # Show task name, priority & status
+        priority_label = task.get_priority_label()
+        self.task_label.text = f"{task.title} [{priority_label}] - {'Done' if task.completed else 'Pending'}"
+        self.complete_btn.disabled = task.completed
+
 class RightDrawer(MDNavigationDrawer):
     task_manager = ObjectProperty(None)
 
@@ -106,15 +157,19 @@ class RightDrawer(MDNavigationDrawer):
         
         layout.add_widget(buttons_row)
         
-        # Scrollable area to display tasks
-        self.scroll_view = ScrollView(size_hint=(1, 1))
-        self.tasks_layout = BoxLayout(
-            orientation='vertical',
-            size_hint_y=None
-        )
-        self.tasks_layout.bind(minimum_height=self.tasks_layout.setter('height'))
-        self.scroll_view.add_widget(self.tasks_layout)
-        layout.add_widget(self.scroll_view)
+        # Scrollable, virtualized task list; it follows the TaskManager's
+        # changes by itself, so nothing here needs to refresh it
+        self.task_list = None
+        if self.task_manager is not None:
+            self.task_list = TaskListView(
+                self.task_manager,
+                DrawerTaskRow,
+                row_height=dp(40),
+                on_complete=self.complete_task,
+                on_delete=self.delete_task,
+                size_hint=(1, 1)
+            )
+            layout.add_widget(self.task_list)
 
         self.add_widget(layout)
 
@@ -136,14 +191,10 @@ class RightDrawer(MDNavigationDrawer):
         # Bind so the triangle moves with the drawer
         self.bind(pos=self.update_triangle)
 
-        # Finally, load existing tasks from the TaskManager, if available
-        if self.task_manager is not None:
-            self.refresh_task_list()
-
     def add_task(self, *args):
         """
         Create a new Task and add it to the TaskManager with priority.
-        Then refresh the UI to show the new task.
+        The task list shows it as soon as the TaskManager reports it.
         """
         if self.task_manager is None:
             print("Cannot add task: No TaskManager available")
@@ -165,7 +216,6 @@ class RightDrawer(MDNavigationDrawer):
             # Add task with priority
             self.task_manager.add_task(title, priority)
             self.task_input.text = ""
-            self.refresh_task_list()
 
     def confirm_clear_tasks(self, *args):
         """Show confirmation dialog before clearing all tasks"""
@@ -196,86 +246,35 @@ class RightDrawer(MDNavigationDrawer):
         dialog.dismiss()
         if self.task_manager:
             self.task_manager.reset_all_tasks()
-            self.refresh_task_list()
 
     def refresh_task_list(self):
         """
-        Clears the tasks_layout and rebuilds it with the latest tasks.
-        Tasks are displayed in order of priority (high to low).
+        Rebuild the task list from the TaskManager. Not needed after the
+        usual changes, which the list applies one at a time.
         """
-        if self.task_manager is None:
+        if self.task_list is None:
             print("Cannot refresh tasks: No TaskManager available")
             return
-            
-        self.tasks_layout.clear_widgets()
-
-        all_tasks = self.task_manager.get_all_tasks()
-        
-        # Sort tasks by priority (high to low)
-        # Don't use reverse=True because __lt__ already does reverse comparison
-        all_tasks.sort()  # Uses Task.__lt__ for sorting
-        
-        # For each task in TaskManager, create a row
-        for task in all_tasks:
-            row = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(40))
 
-            # Show task name, priority & status
-            priority_label = task.get_priority_label()
-            label_text = f"{task.title} [{priority_label}] - {'Done' if task.completed else 'Pending'}"
-            task_label = MDLabel(
-                text=label_text,
-                halign="left",
-                size_hint_x=0.6
-            )
-            row.add_widget(task_label)
+        self.task_list.reload()
 
-            # Buttons container
-            buttons_box = BoxLayout(
-                orientation='horizontal',
-                size_hint_x=0.4,
-                spacing=dp(5)
-            )
-            
-            # Button to complete the task
-            complete_btn = Button(
-                text="Complete",
-                size_hint_x=0.6,
-                disabled=task.completed
-            )
-            complete_btn.bind(on_release=lambda btn, t=task: self.complete_task(t))
-            buttons_box.add_widget(complete_btn)
-            
-            # Button to delete the task
-            delete_btn = Button(
-                text="Delete",
-                size_hint_x=0.4,
-                background_color=(0.8, 0.2, 0.2, 1)  # Red background
-            )
-            delete_btn.bind(on_release=lambda btn, t=task: self.delete_task(t))
-            buttons_box.add_widget(delete_btn)
-            
-            row.add_widget(buttons_box)
-            self.tasks_layout.add_widget(row)
-            
     def complete_task(self, task):
         """
-        Mark the task as completed via TaskManager, then refresh.
+        Mark the task as completed via TaskManager.
         """
         if self.task_manager is None:
             return
             
         self.task_manager.complete_task(task)
-        self.refresh_task_list()
         
     def delete_task(self, task):
         """
-        Delete the task via TaskManager, then refresh.
+        Delete the task via TaskManager.
         """
         if self.task_manager is None:
             return
             
         self.task_manager.delete_task(task)
-        self.refresh_task_list()
 
     def toggle_drawer(self, *args):
         self.set_state("toggle")
@@ -0,0 +1,152 @@
+"""
+save_writer.py
+
+A single long-lived writer thread for StudyData. Save requests are coalesced:
+a burst of mutations within the debounce window turns into one write, and
+every write goes through a temp file + rename so the data file is never
+left half-written.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+
+class CoalescingWriter:
+    """
+    Writes snapshot_fn() to 'path' as JSON, at most once per debounce window.
+
+    Counters (read them any time, e.g. for debugging):
+      - requests:  how many saves were requested
+      - writes:    how many times the file was actually written
+      - coalesced: requests folded into a write that was already pending
+      - skipped:   writes dropped because the content did not change
+      - deferred:  writes postponed because can_write() said not yet
+    """
+
+    def __init__(self, path, snapshot_fn, debounce=0.5, max_delay=5.0, post_write=None,
+                 lock_factory=None, can_write=None):
+        self.path = path
+        self.snapshot_fn = snapshot_fn
+        # Called with the written data after every successful write, e.g. to
+        # keep derived files (the binary snapshot) in step with the JSON
+        self.post_write = post_write
+        # Returns a context manager held around each write (e.g. a FileLock)
+        self.lock_factory = lock_factory
+        # Checked under the lock; returning False retries the write later
+        self.can_write = can_write
+        self.debounce = debounce
+        # Keep postponing while mutations keep coming, but never past this
+        self.max_delay = max_delay
+
+        self.requests = 0
+        self.writes = 0
+        self.coalesced = 0
+        self.skipped = 0
+        self.deferred = 0
+
+        self._cond = threading.Condition()
+        self._pending = False
+        self._busy = False
+        self._first_request = 0.0
+        self._deadline = 0.0
+        self._callbacks = []
+        self._last_digest = None
+
+        self._thread = threading.Thread(target=self._run, name="StudyDataWriter", daemon=True)
+        self._thread.start()
+
+    def request(self, on_written=None):
+        """
+        Ask for a save. Returns immediately; the write happens once the
+        debounce window has passed without new requests.
+        on_written, if given, is called from the writer thread after the
+        data has been written successfully.
+        """
+        with self._cond:
+            now = time.monotonic()
+            self.requests += 1
+            if self._pending:
+                self.coalesced += 1
+            else:
+                self._pending = True
+                self._first_request = now
+            self._deadline = min(now + self.debounce, self._first_request + self.max_delay)
+            if on_written is not None:
+                self._callbacks.append(on_written)
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Write any pending save right away and wait until it is on disk.
+        Returns False if the timeout expired first.
+        """
+        with self._cond:
+            if self._pending:
+                self._deadline = 0.0
+                self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # Debounce: sleep until no new request moved the deadline
+                while True:
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self._pending = False
+                self._busy = True
+                callbacks, self._callbacks = self._callbacks, []
+
+            try:
+                if self._write():
+                    for callback in callbacks:
+                        callback()
+                else:
+                    # Deferred: the callbacks wait for the retried write
+                    with self._cond:
+                        self._callbacks[:0] = callbacks
+            except Exception as e:
+                print("Error saving data:", e)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _write(self):
+        """
+        Write the snapshot. Returns True once the data is on disk (also when
+        it was already), False if can_write() deferred the write.
+        """
+        with self.lock_factory() if self.lock_factory is not None else nullcontext():
+            if self.can_write is not None and not self.can_write():
+                self.deferred += 1
+                self.request()
+                return False
+
+            data = self.snapshot_fn()
+            payload = json.dumps(data, indent=4)
+            digest = hashlib.sha1(payload.encode("utf-8")).digest()
+            if digest == self._last_digest:
+                self.skipped += 1
+                return True
+
+            tmp_file = self.path + ".tmp"
+            with open(tmp_file, "w") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.path)
+            self._last_digest = digest
+            self.writes += 1
+
+            if self.post_write is not None:
+                self.post_write(data)
+        return True
@@ -0,0 +1,130 @@
+"""
+session_checkpoint.py
+
+Crash-safe checkpoint of the running study session, so a session survives
+a crash or the app being closed.
+
+The file is a fixed-size, memory-mapped pair of slots. Each save packs one
+small record (no JSON, no file rewrite) into the older slot, so the other
+slot always holds the previous valid checkpoint even if a write is torn.
+Every record carries a sequence number and a CRC32; load() returns the
+newest slot that checks out.
+
+A save is a memcpy into the page cache, which survives the process dying.
+Every sync_every saves the map is also flushed to disk.
+"""
+
+import mmap
+import os
+import struct
+import zlib
+
+CHECKPOINT_FILE = "evergreen_session.ckpt"
+
+MAGIC = b"EGCK"
+VERSION = 1
+
+# magic, version, active flag, sequence, study hours, session start (wall),
+# elapsed session seconds, written at (wall), tree minutes, tree stage
+RECORD = struct.Struct("<4sHHQdddd II")
+# ... followed by a CRC32 of the bytes above
+SLOT_SIZE = RECORD.size + 4
+
+
+class SessionCheckpoint:
+    """
+    Two-slot memory-mapped session record.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE, sync_every=30):
+        self.path = path
+        self.sync_every = sync_every
+        self.saves = 0
+        self._seq = 0
+        self._map = None
+        self._open()
+
+    def save(self, study_hours, session_start, elapsed, tree_minutes, tree_stage, written_at):
+        """Checkpoint the running session (cheap enough to call every second)."""
+        if self._map is None:
+            return
+        self._seq += 1
+        self._write_slot(RECORD.pack(
+            MAGIC, VERSION, 1, self._seq, study_hours, session_start,
+            elapsed, written_at, tree_minutes, tree_stage,
+        ))
+        self.saves += 1
+        if self.saves % self.sync_every == 0:
+            self._map.flush()
+
+    def clear(self):
+        """Mark the session as finished; load() then returns None."""
+        if self._map is None:
+            return
+        self._seq += 1
+        self._write_slot(RECORD.pack(MAGIC, VERSION, 0, self._seq, 0, 0, 0, 0, 0, 0))
+        self._map.flush()
+
+    def load(self):
+        """
+        The last checkpointed session as a dict, or None if there is no
+        unfinished session (or both slots are damaged).
+        """
+        if self._map is None:
+            return None
+        best = None
+        for slot in range(2):
+            record = self._read_slot(slot)
+            if record is not None and (best is None or record[3] > best[3]):
+                best = record
+        if best is None:
+            return None
+        self._seq = max(self._seq, best[3])
+        if not best[2]:
+            return None
+        return {
+            "study_hours": best[4],
+            "session_start": best[5],
+            "elapsed": best[6],
+            "written_at": best[7],
+            "tree_minutes": best[8],
+            "tree_stage": best[9],
+        }
+
+    def close(self):
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+
+    def _open(self):
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size != 2 * SLOT_SIZE:
+                    os.ftruncate(fd, 2 * SLOT_SIZE)
+                self._map = mmap.mmap(fd, 2 * SLOT_SIZE)
+            finally:
+                os.close(fd)
+            # Continue the sequence from what is on disk
+            self.load()
+        except Exception as e:
+            print("Error opening session checkpoint:", e)
+            self._map = None
+
+    def _write_slot(self, payload):
+        # Odd sequence numbers go to slot 1, even ones to slot 0, so the
+        # slot being written is never the newest valid one
+        offset = (self._seq % 2) * SLOT_SIZE
+        self._map[offset:offset + SLOT_SIZE] = payload + struct.pack("<I", zlib.crc32(payload))
+
+    def _read_slot(self, slot):
+        offset = slot * SLOT_SIZE
+        payload = self._map[offset:offset + RECORD.size]
+        (crc,) = struct.unpack_from("<I", self._map, offset + RECORD.size)
+        if zlib.crc32(payload) != crc:
+            return None
+        record = RECORD.unpack(payload)
+        if record[0] != MAGIC or record[1] != VERSION:
+            return None
+        return record
@@ -0,0 +1,150 @@
+"""
+simulator.py
+
+Headless study-session simulator. Runs the real PomodoroWidget, tree growth
+(TreeGrowthFSM) and StudyData on a VirtualClock, with no window, so a
+10-hour session takes milliseconds. Everything interesting that happens
+is collected in a trace of (seconds since start, event, detail) tuples:
+
+    start    planned hours
+    block    "work" / "break" - a new block began
+    lap      laps completed so far
+    stage    tree stage index the tree grew to
+    done     laps completed
+    save     the mutation record StudyData persisted
+
+Usable as a regression check and as a benchmark driver:
+    python -m core.simulator [hours]
+"""
+
+import sys
+import time
+
+from core.clock import VirtualClock
+from core.pomodoro import PomodoroWidget
+from core.pomodoro_state import PomodoroState
+from core.study_data import StudyData
+from core.tree_growth_fsm import TreeGrowthFSM
+
+
+class TraceStorage:
+    """
+    StudyData storage backend that keeps nothing and puts every write in
+    the simulator's trace instead.
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+
+    def load(self):
+        return {"study_hours": {}, "tasks_completed": {}, "total_hours": 0.0}
+
+    def write(self, record):
+        self.simulator.log("save", record)
+
+    def flush(self, timeout=None):
+        return True
+
+    def close(self):
+        pass
+
+
+class StudySimulator:
+    """
+    One simulated study session of 'study_hours' hours, as TreeScreen runs
+    it: a Pomodoro timer, a tree growing every minute, and the session
+    recorded in StudyData when the timer is done.
+    """
+
+    def __init__(self, study_hours, schedule=None, clock=None):
+        self.study_hours = study_hours
+        self.clock = clock or VirtualClock()
+        self.trace = []
+        # Per-second timer updates (not traced, there are too many)
+        self.ticks = 0
+        self.done = False
+        self._block_index = None
+
+        self.study_data = StudyData(storage=TraceStorage(self), clock=self.clock)
+        self.fsm = TreeGrowthFSM()
+        self.pomodoro = PomodoroWidget(
+            study_hours=study_hours,
+            schedule=schedule,
+            update_callback=self._on_timer_update,
+            clock=self.clock,
+        )
+        self.pomodoro.bind(laps_completed=lambda widget, laps: self.log("lap", laps))
+
+    def log(self, event, detail=None):
+        self.trace.append((self.clock.monotonic() - self._start, event, detail))
+
+    def run(self, limit=None):
+        """
+        Run the session until the timer is done (or 'limit' simulated
+        seconds passed). Returns the trace.
+        """
+        self._start = self.clock.monotonic()
+        self._session_start = self.clock.time()
+        self.log("start", self.study_hours)
+        self.fsm.plan(self.study_hours)
+        self.clock.schedule_interval(self._grow_tree, 60)
+        self._check_block()
+        self.pomodoro.start_timer()
+
+        if limit is None:
+            # Generous upper bound: the planned time plus the longest break
+            limit = self.study_hours * 3600 + 24 * 3600
+        self.clock.run_until(lambda: self.done, self._start + limit)
+        return self.trace
+
+    def events(self, event):
+        """Details of every traced event of one kind."""
+        return [detail for _, name, detail in self.trace if name == event]
+
+    def _grow_tree(self, dt):
+        if self.done:
+            return False
+        stage = self.fsm.current_stage
+        if self.fsm.add_minute() > stage:
+            self.log("stage", self.fsm.current_stage)
+
+    def _on_timer_update(self, time_str, block_type, laps_remaining):
+        if block_type == "done":
+            self._finish()
+            return
+        self.ticks += 1
+        self._check_block()
+
+    def _check_block(self):
+        """Trace the start of every new block."""
+        index = self.pomodoro.current_block_index
+        if index != self._block_index:
+            self._block_index = index
+            state = self.pomodoro.current_state
+            self.log("block", "work" if state == PomodoroState.WORK else "break")
+
+    def _finish(self):
+        if self.done:
+            return
+        self.done = True
+        self.log("done", self.pomodoro.laps_completed)
+        # What TreeScreen.record_session does when the popup shows
+        self.study_data.record_session(
+            self._session_start, self.clock.time(),
+            self.pomodoro.laps_completed, self.study_hours,
+        )
+
+
+if __name__ == "__main__":
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    started = time.perf_counter()
+    simulator = StudySimulator(hours)
+    trace = simulator.run()
+    elapsed = time.perf_counter() - started
+
+    for seconds, event, detail in trace:
+        if event != "block":
+            print(f"{seconds / 60:8.1f} min  {event:<6} {detail}")
+    print(f"{hours} h simulated in {elapsed * 1000:.1f} ms: "
+          f"{len(simulator.events('lap'))} laps, {len(simulator.events('stage'))} tree stages, "
+          f"{simulator.ticks} timer updates, {simulator.clock.callbacks_run} clock callbacks")
@@ -0,0 +1,195 @@
+"""
+sqlite_storage.py
+
+Optional SQLite storage backend for StudyData. Unlike the JSON file, which
+keeps one float per day, it also keeps every study session (start, end,
+laps, planned hours) and answers per-day, per-week and total aggregates
+with indexed SQL queries.
+
+Usage:
+    StudyData(storage=SqliteStorage("evergreen_data.db"))
+
+One-shot import of an existing JSON file:
+    python -m core.sqlite_storage evergreen_data.json evergreen_data.db
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+from datetime import date, timedelta
+
+DB_FILE = "evergreen_data.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS study_hours (
+    day TEXT PRIMARY KEY,           -- ISO date, e.g. 2023-09-01
+    hours REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day TEXT NOT NULL,              -- ISO date the session started on
+    started_at REAL NOT NULL,       -- unix timestamps
+    ended_at REAL NOT NULL,
+    laps INTEGER NOT NULL,
+    planned_hours REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_day ON sessions (day);
+CREATE TABLE IF NOT EXISTS tasks_completed (
+    task_id TEXT PRIMARY KEY,
+    completed INTEGER NOT NULL
+);
+"""
+
+
+class SqliteStorage:
+    """
+    Storage backend consumed by StudyData:
+      - load() returns the same nested dict the JSON file holds
+      - write(record) persists one mutation record ("hours", "task", "session")
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets readers run while a write is in progress; NORMAL sync is
+        # still crash-safe in WAL mode and much cheaper than FULL
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def load(self):
+        """Read everything back into StudyData's nested dict layout."""
+        with self._lock:
+            hours = dict(self._conn.execute("SELECT day, hours FROM study_hours"))
+            tasks = {
+                task_id: bool(completed)
+                for task_id, completed in self._conn.execute(
+                    "SELECT task_id, completed FROM tasks_completed"
+                )
+            }
+        return {
+            "study_hours": hours,
+            "tasks_completed": tasks,
+            "total_hours": sum(hours.values()),
+        }
+
+    def write(self, record):
+        """Persist one mutation record."""
+        op = record.get("op")
+        with self._lock, self._conn:
+            if op == "hours":
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO study_hours (day, hours) VALUES (?, ?)",
+                    (record["date"], record["hours"]),
+                )
+            elif op == "task":
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO tasks_completed (task_id, completed) VALUES (?, 1)",
+                    (record["id"],),
+                )
+            elif op == "session":
+                self._conn.execute(
+                    "INSERT INTO sessions (day, started_at, ended_at, laps, planned_hours) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (record["date"], record["start"], record["end"],
+                     record["laps"], record["planned_hours"]),
+                )
+
+    def hours_for_day(self, date_str):
+        """Planned study hours stored for one ISO date."""
+        return self._scalar("SELECT hours FROM study_hours WHERE day = ?", (date_str,))
+
+    def hours_for_week(self, date_str):
+        """Planned study hours for the Monday-Sunday week containing date_str."""
+        monday, sunday = _week_bounds(date_str)
+        return self._scalar(
+            "SELECT SUM(hours) FROM study_hours WHERE day BETWEEN ? AND ?",
+            (monday, sunday),
+        )
+
+    def total_hours(self):
+        """Planned study hours over the whole history."""
+        return self._scalar("SELECT SUM(hours) FROM study_hours")
+
+    def sessions_for_day(self, date_str):
+        """All sessions started on one ISO date, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT started_at, ended_at, laps, planned_hours FROM sessions "
+                "WHERE day = ? ORDER BY started_at",
+                (date_str,),
+            ).fetchall()
+        return [
+            {"start": start, "end": end, "laps": laps, "planned_hours": planned}
+            for start, end, laps, planned in rows
+        ]
+
+    def studied_hours(self, start_date, end_date):
+        """Hours actually spent in sessions between two ISO dates (inclusive)."""
+        return self._scalar(
+            "SELECT SUM(ended_at - started_at) / 3600.0 FROM sessions WHERE day BETWEEN ? AND ?",
+            (start_date, end_date),
+        )
+
+    def studied_hours_for_week(self, date_str):
+        """Hours spent in sessions during the week containing date_str."""
+        return self.studied_hours(*_week_bounds(date_str))
+
+    def flush(self, timeout=None):
+        """Every write is committed immediately, nothing to wait for."""
+        return True
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _scalar(self, sql, params=()):
+        with self._lock:
+            value = self._conn.execute(sql, params).fetchone()[0]
+        return value or 0.0
+
+
+def _week_bounds(date_str):
+    """ISO dates of the Monday and Sunday around date_str."""
+    day = date.fromisoformat(date_str)
+    monday = day - timedelta(days=day.weekday())
+    return monday.isoformat(), (monday + timedelta(days=6)).isoformat()
+
+
+def migrate_json(json_path, db_path=DB_FILE):
+    """
+    One-shot import of an evergreen_data.json file into a SQLite database.
+    Existing rows for the same days/tasks are overwritten.
+    Returns (days_imported, tasks_imported).
+    """
+    with open(json_path, "r") as f:
+        data = json.load(f)
+
+    study_hours = data.get("study_hours", {})
+    tasks = data.get("tasks_completed", {})
+
+    storage = SqliteStorage(db_path)
+    try:
+        with storage._conn:
+            storage._conn.executemany(
+                "INSERT OR REPLACE INTO study_hours (day, hours) VALUES (?, ?)",
+                study_hours.items(),
+            )
+            storage._conn.executemany(
+                "INSERT OR REPLACE INTO tasks_completed (task_id, completed) VALUES (?, ?)",
+                ((task_id, int(bool(done))) for task_id, done in tasks.items()),
+            )
+    finally:
+        storage.close()
+    return len(study_hours), len(tasks)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python -m core.sqlite_storage <evergreen_data.json> [evergreen_data.db]")
+        sys.exit(1)
+    days, tasks = migrate_json(*sys.argv[1:])
+    print(f"Imported {days} days and {tasks} tasks")
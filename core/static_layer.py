@@ -0,0 +1,93 @@
+"""
+static_layer.py
+
+Offscreen cache for the parts of a scene that rarely change (on
+TreeScreen: the sky, the tree and the ground).
+
+StaticLayer renders its content into an Fbo and draws the result as one
+textured quad, so a frame where only the clouds or the timer changed
+costs one quad instead of redrawing every static part. Kivy marks the
+Fbo as needing a redraw whenever one of the instructions in it changes
+(a resize, a new tree texture, the tree growing). The Fbo sits in the
+widget's canvas just before the quad, so it re-renders itself while the
+frame is drawn, at most once per frame and only on those frames.
+"""
+
+import math
+
+from kivy.clock import Clock
+from kivy.graphics import (
+    Callback, Canvas, ClearBuffers, ClearColor, Color, Fbo, PopMatrix,
+    PushMatrix, Rectangle, Translate,
+)
+from kivy.uix.widget import Widget
+
+# The buffer grows in steps of this many pixels (and never shrinks), so
+# dragging the window edge doesn't reallocate it on every frame
+FBO_STEP = 256
+
+
+class StaticLayer(Widget):
+    """
+    Widget showing 'content' (a Canvas, drawn in the same coordinates as
+    the widget's parent) from an offscreen buffer at least the widget's
+    size; the quad shows the buffer's bottom-left corner.
+
+    renders counts how many times the buffer was re-rendered.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.renders = 0
+        self.content = Canvas()
+
+        self.fbo = Fbo(size=self._fbo_size(self.size))
+        with self.fbo:
+            ClearColor(0, 0, 0, 0)
+            ClearBuffers()
+            # Only runs when the Fbo is actually re-rendered
+            Callback(self._count_render)
+            PushMatrix()
+            # The Fbo's origin is the widget's corner
+            self._origin = Translate(-self.x, -self.y)
+        self.fbo.add(self.content)
+        self.fbo.add(PopMatrix())
+
+        # Drawing the canvas first brings the Fbo up to date (if needed),
+        # then shows it
+        self.canvas.add(self.fbo)
+        with self.canvas:
+            Color(1, 1, 1, 1)
+            self._quad = Rectangle(texture=self.fbo.texture)
+        self._update_geometry()
+
+        # A window drag changes pos / size many times per frame; follow it
+        # only once, before the frame
+        self._trigger_geometry = Clock.create_trigger(self._update_geometry, -1)
+        self.bind(pos=self._trigger_geometry, size=self._trigger_geometry)
+
+    def add(self, instruction):
+        """Add an instruction (e.g. another widget's canvas) on top of the content."""
+        self.content.add(instruction)
+
+    def _update_geometry(self, *args):
+        width, height = self.fbo.size
+        if self.width > width or self.height > height:
+            # Resizing the Fbo gives it a new texture (and stalls until
+            # the GPU is done with the old one)
+            self.fbo.size = width, height = self._fbo_size(
+                (max(self.width, width), max(self.height, height)))
+            self._quad.texture = self.fbo.texture
+        self._origin.xy = (-self.x, -self.y)
+        self._quad.pos = self.pos
+        self._quad.size = self.size
+        # Only the part of the buffer the widget covers
+        u, v = self.width / width, self.height / height
+        self._quad.tex_coords = (0, 0, u, 0, u, v, 0, v)
+
+    def _fbo_size(self, size):
+        # Round up to the next step
+        return tuple(FBO_STEP * max(math.ceil(side / FBO_STEP), 1) for side in size)
+
+    def _count_render(self, instruction):
+        self.renders += 1
@@ -0,0 +1,238 @@
+"""
+study_archive.py
+
+Tiered storage for old study history. StudyData keeps recent days "hot" at
+daily granularity in evergreen_data.json; whole months older than the
+retention window are moved into compressed archive segments:
+
+    evergreen_archive/
+        manifest.json      monthly + weekly rollups, one summary per month
+        2021-03.json.gz    daily hours of March 2021
+
+Totals, weekly and monthly figures are answered from the manifest alone.
+Each month also stores a (days, hours, lead, trail, best) streak summary
+(see study_index.py), so streaks stay exact across tiers. A segment is only
+decompressed when a query needs single days inside an archived month.
+"""
+
+import calendar
+import gzip
+import json
+import os
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from core.study_index import EMPTY_DAY, NO_DAYS, combine, leaf
+
+ARCHIVE_DIR = "evergreen_archive"
+
+
+class RetentionPolicy:
+    """
+    How much history stays hot. Whole months ending more than hot_days ago
+    are archived.
+    """
+
+    def __init__(self, hot_days=365):
+        self.hot_days = hot_days
+
+    def hot_start(self, today=None):
+        """First day that stays hot: start of the month hot_days ago."""
+        cutoff = (today or date.today()) - timedelta(days=self.hot_days)
+        return cutoff.replace(day=1)
+
+
+class StudyArchive:
+    """
+    Archived months of study history plus their rollups.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR, cache_size=12):
+        self.directory = directory
+        self.cache_size = cache_size
+        # month -> {"summary": [days, hours, lead, trail, best]}
+        self.months = {}
+        # ISO week ("2021-W09") -> archived hours in that week
+        self.weeks = {}
+        # Recently decompressed segments, month -> {date_str: hours}
+        self._segments = OrderedDict()
+        self._chain = None
+        self._load_manifest()
+
+    # ----- rollups (no segment loads) ------------------------------------
+
+    def has_month(self, month):
+        return month in self.months
+
+    def total(self):
+        """Hours over everything archived."""
+        return sum(entry["summary"][1] for entry in self.months.values())
+
+    def month_total(self, month):
+        """Hours in one archived month ("YYYY-MM")."""
+        entry = self.months.get(month)
+        return entry["summary"][1] if entry else 0.0
+
+    def week_total(self, day):
+        """Archived hours in the ISO week containing 'day'."""
+        return self.weeks.get(_week_key(day), 0.0)
+
+    def summary(self):
+        """
+        (summary, last ordinal) over all archived months in order, where
+        summary is a study_index streak summary and gaps between months count
+        as empty days. Cached until the archive changes.
+        """
+        if self._chain is None:
+            chain = NO_DAYS
+            previous_end = None
+            for month in sorted(self.months):
+                first, last = _month_bounds(month)
+                if previous_end is not None and first.toordinal() > previous_end + 1:
+                    chain = combine(chain, EMPTY_DAY)
+                chain = combine(chain, tuple(self.months[month]["summary"]))
+                previous_end = last.toordinal()
+            self._chain = (chain, previous_end)
+        return self._chain
+
+    def range_total(self, start_day, end_day):
+        """
+        Archived hours between two dates (inclusive). Months fully inside
+        the range come from the rollups; only edge months are decompressed.
+        """
+        total = 0.0
+        for month, entry in self.months.items():
+            first, last = _month_bounds(month)
+            if last < start_day or first > end_day:
+                continue
+            if start_day <= first and last <= end_day:
+                total += entry["summary"][1]
+                continue
+            start_str, end_str = start_day.isoformat(), end_day.isoformat()
+            total += sum(
+                hours for day, hours in self.segment(month).items()
+                if start_str <= day <= end_str
+            )
+        return total
+
+    # ----- segments -------------------------------------------------------
+
+    def segment(self, month):
+        """Daily hours of one archived month, decompressed on demand."""
+        if month in self._segments:
+            self._segments.move_to_end(month)
+            return self._segments[month]
+        if month not in self.months:
+            return {}
+        with gzip.open(self._segment_path(month), "rt") as f:
+            days = json.load(f)
+        self._cache(month, days)
+        return days
+
+    def all_days(self):
+        """
+        Every archived {date_str: hours}. Reads the segment files rather
+        than the cache, so it is safe to call from another thread.
+        """
+        days = {}
+        for month in list(self.months):
+            try:
+                with gzip.open(self._segment_path(month), "rt") as f:
+                    days.update(json.load(f))
+            except Exception as e:
+                print("Error reading archive segment:", e)
+        return days
+
+    def hours_for_day(self, date_str):
+        return self.segment(date_str[:7]).get(date_str, 0.0)
+
+    def store_month(self, month, days):
+        """
+        Merge {date_str: hours} of one month into its segment and update the
+        rollups. Segment and manifest are on disk when this returns, so the
+        caller may then drop the days from the hot tier.
+        """
+        old_days = self.segment(month)
+        merged = dict(old_days)
+        merged.update(days)
+        os.makedirs(self.directory, exist_ok=True)
+
+        path = self._segment_path(month)
+        tmp_file = path + ".tmp"
+        with gzip.open(tmp_file, "wt") as f:
+            json.dump(merged, f)
+        os.replace(tmp_file, path)
+
+        for week, hours in _week_totals(old_days).items():
+            self.weeks[week] = self.weeks.get(week, 0.0) - hours
+        for week, hours in _week_totals(merged).items():
+            self.weeks[week] = self.weeks.get(week, 0.0) + hours
+
+        self.months[month] = {"summary": list(_summarize_month(month, merged))}
+        self._cache(month, merged)
+        self._chain = None
+        self._save_manifest()
+
+    def set_hours(self, date_str, hours):
+        """Change one archived day (e.g. a late edit to old history)."""
+        self.store_month(date_str[:7], {date_str: hours})
+
+    # ----- persistence ----------------------------------------------------
+
+    def _segment_path(self, month):
+        return os.path.join(self.directory, f"{month}.json.gz")
+
+    def _cache(self, month, days):
+        self._segments[month] = days
+        self._segments.move_to_end(month)
+        while len(self._segments) > self.cache_size:
+            self._segments.popitem(last=False)
+
+    def _load_manifest(self):
+        path = os.path.join(self.directory, "manifest.json")
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r") as f:
+                manifest = json.load(f)
+            self.months = manifest.get("months", {})
+            self.weeks = manifest.get("weeks", {})
+        except Exception as e:
+            print("Error loading archive manifest:", e)
+
+    def _save_manifest(self):
+        path = os.path.join(self.directory, "manifest.json")
+        tmp_file = path + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({"months": self.months, "weeks": self.weeks}, f, indent=4)
+        os.replace(tmp_file, path)
+
+
+def _month_bounds(month):
+    year, month_number = int(month[:4]), int(month[5:7])
+    last_day = calendar.monthrange(year, month_number)[1]
+    return date(year, month_number, 1), date(year, month_number, last_day)
+
+
+def _week_key(day):
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _week_totals(days):
+    totals = {}
+    for date_str, hours in days.items():
+        key = _week_key(date.fromisoformat(date_str))
+        totals[key] = totals.get(key, 0.0) + hours
+    return totals
+
+
+def _summarize_month(month, days):
+    """Streak summary of a whole month, empty days included."""
+    first, last = _month_bounds(month)
+    summary = NO_DAYS
+    day = first
+    while day <= last:
+        summary = combine(summary, leaf(days.get(day.isoformat(), 0.0)))
+        day += timedelta(days=1)
+    return summary
@@ -0,0 +1,409 @@
+"""
+study_backup.py
+
+Incremental backups of StudyData to a local directory. Instead of copying
+the whole evergreen_data.json every time, each backup is a small delta with
+only the days and tasks changed since the previous one:
+
+    evergreen_backups/
+        manifest.jsonl        one line per backup, oldest first
+        chunks/3f/3fa2...     zlib-compressed JSON delta, named by its SHA-256
+
+The first backup (and the result of a prune) is a full "base" chunk; every
+later one only holds changes. Restoring to a point in time replays the
+chunks in manifest order up to that time. Identical deltas share one chunk.
+
+Backups are written by a background thread, at most once per min_interval
+seconds; changes made in between are folded into the next delta. Those
+pending changes only live in memory, so on start the thread compares the
+data with the latest restore point and queues whatever a crash or kill
+inside the throttle window kept out of the backups.
+
+That comparison is cheap in the common case: every manifest entry carries
+a digest of the whole backed-up state (an order-independent sum of one
+hash per day / task, updated per delta from an in-memory copy of that
+state), so start-up only hashes the live data. The chunks are read back
+(restore()) only when the digests differ. Once the manifest holds more
+than 2 * keep entries the oldest are pruned into a new base.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+BACKUP_DIR = "evergreen_backups"
+# State digests are sums of 64-bit item hashes modulo this
+DIGEST_MOD = 1 << 64
+
+
+class StudyBackup:
+    """
+    Delta backup writer fed with StudyData mutation records.
+
+    Counters (read them any time, e.g. for debugging):
+      - backups:       manifest entries written
+      - bytes_written: chunk + manifest bytes written by this process
+      - restores:      full replays of the chunks (restore() calls)
+      - prunes:        manifest rewrites by prune()
+    """
+
+    def __init__(self, directory=BACKUP_DIR, min_interval=60.0, keep=30):
+        self.directory = directory
+        self.min_interval = min_interval
+        # Restore points kept by the automatic prune (None: never prune)
+        self.keep = keep
+        self.manifest_path = os.path.join(directory, "manifest.jsonl")
+
+        self.backups = 0
+        self.bytes_written = 0
+        self.restores = 0
+        self.prunes = 0
+
+        self._cond = threading.Condition()
+        # Changes since the last backup: {"study_hours": {...}, "tasks_completed": {...}}
+        self._changes = _empty_delta()
+        self._base_fn = None
+        self._busy = False
+        self._flush_requested = False
+        self._last_backup = 0.0
+        self._thread = None
+        # The latest backed-up state (plain dicts) and its digest; None
+        # until known, and then manifest entries are written without one
+        self._backed_up = None
+        self._digest = None
+        self._entry_count = 0
+
+    def start(self, base_fn):
+        """
+        Start the backup thread. base_fn returns the full data as plain
+        dicts (archived months included); it is called once, on the backup
+        thread: to write the first base chunk if there is no backup yet,
+        or else to catch the backups up with the data (see _catch_up).
+        """
+        self._base_fn = base_fn
+        self._thread = threading.Thread(target=self._run, name="StudyBackup", daemon=True)
+        self._thread.start()
+
+    def record(self, record):
+        """Note one mutation record for the next delta (cheap, UI thread)."""
+        op = record.get("op")
+        with self._cond:
+            if op == "hours":
+                self._changes["study_hours"][record["date"]] = record["hours"]
+            elif op == "task":
+                self._changes["tasks_completed"][record["id"]] = True
+            else:
+                # Archiving and sessions don't change the backed-up history
+                return
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Write pending changes now, ignoring the throttle, and wait for it.
+        Returns False if the timeout expired first.
+        """
+        with self._cond:
+            if self._thread is None:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: not self._flush_requested and not self._busy, timeout
+            )
+
+    # ----- reading ----------------------------------------------------------
+
+    def entries(self):
+        """Manifest entries, oldest first."""
+        if not os.path.exists(self.manifest_path):
+            return []
+        entries = []
+        with open(self.manifest_path, "r") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue  # torn line from a crash mid-append
+        return entries
+
+    def restore(self, until=None):
+        """
+        Data as it was at unix time 'until' (default: latest backup), in the
+        same shape as evergreen_data.json.
+        """
+        self.restores += 1
+        entries = self.entries()
+        if until is not None:
+            entries = [entry for entry in entries if entry["time"] <= until]
+        data = self._replay(entries)
+        data["total_hours"] = sum(data["study_hours"].values())
+        return data
+
+    def _replay(self, entries):
+        """Days and tasks after applying the chunks of 'entries' in order."""
+        data = _empty_delta()
+        for entry in entries:
+            delta = self._read_chunk(entry["chunk"])
+            data["study_hours"].update(delta["study_hours"])
+            data["tasks_completed"].update(delta["tasks_completed"])
+        return data
+
+    def verify(self):
+        """
+        Check that every chunk in the manifest exists, matches its hash and
+        decompresses. Returns the list of broken entries (empty if all good).
+        """
+        broken = []
+        for entry in self.entries():
+            try:
+                self._read_chunk(entry["chunk"])
+            except Exception as e:
+                print("Error verifying backup:", e)
+                broken.append(entry)
+        return broken
+
+    def prune(self, keep=30):
+        """
+        Keep only the last 'keep' backups as restore points: the older ones
+        are folded into a single base chunk, and chunks nobody references
+        any more are deleted.
+        """
+        with self._cond:
+            # The backup thread must not append while the manifest is rewritten
+            self._cond.wait_for(lambda: not self._busy)
+            self._busy = True
+        try:
+            self._prune(keep)
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _prune(self, keep):
+        """prune() for a caller that already holds the manifest (_busy)."""
+        entries = self.entries()
+        self._entry_count = len(entries)
+        if len(entries) <= keep + 1:
+            return
+        folded = entries[:len(entries) - keep]
+        # By position, not time: backups can share a timestamp
+        base = self._replay(folded)
+        base_entry = self._write_chunk(base, folded[-1]["time"], full=True,
+                                       digest=folded[-1].get("digest"))
+
+        kept = [base_entry] + entries[len(entries) - keep:]
+        tmp_file = self.manifest_path + ".tmp"
+        with open(tmp_file, "w") as f:
+            for entry in kept:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_file, self.manifest_path)
+        self._entry_count = len(kept)
+        self.prunes += 1
+
+        unused = {entry["chunk"] for entry in folded} - {entry["chunk"] for entry in kept}
+        for chunk in unused:
+            try:
+                os.remove(self._chunk_path(chunk))
+            except OSError:
+                pass
+
+    # ----- writing ----------------------------------------------------------
+
+    def _run(self):
+        with self._cond:
+            self._busy = True
+        try:
+            if os.path.exists(self.manifest_path):
+                self._catch_up()
+                self._prune_if_needed()
+        except Exception as e:
+            print("Error checking backup:", e)
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+        while True:
+            with self._cond:
+                # Throttle: wait for changes and for min_interval to pass
+                while True:
+                    if self._busy:
+                        self._cond.wait()  # a prune is rewriting the manifest
+                        continue
+                    has_changes = self._changes["study_hours"] or self._changes["tasks_completed"]
+                    if self._flush_requested:
+                        break
+                    if has_changes:
+                        remaining = self._last_backup + self.min_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                changes, self._changes = self._changes, _empty_delta()
+                self._busy = True
+
+            try:
+                if not os.path.exists(self.manifest_path):
+                    # First backup ever: a full base instead of a delta
+                    self._backed_up = _empty_delta()
+                    self._digest = 0
+                    self._append(self._base_fn(), full=True)
+                elif changes["study_hours"] or changes["tasks_completed"]:
+                    self._append(changes, full=False)
+                self._prune_if_needed()
+            except Exception as e:
+                print("Error writing backup:", e)
+            finally:
+                with self._cond:
+                    self._last_backup = time.monotonic()
+                    self._busy = False
+                    self._flush_requested = False
+                    self._cond.notify_all()
+
+    def _catch_up(self):
+        """
+        Queue the days and tasks where the data differs from the latest
+        restore point, i.e. changes recorded by an earlier run that never
+        made it into a backup. They go out as the next delta right away.
+        If the digest of the data matches the latest entry's, nothing is
+        missing and the chunks are not read at all.
+        """
+        data = _plain_state(self._base_fn())
+        digest = _state_digest(data)
+        latest = self.entries()
+        self._entry_count = len(latest)
+        if latest and latest[-1].get("digest") == _digest_hex(digest):
+            self._backed_up = data
+            self._digest = digest
+            return
+
+        backed_up = self.restore()
+        del backed_up["total_hours"]
+        self._backed_up = _plain_state(backed_up)
+        self._digest = _state_digest(self._backed_up)
+        with self._cond:
+            for date_str, hours in data["study_hours"].items():
+                if self._backed_up["study_hours"].get(date_str) != hours:
+                    # A change recorded since base_fn() ran is newer
+                    self._changes["study_hours"].setdefault(date_str, hours)
+            for task_id in data["tasks_completed"]:
+                if task_id not in self._backed_up["tasks_completed"]:
+                    self._changes["tasks_completed"][task_id] = True
+            missing = self._changes["study_hours"] or self._changes["tasks_completed"]
+        if not missing and latest:
+            # Up to date but the latest entry has no digest (written by an
+            # older version): add an empty delta carrying one, so the next
+            # start takes the fast path
+            self._append(_empty_delta(), full=False)
+
+    def _prune_if_needed(self):
+        # Pruning folds 'keep' entries at a time, so its cost is spread
+        # over as many backups
+        if self.keep is not None and self._entry_count > 2 * self.keep:
+            self._prune(self.keep)
+
+    def _append(self, delta, full):
+        delta = _plain_state(delta)
+        digest = None
+        if self._backed_up is not None:
+            digest = _advance_digest(self._digest, self._backed_up, delta)
+        entry = self._write_chunk(delta, time.time(), full,
+                                  digest=None if digest is None else _digest_hex(digest))
+        line = json.dumps(entry) + "\n"
+        with open(self.manifest_path, "a") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self.bytes_written += len(line)
+        self.backups += 1
+        self._entry_count += 1
+        if self._backed_up is not None:
+            self._backed_up["study_hours"].update(delta["study_hours"])
+            self._backed_up["tasks_completed"].update(delta["tasks_completed"])
+            self._digest = digest
+
+    def _write_chunk(self, delta, when, full, digest=None):
+        """Store one delta (content-addressed) and return its manifest entry."""
+        delta = {
+            "study_hours": delta.get("study_hours", {}),
+            "tasks_completed": delta.get("tasks_completed", {}),
+        }
+        payload = zlib.compress(json.dumps(delta, sort_keys=True).encode("utf-8"))
+        chunk = hashlib.sha256(payload).hexdigest()
+        path = self._chunk_path(chunk)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_file = path + ".tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, path)
+            self.bytes_written += len(payload)
+        return {
+            "time": when,
+            "chunk": chunk,
+            "full": full,
+            "days": len(delta["study_hours"]),
+            "tasks": len(delta["tasks_completed"]),
+            # Digest of the whole state restored up to this entry
+            "digest": digest,
+        }
+
+    def _read_chunk(self, chunk):
+        with open(self._chunk_path(chunk), "rb") as f:
+            payload = f.read()
+        if hashlib.sha256(payload).hexdigest() != chunk:
+            raise ValueError(f"backup chunk {chunk} is corrupt")
+        return json.loads(zlib.decompress(payload))
+
+    def _chunk_path(self, chunk):
+        return os.path.join(self.directory, "chunks", chunk[:2], chunk)
+
+
+def _empty_delta():
+    return {"study_hours": {}, "tasks_completed": {}}
+
+
+def _plain_state(data):
+    """Days and completed tasks of 'data', normalized for hashing."""
+    return {
+        "study_hours": {d: float(h) for d, h in data.get("study_hours", {}).items()},
+        "tasks_completed": {t: True for t, done in data.get("tasks_completed", {}).items() if done},
+    }
+
+
+def _item_hash(kind, key, value):
+    digest = hashlib.sha256(json.dumps([kind, key, value]).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def _state_digest(state):
+    """Order-independent digest of a _plain_state(), as an int."""
+    total = 0
+    for date_str, hours in state["study_hours"].items():
+        total += _item_hash("hours", date_str, hours)
+    for task_id in state["tasks_completed"]:
+        total += _item_hash("task", task_id, True)
+    return total % DIGEST_MOD
+
+
+def _advance_digest(digest, state, delta):
+    """Digest of 'state' once 'delta' is applied, in O(len(delta))."""
+    for date_str, hours in delta["study_hours"].items():
+        old = state["study_hours"].get(date_str)
+        if old is not None:
+            digest -= _item_hash("hours", date_str, old)
+        digest += _item_hash("hours", date_str, hours)
+    for task_id in delta["tasks_completed"]:
+        if task_id not in state["tasks_completed"]:
+            digest += _item_hash("task", task_id, True)
+    return digest % DIGEST_MOD
+
+
+def _digest_hex(digest):
+    return format(digest, "016x")
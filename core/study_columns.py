@@ -0,0 +1,208 @@
+"""
+study_columns.py
+
+Optional columnar store for long study histories. Study hours and task
+completion counts are kept as fixed-width arrays indexed by day ordinal in
+memory-mapped files, so range queries are plain slices: no ISO-string
+parsing, no dict walking, no copies.
+
+Views are memoryviews over the mapped file. They can be summed directly, or
+wrapped zero-copy with numpy.frombuffer(view, dtype="f8") by analytics code
+that has NumPy available.
+"""
+
+import mmap
+import os
+import struct
+from datetime import date
+
+# magic, base day ordinal, length (days in use), capacity (days allocated)
+HEADER = struct.Struct("<8sqqq")
+MAGIC = b"EGCOL\x01\x00\x00"
+
+# Room for ~11 years before the first growth; files stay sparse until used
+INITIAL_CAPACITY = 4096
+
+HOURS_FILE = "evergreen_hours.col"
+TASKS_FILE = "evergreen_tasks.col"
+
+
+class _Column:
+    """One memory-mapped array ('d' or 'i' typecode) indexed by day ordinal."""
+
+    def __init__(self, path, typecode):
+        self.path = path
+        self.typecode = typecode
+        self.itemsize = struct.calcsize(typecode)
+
+        is_new = not os.path.exists(path) or os.path.getsize(path) < HEADER.size
+        self._file = open(path, "w+b" if is_new else "r+b")
+        if is_new:
+            self._file.write(HEADER.pack(MAGIC, 0, 0, INITIAL_CAPACITY))
+            self._file.truncate(HEADER.size + INITIAL_CAPACITY * self.itemsize)
+            self._file.flush()
+
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.base, self.length, self.capacity = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a study column file")
+
+    def view(self, start=0, stop=None):
+        """Zero-copy view of slots [start, stop) relative to base."""
+        stop = self.length if stop is None else stop
+        offset = HEADER.size
+        return memoryview(self._map)[offset:offset + self.length * self.itemsize] \
+            .cast(self.typecode)[start:stop]
+
+    def ensure(self, ordinal):
+        """Make sure 'ordinal' has a slot, growing the file if needed."""
+        if self.length == 0:
+            self.base = ordinal
+        elif ordinal < self.base:
+            self._prepend(self.base - ordinal)
+
+        index = ordinal - self.base
+        if index >= self.capacity:
+            self._grow(max(index + 1, self.capacity * 2))
+        if index >= self.length:
+            self.length = index + 1
+        self._write_header()
+        return index
+
+    def get(self, index):
+        return struct.unpack_from(self.typecode, self._map, HEADER.size + index * self.itemsize)[0]
+
+    def put(self, index, value):
+        struct.pack_into(self.typecode, self._map, HEADER.size + index * self.itemsize, value)
+
+    def _grow(self, capacity):
+        # Grows in place: extend the file and map it again. Views handed out
+        # earlier keep the old mapping alive and stay valid for their range.
+        self._file.truncate(HEADER.size + capacity * self.itemsize)
+        old_map = self._map
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        try:
+            old_map.close()
+        except BufferError:
+            pass
+        self.capacity = capacity
+
+    def _prepend(self, shift):
+        # Rare: a day older than anything stored. Slide the data up.
+        if self.length + shift > self.capacity:
+            self._grow(max(self.length + shift, self.capacity * 2))
+        start = HEADER.size
+        size = self.length * self.itemsize
+        self._map.move(start + shift * self.itemsize, start, size)
+        self._map[start:start + shift * self.itemsize] = bytes(shift * self.itemsize)
+        self.base -= shift
+        self.length += shift
+
+    def _write_header(self):
+        HEADER.pack_into(self._map, 0, MAGIC, self.base, self.length, self.capacity)
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        self.flush()
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+
+class StudyColumns:
+    """
+    Study hours (float64) and completed-task counts (int32) per day, kept
+    in two aligned memory-mapped columns: both share one base ordinal and
+    length, so slot i of either is the same day. StudyData keeps it in sync.
+    """
+
+    def __init__(self, hours_file=HOURS_FILE, tasks_file=TASKS_FILE):
+        self.hours = _Column(hours_file, "d")
+        self.tasks = _Column(tasks_file, "i")
+        self._columns = (self.hours, self.tasks)
+        self._align()
+
+    @property
+    def base(self):
+        """Day ordinal of slot 0 in both columns."""
+        return self.hours.base
+
+    def set_hours(self, date_str, hours):
+        ordinal = date.fromisoformat(date_str).toordinal()
+        self.hours.put(self._ensure(ordinal), hours)
+
+    def sync_hours(self, study_hours):
+        """Bulk-load a {date_str: hours} dict (idempotent)."""
+        for date_str, hours in study_hours.items():
+            self.set_hours(date_str, hours)
+
+    def add_completed_task(self, day=None):
+        """Count one completed task on 'day' (a date, defaults to today)."""
+        ordinal = (day or date.today()).toordinal()
+        index = self._ensure(ordinal)
+        self.tasks.put(index, self.tasks.get(index) + 1)
+
+    def hours_view(self, start_day, end_day):
+        """Zero-copy view of daily hours for dates in [start_day, end_day]."""
+        return self._range_view(self.hours, start_day, end_day)
+
+    def tasks_view(self, start_day, end_day):
+        """Zero-copy view of daily completed-task counts in [start_day, end_day]."""
+        return self._range_view(self.tasks, start_day, end_day)
+
+    def total_hours(self, start_day, end_day):
+        return sum(self.hours_view(start_day, end_day))
+
+    def rolling_hours(self, window, start_day, end_day):
+        """
+        Sum of hours over a sliding window of 'window' days, one value per
+        day in [start_day, end_day] (days before the range count as zero).
+        """
+        values = self.hours_view(start_day, end_day)
+        sums = []
+        running = 0.0
+        for i, value in enumerate(values):
+            running += value
+            if i >= window:
+                running -= values[i - window]
+            sums.append(running)
+        return sums
+
+    def _ensure(self, ordinal):
+        """Slot of 'ordinal' in both columns (re-basing them together)."""
+        index = None
+        for column in self._columns:
+            index = column.ensure(ordinal)
+        return index
+
+    def _align(self):
+        # Files written before the columns shared a base may each have
+        # their own; widen both to cover the union of their ranges
+        used = [column for column in self._columns if column.length]
+        if not used:
+            return
+        first = min(column.base for column in used)
+        last = max(column.base + column.length - 1 for column in used)
+        for column in self._columns:
+            column.ensure(first)
+            column.ensure(last)
+
+    def _range_view(self, column, start_day, end_day):
+        # Days outside the stored range simply do not appear in the view
+        start = max(start_day.toordinal() - column.base, 0)
+        stop = min(end_day.toordinal() - column.base + 1, column.length)
+        if column.length == 0 or stop <= start:
+            return memoryview(b"").cast(column.typecode)
+        return column.view(start, stop)
+
+    def flush(self):
+        self.hours.flush()
+        self.tasks.flush()
+
+    def close(self):
+        self.hours.close()
+        self.tasks.close()
@@ -1,39 +1,117 @@
 import json
 import os
-import threading
-from kivy.event import EventDispatcher
+from datetime import date
 from kivy.clock import Clock
+from kivy.event import EventDispatcher
+
+from core.clock import get_clock
+from core.data_file_watch import DataFileWatcher, FileLock, file_signature
+from core.persistent_map import PersistentMap
+from core.save_writer import CoalescingWriter
+from core.study_archive import StudyArchive
+from core.study_index import EMPTY_DAY, StudyIndex, combine
+from core.study_journal import StudyJournal
+from core.study_snapshot import SNAPSHOT_FILE, read_snapshot, write_snapshot
 
     
 DATA_FILE = "evergreen_data.json"
+JOURNAL_FILE = "evergreen_data.journal"
 
 class StudyData(EventDispatcher):
     """
     Subject that holds user data (nested dict) and notifies observers on changes.
+
+    The nested dicts are PersistentMaps: every change produces a new version
+    of _data that shares untouched structure with the old one. A version
+    handed out (to observers, or to the writer thread) never changes, so it
+    can be read from any thread without locks or copies.
+
+    With shared_file=True several processes may use the same JSON file:
+    writes happen under a FileLock, and changes written by another process
+    are picked up by a DataFileWatcher and merged in key by key.
     """
     __events__ = ("on_data_updated",)  # We'll fire 'on_data_updated' event
 
-    def __init__(self, **kwargs):
+    def __init__(self, use_journal=False, save_debounce=0.5, storage=None, columns=None,
+                 binary_snapshot=False, retention=None, archive=None, shared_file=False,
+                 backup=None, sync=None, clock=None, **kwargs):
         super().__init__(**kwargs)
+        # Time source for the minute counter (UI thread only; background
+        # threads hand over to the UI thread through kivy's Clock)
+        self.clock = clock or get_clock()
         self.current_minutes = 0  # initialize counter
         self._data = {
-            "study_hours": {},      # e.g. { "2023-09-01": 1.5, "2023-09-02": 2.0 }
-            "tasks_completed": {},  # e.g. { "task_id": True/False }
+            "study_hours": PersistentMap(),      # e.g. { "2023-09-01": 1.5, "2023-09-02": 2.0 }
+            "tasks_completed": PersistentMap(),  # e.g. { "task_id": True/False }
             "total_hours": 0.0,
         }
+        # Top-level keys touched by the last on_data_updated dispatch, so
+        # observers can skip work for changes they don't care about
+        self.changed_keys = set()
+        # Date index for range totals and streaks, rebuilt in load_data
+        self.index = StudyIndex()
+        # Optional storage backend (e.g. SqliteStorage). When set it replaces
+        # the JSON file: it loads the data and persists every mutation record
+        self.storage = storage
+        self.writer = None
+        self.journal = None
+        self.watcher = None
+        # Keys changed locally since the writer last took a snapshot; a merge
+        # of external changes never overwrites them
+        self._unsaved = set()
+        self._closing = False
+        # Also keep a binary snapshot next to the JSON for fast startup
+        self.binary_snapshot = binary_snapshot and storage is None
+        if self.storage is None:
+            # One long-lived writer; bursts of saves collapse into a single write
+            self.writer = CoalescingWriter(
+                DATA_FILE, self._snapshot_data, debounce=save_debounce,
+                post_write=self._after_write,
+                lock_factory=lambda: FileLock(DATA_FILE),
+                can_write=self._can_write if shared_file else None,
+            )
+            if shared_file:
+                # Other processes see the JSON file itself, so every change
+                # is written there directly (no journal in this mode)
+                self.watcher = DataFileWatcher(DATA_FILE, self._on_external_change)
+            # In journal mode every change is appended to JOURNAL_FILE and the
+            # JSON file is only rewritten when the journal gets compacted
+            elif use_journal:
+                self.journal = StudyJournal(JOURNAL_FILE, DATA_FILE)
+        # Optional StudyColumns mirror of the history for range analytics
+        self.columns = columns
+        # Optional RetentionPolicy: months older than the hot window move out
+        # of study_hours into a compressed StudyArchive (JSON storage only)
+        self.retention = retention if storage is None else None
+        self.archive = None
+        if self.retention is not None:
+            self.archive = archive or StudyArchive()
+        # Days before hot_start live in the archive (set in load_data)
+        self.hot_start = None
+        # Optional StudyBackup: every change also goes into the next delta
+        self.backup = backup
+        # Optional SyncClient replicating changes to other devices
+        self.sync = sync
         # Load existing data from JSON if available
         self.load_data()
+        if self.columns is not None:
+            self.columns.sync_hours(self._data["study_hours"])
+        if self.watcher is not None:
+            self.watcher.start()
+        if self.backup is not None:
+            self.backup.start(self._backup_data)
+        if self.sync is not None:
+            self.sync.start(self._plain_data, self._on_remote_records)
         
         # Schedule the timer ONCE here
-        Clock.schedule_interval(self.update_minutes, 60)
+        self.clock.schedule_interval(self.update_minutes, 60)
 
     def set_study_hours(self, date_str, hours):
         """
         Set hours for a specific date, update total, and notify.
         """
-        self._data["study_hours"][date_str] = hours
-        self._data["total_hours"] = sum(self._data["study_hours"].values())
-        self._async_save()  # Save in background
+        self._commit({"op": "hours", "date": date_str, "hours": hours})
+        self.changed_keys = {"study_hours", "total_hours"}
         self.dispatch("on_data_updated", self._data)
 
     def update_minutes(self, dt):
@@ -56,44 +134,430 @@ class StudyData(EventDispatcher):
         """
         Mark a task as completed.
         """
-        self._data["tasks_completed"][task_id] = True
-        self._async_save()
+        record = {"op": "task", "id": task_id}
+        self._count_completion(record)
+        self._commit(record)
+        self.changed_keys = {"tasks_completed"}
         self.dispatch("on_data_updated", self._data)
 
+    def _count_completion(self, record):
+        """
+        Count a task completion in the columns, once per task. Done here
+        (before the record is applied) rather than in _apply_record, so
+        journal replay does not count the same completion again on every
+        startup.
+        """
+        if self.columns is None or self._data["tasks_completed"].get(record["id"]):
+            return
+        day = date.fromisoformat(record["date"]) if "date" in record else None
+        self.columns.add_completed_task(day)
+
+    def record_session(self, start, end, laps, planned_hours):
+        """
+        Record one finished study session (start/end are unix timestamps).
+        The JSON file only keeps daily totals, so sessions are persisted
+        only when a storage backend is in use (and replicated if syncing).
+        """
+        if self.storage is None and self.sync is None:
+            return
+        self._commit({
+            "op": "session",
+            "date": date.fromtimestamp(start).isoformat(),
+            "start": start,
+            "end": end,
+            "laps": laps,
+            "planned_hours": planned_hours,
+        })
+
     def get_data(self):
-        """Return the entire data dictionary"""
+        """
+        Return the entire data dictionary (the current version).
+        Treat it as read-only; change data through StudyData's methods.
+        """
         return self._data
 
+    def hours_between(self, start_day, end_day):
+        """Study hours between two dates (both inclusive)."""
+        hours = self.index.range_total(start_day, end_day)
+        if self.archive is not None:
+            hours += self.archive.range_total(start_day, end_day)
+        return hours
+
+    def hours_this_week(self):
+        """Study hours in the current Monday-Sunday week."""
+        return self.index.week_total()
+
+    def current_streak(self):
+        """Consecutive days with study hours up to today."""
+        if self.archive is None:
+            return self.index.current_streak()
+        today = date.today().toordinal()
+        streak = self._tiered_summary(today)[3]
+        if streak == 0:
+            streak = self._tiered_summary(today - 1)[3]
+        return streak
+
+    def longest_streak(self):
+        """Most consecutive days with study hours ever."""
+        if self.archive is None:
+            return self.index.longest_streak()
+        return self._tiered_summary(None)[4]
+
+    def _tiered_summary(self, last):
+        """
+        Streak summary of archived months followed by the hot days up to
+        ordinal 'last' (None: all of them).
+        """
+        archived, archived_end = self.archive.summary()
+        hot_start = self.hot_start.toordinal()
+        if archived_end is not None and archived_end < hot_start - 1:
+            # Empty months between the archive and the hot tier
+            archived = combine(archived, EMPTY_DAY)
+        return combine(archived, self.index.summary(hot_start, last))
+
+    def _total_hours(self):
+        total = self.index.total()
+        if self.archive is not None:
+            total += self.archive.summary()[0][1]
+        return total
+
     def on_data_updated(self, updated_data):
         """
         Observer event. Observers can bind to this method.
         """
         pass
 
-    def _async_save(self):
+    def _apply_record(self, record):
         """
-        Save data in a background thread to avoid blocking UI.
+        Apply one mutation record, replacing _data with a new version.
+        Used both for live changes and for journal replay.
         """
-        def _worker(data_copy):
+        op = record.get("op")
+        data = self._data
+        if op == "hours":
+            if self.columns is not None:
+                self.columns.set_hours(record["date"], record["hours"])
+            if self.hot_start is not None and record["date"] < self.hot_start.isoformat():
+                # A late edit to archived history goes straight to the archive
+                self.archive.set_hours(record["date"], record["hours"])
+                self._data = dict(data, total_hours=self._total_hours())
+                return
+            study_hours = data["study_hours"].set(record["date"], record["hours"])
+            self.index.set(record["date"], record["hours"])
+            self._data = dict(data, study_hours=study_hours, total_hours=self._total_hours())
+        elif op == "task":
+            tasks_completed = data["tasks_completed"].set(record["id"], True)
+            self._data = dict(data, tasks_completed=tasks_completed)
+        elif op == "archive":
+            # The month is safely in the archive; drop it from the hot tier
+            study_hours = data["study_hours"]
+            for date_str in [d for d in study_hours if d.startswith(record["month"])]:
+                study_hours = study_hours.delete(date_str)
+            self._data = dict(data, study_hours=study_hours)
+
+    def _commit(self, record, replicate=True):
+        """
+        Apply a mutation and persist it: hand it to the storage backend,
+        append it to the journal if enabled, or else rewrite the JSON file
+        in the background. Local changes are also handed to sync.
+        """
+        self._apply_record(record)
+        if self.backup is not None:
+            self.backup.record(record)
+        if replicate and self.sync is not None:
+            self.sync.record(record)
+        if record["op"] == "session" and self.storage is None:
+            return  # nowhere to keep sessions locally
+        if self.storage is not None:
             try:
-                with open(DATA_FILE, "w") as f:
-                    json.dump(data_copy, f, indent=4)
+                self.storage.write(record)
             except Exception as e:
                 print("Error saving data:", e)
+            return
 
-        # Make a copy to avoid concurrency issues
-        data_copy = dict(self._data)
-        thread = threading.Thread(target=_worker, args=(data_copy,), daemon=True)
-        thread.start()
+        if self.journal is None:
+            self._unsaved.add(_record_key(record))
+            self._async_save()  # Save in background
+            return
 
-    def load_data(self):
+        try:
+            self.journal.append(record)
+        except Exception as e:
+            print("Error writing journal:", e)
+        if self.journal.needs_compaction():
+            # The snapshot is taken when the writer runs, so it holds every
+            # parked record; only then is the parked journal dropped
+            self.journal.rotate()
+            self._async_save(on_written=self.journal.drop_rotated)
+
+    def _on_remote_records(self, won):
+        """Sync-thread callback: apply changes pulled from other devices."""
+        # Which entries still win is only decided on the UI thread, after
+        # any local edit made since the sync
+        # Handed over on kivy's Clock, which is safe to call from another
+        # thread; the injected clock is only used from the UI thread
+        Clock.schedule_once(lambda dt: self.apply_remote(self.sync.current_records(won)))
+
+    def apply_remote(self, records):
+        """
+        Apply and persist mutation records that came from another device
+        (UI thread), then notify observers once.
+        """
+        changed_keys = set()
+        for record in records:
+            if record["op"] == "task":
+                self._count_completion(record)
+            self._commit(record, replicate=False)
+            if record["op"] == "hours":
+                changed_keys.update(("study_hours", "total_hours"))
+            elif record["op"] == "task":
+                changed_keys.add("tasks_completed")
+        if changed_keys:
+            self.changed_keys = changed_keys
+            self.dispatch("on_data_updated", self._data)
+
+    def _snapshot_data(self):
+        """
+        Plain-dict version of the data for json.dump. Called by the writer
+        thread: grabbing the current version is O(1) and that version is
+        never mutated, so it can be converted without holding up the UI.
+        """
+        # Everything changed so far is in this version; later changes are
+        # tracked again for the next save
+        self._unsaved = set()
+        return self._plain_data()
+
+    def _plain_data(self):
+        """Current version converted to plain dicts (safe from any thread)."""
+        data = self._data
+        return {
+            key: value.to_dict() if isinstance(value, PersistentMap) else value
+            for key, value in data.items()
+        }
+
+    def _backup_data(self):
+        """
+        Full history for backups (backup thread): the current version plus
+        the months retention has moved into the archive.
+        """
+        data = self._plain_data()
+        if self.archive is not None:
+            study_hours = self.archive.all_days()
+            study_hours.update(data["study_hours"])
+            data["study_hours"] = study_hours
+        return data
+
+    def _async_save(self, on_written=None):
+        """
+        Queue a save on the background writer to avoid blocking UI.
+        Saves requested in quick succession are written only once.
+        """
+        self.writer.request(on_written)
+
+    def flush(self, timeout=None):
+        """
+        Block until every queued save is on disk (used on app shutdown).
+        Returns False if the timeout expired first.
         """
-        Load nested dictionary from JSON if exists.
+        if self.columns is not None:
+            self.columns.flush()
+        if self.backup is not None:
+            self.backup.flush(timeout)
+        if self.sync is not None:
+            self.sync.stop()
+        if self.storage is not None:
+            return self.storage.flush(timeout)
+
+        if self.watcher is not None:
+            # Take in whatever another process wrote meanwhile, then let the
+            # final save through without waiting for the UI thread again
+            self._merge_now(timeout)
+            self.watcher.stop()
+            self._closing = True
+        flushed = self.writer.flush(timeout)
+        if self.journal is not None:
+            self.journal.close()
+        return flushed
+
+    def _after_write(self, data):
+        """
+        Writer-thread hook, run under the file lock after a JSON save:
+        remember our own version and refresh the binary snapshot.
         """
-        if os.path.exists(DATA_FILE):
+        if self.watcher is not None:
+            self.watcher.mark_known(file_signature(DATA_FILE))
+        if self.binary_snapshot:
             try:
+                write_snapshot(data, DATA_FILE, SNAPSHOT_FILE)
+            except Exception as e:
+                print("Error writing snapshot:", e)
+
+    def _can_write(self):
+        """
+        Writer-thread check, run under the file lock: only overwrite a
+        version of the file we have already merged.
+        """
+        return self._closing or self.watcher.is_current()
+
+    def _on_external_change(self, file_data, signature):
+        """
+        Watcher-thread callback with the parsed file of another process.
+        The diff against the current (immutable) version is done here; only
+        the changed records are applied on the UI thread.
+        """
+        records = self._diff_external(file_data)
+        # kivy's Clock, as for sync: this runs on the watcher thread
+        Clock.schedule_once(lambda dt: self._merge_external(records, signature))
+
+    def _diff_external(self, file_data):
+        """
+        Mutation records that turn our current version into file_data.
+
+        Only additions and changes are taken over; a day or task missing
+        from file_data is kept. Study data only ever grows (there is no
+        op to delete a day, and tasks are only ever completed), and the
+        other process may simply have moved old months to its archive.
+        """
+        data = self._data
+        records = []
+        study_hours = data["study_hours"]
+        for date_str, hours in file_data.get("study_hours", {}).items():
+            if study_hours.get(date_str) != hours:
+                records.append({"op": "hours", "date": date_str, "hours": hours})
+        tasks_completed = data["tasks_completed"]
+        for task_id, done in file_data.get("tasks_completed", {}).items():
+            if done and not tasks_completed.get(task_id):
+                records.append({"op": "task", "id": task_id})
+        return records
+
+    def _merge_external(self, records, signature):
+        """
+        Apply externally written records (UI thread). They are already on
+        disk, so nothing is persisted, except that our own unsaved changes
+        get written back on top of the merged file.
+        """
+        changed_keys = set()
+        for record in records:
+            if _record_key(record) in self._unsaved:
+                continue  # our newer local edit wins
+            self._apply_record(record)
+            if record["op"] == "hours":
+                changed_keys.update(("study_hours", "total_hours"))
+            else:
+                changed_keys.add("tasks_completed")
+        self.watcher.mark_known(signature)
+
+        if changed_keys:
+            self.changed_keys = changed_keys
+            self.dispatch("on_data_updated", self._data)
+        if self._unsaved:
+            self._async_save()
+
+    def _merge_now(self, timeout=None):
+        """
+        Synchronously merge an external change still on disk (shutdown).
+        The file is read and diffed on the watcher thread; only the
+        resulting records are applied here.
+        """
+        if self.watcher.is_current():
+            return
+        result = self.watcher.call(self._read_external, timeout)
+        if result is not None:
+            self._merge_external(*result)
+
+    def _read_external(self):
+        """Watcher thread: (records, signature) of the file on disk, or None."""
+        try:
+            with FileLock(DATA_FILE, shared=True):
+                signature = file_signature(DATA_FILE)
                 with open(DATA_FILE, "r") as f:
                     file_data = json.load(f)
-                self._data.update(file_data)
+        except Exception as e:
+            print("Error reading changed data file:", e)
+            return None
+        return self._diff_external(file_data), signature
+
+    def load_data(self):
+        """
+        Load nested dictionary from the storage backend, or else from the
+        binary snapshot (if enabled and up to date) or the JSON file, and
+        then replay the journal tail on top of it.
+        Finally rebuild the date index once for the loaded history.
+        """
+        if self.storage is not None:
+            try:
+                self._adopt(self.storage.load())
             except Exception as e:
-                print("Error loading data:", e)
\ No newline at end of file
+                print("Error loading data:", e)
+        else:
+            snapshot = None
+            if self.binary_snapshot:
+                snapshot = read_snapshot(DATA_FILE, SNAPSHOT_FILE)
+            if snapshot is not None:
+                self._adopt(snapshot)
+            elif os.path.exists(DATA_FILE):
+                try:
+                    with FileLock(DATA_FILE, shared=True):
+                        if self.watcher is not None:
+                            self.watcher.mark_known(file_signature(DATA_FILE))
+                        with open(DATA_FILE, "r") as f:
+                            file_data = json.load(f)
+                    self._adopt(file_data)
+                except Exception as e:
+                    print("Error loading data:", e)
+
+            if self.journal is not None:
+                try:
+                    self.journal.replay(self._apply_record)
+                except Exception as e:
+                    print("Error replaying journal:", e)
+
+        if self.retention is not None:
+            try:
+                self._apply_retention()
+            except Exception as e:
+                print("Error archiving data:", e)
+
+        try:
+            self.index.rebuild(self._data["study_hours"])
+        except Exception as e:
+            print("Error indexing data:", e)
+            self.index = StudyIndex()
+        self._data = dict(self._data, total_hours=self._total_hours())
+
+    def _apply_retention(self):
+        """
+        Move whole months older than the retention window into the archive.
+        Each month is written to its segment before it is dropped from
+        study_hours, so a crash in between only leaves a harmless duplicate.
+        """
+        self.hot_start = self.retention.hot_start()
+        cutoff = self.hot_start.isoformat()
+
+        old_months = {}
+        for date_str, hours in self._data["study_hours"].items():
+            if date_str < cutoff:
+                old_months.setdefault(date_str[:7], {})[date_str] = hours
+
+        for month in sorted(old_months):
+            self.archive.store_month(month, old_months[month])
+            self._commit({"op": "archive", "month": month})
+
+    def _adopt(self, loaded):
+        """
+        Make freshly loaded plain dicts the current version. The loaded
+        dicts become PersistentMap bases, so this does not copy them.
+        """
+        data = dict(self._data)
+        for key, value in loaded.items():
+            data[key] = PersistentMap(value) if isinstance(value, dict) else value
+        self._data = data
+
+
+def _record_key(record):
+    """What a mutation record changes, e.g. ("hours", "2023-09-01")."""
+    if record.get("op") == "hours":
+        return ("hours", record["date"])
+    if record.get("op") == "task":
+        return ("task", record["id"])
+    return (record.get("op"), record.get("month"))
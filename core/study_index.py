@@ -0,0 +1,170 @@
+"""
+study_index.py
+
+In-memory date index over daily study hours, kept inside StudyData.
+
+It is a segment tree over day ordinals: every node summarises its range of
+days as (days, hours, leading run, trailing run, best run), where a "run" is
+consecutive days with hours > 0. Updating one day and answering range totals
+or streaks are all O(log n), instead of rescanning the study_hours dict.
+"""
+
+from datetime import date, timedelta
+
+# (days, hours, leading run, trailing run, best run) of one empty day
+EMPTY_DAY = (1, 0.0, 0, 0, 0)
+# Identity for combine (covers zero days)
+NO_DAYS = (0, 0.0, 0, 0, 0)
+
+
+def leaf(hours):
+    """Summary of a single day."""
+    studied = 1 if hours > 0 else 0
+    return (1, hours, studied, studied, studied)
+
+
+def combine(left, right):
+    """Summary of two adjacent ranges, 'left' coming first in time."""
+    left_days, left_hours, left_lead, left_trail, left_best = left
+    right_days, right_hours, right_lead, right_trail, right_best = right
+    lead = left_days + right_lead if left_lead == left_days else left_lead
+    trail = right_days + left_trail if right_trail == right_days else right_trail
+    best = max(left_best, right_best, left_trail + right_lead)
+    return (left_days + right_days, left_hours + right_hours, lead, trail, best)
+
+
+class StudyIndex:
+    """
+    Incrementally maintained index answering:
+      - total() / range_total(start, end)
+      - longest_streak() / current_streak(today)
+      - week_total(day)
+    """
+
+    def __init__(self):
+        self.base = 0        # day ordinal stored in the first leaf
+        self.capacity = 0    # number of leaves (power of two)
+        self._tree = []
+
+    def rebuild(self, study_hours):
+        """Build the index from a {date_str: hours} dict (done once on load)."""
+        days = {date.fromisoformat(d).toordinal(): h for d, h in study_hours.items()}
+        if not days:
+            self.base, self.capacity, self._tree = 0, 0, []
+            return
+        self._build(min(days), max(days), days)
+
+    def set(self, date_str, hours):
+        """Set the hours of one day, growing the index if needed."""
+        ordinal = date.fromisoformat(date_str).toordinal()
+        if self.capacity == 0:
+            self._build(ordinal, ordinal, {ordinal: hours})
+            return
+        if not self.base <= ordinal < self.base + self.capacity:
+            days = self._stored_days()
+            days[ordinal] = hours
+            self._build(min(days), max(days), days)
+            return
+
+        i = self.capacity + ordinal - self.base
+        self._tree[i] = leaf(hours)
+        i //= 2
+        while i:
+            self._tree[i] = combine(self._tree[2 * i], self._tree[2 * i + 1])
+            i //= 2
+
+    def summary(self, first=None, last=None):
+        """
+        Raw (days, hours, lead, trail, best) summary of ordinals
+        [first, last]; defaults to everything in the index.
+        """
+        if first is None:
+            first = self.base
+        if last is None:
+            last = self.base + max(self.capacity, 1) - 1
+        return self._query(first, last)
+
+    def total(self):
+        """Hours over the whole history, O(1)."""
+        return self._tree[1][1] if self.capacity else 0.0
+
+    def range_total(self, start_day, end_day):
+        """Hours between two dates, both inclusive."""
+        return self._query(start_day.toordinal(), end_day.toordinal())[1]
+
+    def week_total(self, day=None):
+        """Hours in the Monday-Sunday week containing 'day' (default today)."""
+        day = day or date.today()
+        monday = day - timedelta(days=day.weekday())
+        return self.range_total(monday, monday + timedelta(days=6))
+
+    def longest_streak(self):
+        """Most consecutive days with study hours, O(1)."""
+        return self._tree[1][4] if self.capacity else 0
+
+    def current_streak(self, today=None):
+        """
+        Consecutive days with study hours ending today. If nothing has been
+        logged today yet, the streak ending yesterday still counts.
+        """
+        today = (today or date.today()).toordinal()
+        if self.capacity == 0:
+            return 0
+        streak = self._query(self.base, today)[3]
+        if streak == 0:
+            streak = self._query(self.base, today - 1)[3]
+        return streak
+
+    def _build(self, first, last, days):
+        span = last - first + 1
+        capacity = 1
+        # Leave room to keep adding days without rebuilding right away
+        while capacity < span * 2:
+            capacity *= 2
+        self.base = first
+        self.capacity = capacity
+
+        tree = [NO_DAYS] * capacity + [EMPTY_DAY] * capacity
+        for ordinal, hours in days.items():
+            tree[capacity + ordinal - first] = leaf(hours)
+        for i in range(capacity - 1, 0, -1):
+            tree[i] = combine(tree[2 * i], tree[2 * i + 1])
+        self._tree = tree
+
+    def _stored_days(self):
+        leaves = self._tree[self.capacity:]
+        return {self.base + i: leaf[1] for i, leaf in enumerate(leaves) if leaf[1]}
+
+    def _query(self, first, last):
+        """Summary of days [first, last] (ordinals, clamped to the index)."""
+        if last < first:
+            return NO_DAYS
+        if self.capacity == 0:
+            return EMPTY_DAY
+        lo = max(first, self.base) - self.base
+        hi = min(last, self.base + self.capacity - 1) - self.base
+        if hi < lo:
+            return EMPTY_DAY
+
+        # Classic bottom-up walk; left and right parts are kept apart because
+        # combine is order-sensitive
+        left_part, right_part = NO_DAYS, NO_DAYS
+        lo += self.capacity
+        hi += self.capacity + 1
+        while lo < hi:
+            if lo & 1:
+                left_part = combine(left_part, self._tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right_part = combine(self._tree[hi], right_part)
+            lo //= 2
+            hi //= 2
+        summary = combine(left_part, right_part)
+
+        # Days outside the index are empty days; they still break runs
+        if first < self.base:
+            summary = combine(EMPTY_DAY, summary)
+        if last >= self.base + self.capacity:
+            summary = combine(summary, EMPTY_DAY)
+        return summary
@@ -0,0 +1,127 @@
+"""
+study_journal.py
+
+Append-only journal used by StudyData. Instead of rewriting the whole
+evergreen_data.json on every change, each mutation is appended as one small
+JSON line. Once enough records pile up, the journal is folded back into the
+JSON snapshot by the background writer.
+"""
+
+import json
+import os
+
+
+class StudyJournal:
+    """
+    Keeps the journal file next to the JSON snapshot:
+      - append(record) writes one line per mutation
+      - replay(apply) feeds every stored record back to StudyData on startup
+      - rotate() / drop_rotated() bracket a compaction: the journal is parked,
+        the snapshot is rewritten, then the parked records are dropped
+    """
+
+    def __init__(self, journal_file, snapshot_file, compact_every=500):
+        self.journal_file = journal_file
+        self.snapshot_file = snapshot_file
+        # While a compaction is running the old journal is parked here
+        self.rotated_file = journal_file + ".old"
+        self.compact_every = compact_every
+
+        self.records_since_compact = 0
+        self._handle = None
+        self._compacting = False
+
+    def append(self, record):
+        """
+        Append one mutation record (a small dict) to the journal.
+        """
+        if self._handle is None:
+            self._handle = open(self.journal_file, "a")
+            if not _ends_with_newline(self.journal_file):
+                # Start after a torn last line, not glued onto it
+                self._handle.write("\n")
+        self._handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._handle.flush()
+        self.records_since_compact += 1
+
+    def replay(self, apply):
+        """
+        Call apply(record) for every record stored after the last snapshot.
+        A rotated journal left behind by an interrupted compaction is replayed
+        first; records only ever set values, so replaying twice is harmless.
+        """
+        count = 0
+        for path in (self.rotated_file, self.journal_file):
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn last line from a crash mid-append
+                        continue
+                    apply(record)
+                    count += 1
+        self.records_since_compact = count
+
+    def needs_compaction(self):
+        """True once the journal is long enough to be worth folding."""
+        return self.records_since_compact >= self.compact_every and not self._compacting
+
+    def rotate(self):
+        """
+        Start a compaction by parking the current journal.
+
+        New appends go to a fresh file, so nothing written while the snapshot
+        is being saved can be lost. The snapshot saved afterwards must contain
+        every parked record; call drop_rotated() once it is on disk.
+
+        If an interrupted compaction left a parked journal behind (it was
+        replayed on startup but is not in the snapshot yet), the current
+        journal is appended to it rather than replacing it.
+        """
+        self.close()
+        if os.path.exists(self.journal_file):
+            if os.path.exists(self.rotated_file):
+                with open(self.journal_file, "r") as src, open(self.rotated_file, "a") as dst:
+                    if not _ends_with_newline(self.rotated_file):
+                        dst.write("\n")
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                # A crash before this leaves records in both files, which
+                # replay() handles
+                os.remove(self.journal_file)
+            else:
+                os.replace(self.journal_file, self.rotated_file)
+        self.records_since_compact = 0
+        self._compacting = True
+
+    def drop_rotated(self):
+        """The snapshot now holds the parked records, so delete them."""
+        try:
+            if os.path.exists(self.rotated_file):
+                os.remove(self.rotated_file)
+        except Exception as e:
+            print("Error compacting journal:", e)
+        self._compacting = False
+
+    def close(self):
+        """Close the append handle (it is reopened lazily)."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def _ends_with_newline(path):
+    """True if the file is empty or its last byte is a newline."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+    except FileNotFoundError:
+        return True
@@ -0,0 +1,132 @@
+"""
+study_snapshot.py
+
+Optional binary snapshot of StudyData, written next to evergreen_data.json.
+Loading it is a single read plus a handful of C-level bulk conversions
+(array.frombytes, str.split), which is much cheaper than parsing the
+indented JSON on the UI thread at startup.
+
+Layout (little-endian):
+    header     magic, version, JSON mtime/size it was made from, counts,
+               section sizes, total hours and a CRC32 of the body
+    hours      day_count x float64
+    flags      task_count x uint8 (1 = completed)
+    dates      string table: ISO dates joined by "\\n", aligned with hours
+    task ids   string table: UTF-8 task ids joined by "\\0", aligned with flags
+    extras     JSON blob with any other top-level keys (usually tiny)
+
+The snapshot records the size and mtime of the JSON file it was written
+with. If the JSON changed since (or the snapshot is damaged), load returns
+None and StudyData falls back to the JSON file.
+"""
+
+import array
+import json
+import os
+import struct
+import sys
+import zlib
+
+SNAPSHOT_FILE = "evergreen_data.bin"
+
+MAGIC = b"EGSN"
+VERSION = 1
+
+# magic, version, flags, json mtime_ns, json size, day count, task count,
+# dates size, task ids size, extras size, total hours, body crc32
+HEADER = struct.Struct("<4sHHqqIIIIIdI")
+
+# Top-level keys stored in the packed sections rather than in extras
+_PACKED_KEYS = ("study_hours", "tasks_completed", "total_hours")
+
+
+def write_snapshot(data, json_path, snapshot_path=SNAPSHOT_FILE):
+    """
+    Write the binary snapshot for 'data', which must be exactly what was
+    just written to json_path.
+    """
+    study_hours = data.get("study_hours", {})
+    tasks = data.get("tasks_completed", {})
+    if any("\0" in task_id for task_id in tasks):
+        raise ValueError("task ids containing NUL cannot be stored in the snapshot")
+
+    hours = array.array("d", study_hours.values())
+    if sys.byteorder == "big":
+        hours.byteswap()
+    flags = bytes(1 if done else 0 for done in tasks.values())
+    dates = "\n".join(study_hours).encode("ascii")
+    task_ids = "\0".join(tasks).encode("utf-8")
+    extras = json.dumps({k: v for k, v in data.items() if k not in _PACKED_KEYS}).encode("utf-8")
+
+    body = hours.tobytes() + flags + dates + task_ids + extras
+    stat = os.stat(json_path)
+    header = HEADER.pack(
+        MAGIC, VERSION, 0, stat.st_mtime_ns, stat.st_size,
+        len(study_hours), len(tasks), len(dates), len(task_ids), len(extras),
+        data.get("total_hours", 0.0), zlib.crc32(body),
+    )
+
+    tmp_file = snapshot_path + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(header)
+        f.write(body)
+    os.replace(tmp_file, snapshot_path)
+
+
+def read_snapshot(json_path, snapshot_path=SNAPSHOT_FILE):
+    """
+    Return the data dict stored in the snapshot, or None if it is missing,
+    stale (the JSON file changed since) or corrupt.
+    """
+    try:
+        with open(snapshot_path, "rb") as f:
+            buf = f.read()
+        stat = os.stat(json_path)
+    except OSError:
+        return None
+
+    if len(buf) < HEADER.size:
+        return None
+    (magic, version, _flags, mtime_ns, size, day_count, task_count,
+     dates_size, task_ids_size, extras_size, total_hours, crc) = HEADER.unpack_from(buf)
+    if magic != MAGIC or version != VERSION:
+        return None
+    if mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+        return None
+
+    body = memoryview(buf)[HEADER.size:]
+    sizes = (day_count * 8, task_count, dates_size, task_ids_size, extras_size)
+    if len(body) != sum(sizes) or zlib.crc32(body) != crc:
+        return None
+
+    try:
+        data = _unpack_body(body, sizes, day_count, task_count)
+    except ValueError:
+        # Bad UTF-8, bad extras or misaligned tables: treat as corrupt
+        return None
+    data["total_hours"] = total_hours
+    return data
+
+
+def _unpack_body(body, sizes, day_count, task_count):
+    """Decode the sections after the header (total size already checked)."""
+    sections = []
+    offset = 0
+    for size in sizes:
+        sections.append(body[offset:offset + size])
+        offset += size
+    hours_raw, flags, dates_raw, task_ids_raw, extras = sections
+
+    hours = array.array("d")
+    hours.frombytes(hours_raw)
+    if sys.byteorder == "big":
+        hours.byteswap()
+    dates = str(dates_raw, "ascii").split("\n") if day_count else []
+    task_ids = str(task_ids_raw, "utf-8").split("\0") if task_count else []
+    if len(dates) != day_count or len(task_ids) != task_count:
+        raise ValueError("string table does not match the record count")
+
+    data = json.loads(str(extras, "utf-8"))
+    data["study_hours"] = dict(zip(dates, hours.tolist()))
+    data["tasks_completed"] = dict(zip(task_ids, map(bool, flags)))
+    return data
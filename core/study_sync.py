@@ -0,0 +1,401 @@
+"""
+study_sync.py
+
+Conflict-free sync of StudyData between devices through a sync server
+(see sync_server.py for the small bundled one).
+
+Every replicated fact is an entry keyed by what it describes:
+    "hours/2023-09-01"   last-writer-wins register with the day's hours
+    "task/<task id>"     grow-only set member (a completed task)
+    "session/<replica>:<start>"  grow-only set member (one study session)
+
+and stored as [value, stamp, replica, counter]. (stamp, replica) orders
+concurrent writes to one key; (replica, counter) is the entry's "dot". Each
+side keeps a version vector {replica: highest counter seen}, so a sync only
+exchanges entries whose dot the other side has not seen yet. Merging is
+commutative and idempotent, so devices converge whatever order they sync in.
+
+Pulled entries are applied to StudyData later, on the UI thread. By then a
+local edit may have replaced one of them, so current_records() re-checks
+each entry's dot against the sync state and drops the ones that lost.
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.request
+import uuid
+import zlib
+from datetime import date
+
+SYNC_STATE_FILE = "evergreen_sync.json"
+
+
+class SyncState:
+    """
+    Replicated entries plus version vector. Thread-safe: the UI thread adds
+    local entries while the sync thread merges.
+
+    Persisted as a JSON snapshot ('path') plus a log next to it: save()
+    appends one line with just the entries changed since the last save
+    (and the small vectors), and does nothing if nothing changed, so an
+    idle pull costs no disk write. Every compact_every saves the log is
+    folded back into the snapshot.
+    """
+
+    def __init__(self, path=SYNC_STATE_FILE, replica=None, compact_every=200):
+        self.path = path
+        self.log_path = path + ".log"
+        self.replica = replica
+        self.compact_every = compact_every
+        self.counter = 0
+        # key -> [value, stamp, replica, counter]
+        self.entries = {}
+        # replica -> highest counter merged from it
+        self.vector = {}
+        # Version vector of the server as of the last sync
+        self.peer_vector = {}
+        self.is_new = True
+        # Counters: snapshot rewrites and log lines written
+        self.snapshots = 0
+        self.appends = 0
+        self._last_stamp = 0.0
+        # Keys changed since the last save, and whether a vector changed
+        self._changed = set()
+        self._dirty = False
+        self._log_lines = 0
+        self._lock = threading.Lock()
+        # save() runs on the sync thread and from stop(); one at a time,
+        # as both write the same files
+        self._save_lock = threading.Lock()
+        self.load()
+        if self.replica is None:
+            self.replica = uuid.uuid4().hex
+            self._dirty = True
+
+    def local(self, key, value, stamp=None):
+        """Add (or overwrite) an entry written on this replica."""
+        with self._lock:
+            if stamp is None:
+                # Never go backwards, even if this device's clock is behind
+                stamp = max(time.time(), self._last_stamp + 1e-6)
+                self._last_stamp = stamp
+            self.counter += 1
+            self.vector[self.replica] = self.counter
+            self.entries[key] = [value, stamp, self.replica, self.counter]
+            self._changed.add(key)
+            self._dirty = True
+
+    def merge(self, entries):
+        """
+        Merge {key: entry} from another replica. Returns {key: entry} of the
+        entries that won, i.e. the changes the local data has to take over.
+        """
+        won = {}
+        with self._lock:
+            for key, entry in entries.items():
+                replica, counter = entry[2], entry[3]
+                if counter > self.vector.get(replica, 0):
+                    self.vector[replica] = counter
+                    self._dirty = True
+                current = self.entries.get(key)
+                if current is None or (entry[1], entry[2]) > (current[1], current[2]):
+                    self.entries[key] = entry
+                    won[key] = entry
+                    self._changed.add(key)
+                    self._dirty = True
+                self._last_stamp = max(self._last_stamp, entry[1])
+        return won
+
+    def set_peer_vector(self, vector):
+        """Remember the server's version vector after a sync."""
+        with self._lock:
+            if vector != self.peer_vector:
+                self.peer_vector = vector
+                self._dirty = True
+
+    def delta(self, vector):
+        """Entries the holder of 'vector' has not seen yet."""
+        with self._lock:
+            return {
+                key: entry for key, entry in self.entries.items()
+                if entry[3] > vector.get(entry[2], 0)
+            }
+
+    def is_current(self, key, entry):
+        """Whether 'entry' (by its dot) is still the winning entry for 'key'."""
+        with self._lock:
+            current = self.entries.get(key)
+            return current is not None and current[2:4] == entry[2:4]
+
+    def vector_copy(self):
+        with self._lock:
+            return dict(self.vector)
+
+    def load(self):
+        torn = False
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    self._apply_state(json.load(f))
+                self.is_new = False
+            if os.path.exists(self.log_path):
+                with open(self.log_path, "r") as f:
+                    for line in f:
+                        try:
+                            change = json.loads(line)
+                        except ValueError:
+                            # Torn last line from a crash mid-append
+                            torn = True
+                            continue
+                        self._apply_state(change)
+                        self._log_lines += 1
+                self.is_new = False
+            self._last_stamp = max((entry[1] for entry in self.entries.values()), default=0.0)
+        except Exception as e:
+            print("Error loading sync state:", e)
+            return
+        if torn:
+            # Start the next appends on a clean log
+            self._log_lines = self.compact_every
+
+    def save(self):
+        """Persist what changed since the last save (no-op if nothing did)."""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                compact = self._log_lines >= self.compact_every
+                state = {
+                    "replica": self.replica,
+                    "counter": self.counter,
+                    "vector": self.vector,
+                    "peer_vector": self.peer_vector,
+                }
+                if compact:
+                    state["entries"] = self.entries
+                else:
+                    state["entries"] = {key: self.entries[key] for key in self._changed}
+                payload = json.dumps(state)
+                self._changed = set()
+                self._dirty = False
+
+            if compact:
+                tmp_file = self.path + ".tmp"
+                with open(tmp_file, "w") as f:
+                    f.write(payload)
+                os.replace(tmp_file, self.path)
+                # Replaying an old log over the new snapshot is harmless
+                # (its last values are the snapshot's), so a crash here
+                # loses nothing
+                if os.path.exists(self.log_path):
+                    os.remove(self.log_path)
+                self._log_lines = 0
+                self.snapshots += 1
+            else:
+                with open(self.log_path, "a") as f:
+                    f.write(payload + "\n")
+                self._log_lines += 1
+                self.appends += 1
+            self.is_new = False
+
+    def _apply_state(self, state):
+        """Take over a snapshot or one log line."""
+        self.replica = state.get("replica", self.replica)
+        self.counter = state.get("counter", self.counter)
+        self.entries.update(state.get("entries", {}))
+        self.vector = state.get("vector", self.vector)
+        self.peer_vector = state.get("peer_vector", self.peer_vector)
+
+
+def record_entry(record):
+    """
+    (key, value) of the entry for a StudyData mutation record, or None.
+    Sessions get key None; the caller names them after its replica.
+    """
+    op = record.get("op")
+    if op == "hours":
+        return "hours/" + record["date"], record["hours"]
+    if op == "task":
+        return "task/" + record["id"], True
+    if op == "session":
+        value = {k: v for k, v in record.items() if k != "op"}
+        return None, value
+    return None  # archiving is local bookkeeping, not replicated
+
+
+def entry_record(key, entry):
+    """StudyData mutation record for a replicated entry."""
+    kind, _, name = key.partition("/")
+    if kind == "hours":
+        return {"op": "hours", "date": name, "hours": entry[0]}
+    if kind == "task":
+        record = {"op": "task", "id": name}
+        if entry[1] > 0:
+            # The day it was completed (seeded history has no real stamp)
+            record["date"] = date.fromtimestamp(entry[1]).isoformat()
+        return record
+    return dict(entry[0], op="session")
+
+
+def encode(payload):
+    return zlib.compress(json.dumps(payload).encode("utf-8"))
+
+
+def decode(body):
+    return json.loads(zlib.decompress(body))
+
+
+class SyncClient:
+    """
+    Background sync with a sync server. Local changes are batched: a sync
+    runs 'delay' seconds after the first unsynced change, and every
+    'interval' seconds anyway to pull changes made on other devices.
+
+    Counters: syncs, pushed, pulled, bytes_sent, bytes_received.
+    """
+
+    def __init__(self, url, state=None, interval=60.0, delay=5.0, timeout=10.0):
+        self.url = url.rstrip("/")
+        self.state = state or SyncState()
+        self.interval = interval
+        self.delay = delay
+        self.timeout = timeout
+
+        self.syncs = 0
+        self.pushed = 0
+        self.pulled = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+        self._cond = threading.Condition()
+        self._requested_at = None
+        self._stop = False
+        self._base_fn = None
+        self._on_remote = None
+        self._thread = None
+
+    def start(self, base_fn, on_remote):
+        """
+        Start syncing. base_fn returns the full local data (plain dicts) and
+        seeds a brand-new sync state; on_remote(won) is called from the
+        sync thread with the {key: entry} pulled from other devices that
+        won the merge (see current_records()).
+        """
+        self._base_fn = base_fn
+        self._on_remote = on_remote
+        self._thread = threading.Thread(target=self._run, name="StudySync", daemon=True)
+        self._thread.start()
+
+    def record(self, record):
+        """Replicate one local mutation record (cheap, UI thread)."""
+        entry = record_entry(record)
+        if entry is None:
+            return
+        key, value = entry
+        if key is None:
+            # Sessions are never edited; replica + start time names them
+            key = f"session/{self.state.replica}:{value['start']}"
+        self.state.local(key, value)
+        with self._cond:
+            if self._requested_at is None:
+                self._requested_at = time.monotonic()
+            self._cond.notify_all()
+
+    def request(self):
+        """Sync as soon as possible."""
+        with self._cond:
+            self._requested_at = time.monotonic() - self.delay
+            self._cond.notify_all()
+
+    def stop(self):
+        """Stop the sync thread and save the sync state."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        try:
+            self.state.save()
+        except Exception as e:
+            print("Error saving sync state:", e)
+
+    def current_records(self, won):
+        """
+        Mutation records for the pulled entries in 'won' that are still the
+        winning ones. Call it where the records are applied (UI thread):
+        a local edit made since the sync replaces the pulled entry, and the
+        older remote value must not overwrite it.
+        """
+        return [
+            entry_record(key, entry) for key, entry in won.items()
+            if self.state.is_current(key, entry)
+        ]
+
+    def sync_once(self):
+        """One push + pull round trip. Returns the pulled {key: entry} that won."""
+        push = self.state.delta(self.state.peer_vector)
+        body = encode({
+            "replica": self.state.replica,
+            "vector": self.state.vector_copy(),
+            "entries": push,
+        })
+        request = urllib.request.Request(
+            self.url + "/sync", data=body, method="POST",
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            reply_body = response.read()
+        reply = decode(reply_body)
+
+        won = self.state.merge(reply["entries"])
+        self.state.set_peer_vector(reply["vector"])
+        self.state.save()
+
+        self.syncs += 1
+        self.pushed += len(push)
+        self.pulled += len(reply["entries"])
+        self.bytes_sent += len(body)
+        self.bytes_received += len(reply_body)
+        return won
+
+    def _seed(self):
+        """Give history from before sync was enabled its entries."""
+        data = self._base_fn()
+        existing = set(self.state.entries)
+        # Stamp 0: any real edit on another device wins over seeded values
+        for date_str, hours in data.get("study_hours", {}).items():
+            if "hours/" + date_str not in existing:
+                self.state.local("hours/" + date_str, hours, stamp=0.0)
+        for task_id, done in data.get("tasks_completed", {}).items():
+            if done and "task/" + task_id not in existing:
+                self.state.local("task/" + task_id, True, stamp=0.0)
+        self.state.save()
+
+    def _run(self):
+        if self.state.is_new:
+            try:
+                self._seed()
+            except Exception as e:
+                print("Error seeding sync state:", e)
+        next_pull = time.monotonic()
+        while True:
+            with self._cond:
+                while not self._stop:
+                    now = time.monotonic()
+                    due = next_pull
+                    if self._requested_at is not None:
+                        due = min(due, self._requested_at + self.delay)
+                    if due <= now:
+                        break
+                    self._cond.wait(due - now)
+                if self._stop:
+                    return
+                self._requested_at = None
+
+            try:
+                won = self.sync_once()
+                if won:
+                    self._on_remote(won)
+            except Exception as e:
+                print("Error syncing data:", e)
+            next_pull = time.monotonic() + self.interval
@@ -0,0 +1,77 @@
+"""
+sync_server.py
+
+Small local stand-in for the Evergreen sync server. It keeps one SyncState
+(the merged entries of every device) and answers POST /sync:
+
+    request   zlib(JSON {"replica", "vector", "entries"})  - the device's delta
+    reply     zlib(JSON {"vector", "entries"})             - what it is missing
+
+Run it with:
+    python -m core.sync_server [--port 8765] [--state evergreen_sync_server.json]
+"""
+
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.study_sync import SyncState, decode, encode
+
+SERVER_STATE_FILE = "evergreen_sync_server.json"
+
+
+class SyncServer(ThreadingHTTPServer):
+    """HTTP server holding the merged SyncState of all devices."""
+
+    daemon_threads = True
+
+    def __init__(self, address, state_file=SERVER_STATE_FILE):
+        super().__init__(address, SyncHandler)
+        self.state = SyncState(state_file, replica="server")
+        self.lock = threading.Lock()
+
+    def handle_sync(self, payload):
+        with self.lock:
+            self.state.merge(payload.get("entries", {}))
+            reply = {
+                "entries": self.state.delta(payload.get("vector", {})),
+                "vector": self.state.vector_copy(),
+            }
+            self.state.save()
+        return reply
+
+
+class SyncHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path != "/sync":
+            self.send_error(404)
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = decode(self.rfile.read(length))
+        except Exception as e:
+            print("Error reading sync request:", e)
+            self.send_error(400)
+            return
+
+        body = encode(self.server.handle_sync(payload))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep the console quiet; errors are printed where they happen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local Evergreen sync server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--state", default=SERVER_STATE_FILE)
+    args = parser.parse_args()
+
+    server = SyncServer((args.host, args.port), args.state)
+    print(f"Sync server listening on http://{args.host}:{args.port}")
+    server.serve_forever()
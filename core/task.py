@@ -1,3 +1,6 @@
+import itertools
+
+
 class Task:
     """
     Task with priority levels: low, medium, high
@@ -12,7 +15,11 @@ class Task:
         PRIORITY_HIGH: "High"
     }
 
+    # Source of unique task ids (also the insertion order)
+    _ids = itertools.count(1)
+
     def __init__(self, title, priority=PRIORITY_MEDIUM):
+        self.id = next(Task._ids)
         self.title = title
         self.priority = priority  # 1=low, 2=medium, 3=high
         self.completed = False
@@ -24,6 +31,13 @@ class Task:
         # Reverse comparison so higher priority comes first
         return self.priority > other.priority
 
+    def sort_key(self):
+        """
+        Display order: higher priority first, then oldest first (the order
+        a stable sort by priority gave)
+        """
+        return (-self.priority, self.id)
+
     def complete(self):
         self.completed = True
         
@@ -31,4 +45,4 @@ class Task:
         return self.PRIORITY_LABELS.get(self.priority, "Medium")
 
     def __repr__(self):
-        return f"Task(title='{self.title}', priority={self.get_priority_label()}, completed={self.completed})"
\ No newline at end of file
+        return f"Task(id={self.id}, title='{self.title}', priority={self.get_priority_label()}, completed={self.completed})"
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""
+task_list_view.py
+
+Virtualized task list. TaskListView is a RecycleView over a TaskManager:
+only the rows that fit on screen exist, and they are recycled while
+scrolling. The view listens to the TaskManager and applies each change
+(TaskManager.last_change) as a keyed diff on its data instead of
+rebuilding the list:
+
+  - insert / remove: one entry goes in / out of the data at its index.
+    Rows are keyed by task: each existing row stays with its task at the
+    task's new index, so only rows for tasks new to the screen are
+    refreshed
+  - update (e.g. a completed task): the entry is replaced in place and
+    only the row showing that task is refreshed
+
+Rows are widgets using the TaskRow mixin and its set_task(view, task).
+
+Every row has the same height, so TaskRowLayout places rows by
+arithmetic: laying out or scrolling costs the same with 10 or 10,000
+tasks (RecycleBoxLayout walks every entry for both).
+
+TaskRowLayout overrides RecycleLayout internals (view_opts,
+_changed_views, the adapter's views / dirty_views), written against
+Kivy 2.2 (pinned in requirements.txt, covered by
+tests/test_task_list_view.py). On any other Kivy version the view falls
+back to the stock RecycleBoxLayout, which is slower but only uses the
+public data path.
+"""
+
+import kivy
+from kivy.animation import Animation
+from kivy.clock import Clock
+from kivy.metrics import dp
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recyclelayout import RecycleLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+
+# Kivy versions TaskRowLayout has been checked against
+ROW_LAYOUT_KIVY_VERSIONS = ("2.2.",)
+
+
+class TaskRow(RecycleDataViewBehavior):
+    """
+    Mixin for row widgets. The widgets of a row are built once in
+    __init__; set_task() only updates them for the task now shown.
+    """
+    # Task shown by the row
+    task = None
+    # Called when a running fade() finishes
+    _fade_done = None
+
+    def refresh_view_attrs(self, rv, index, data):
+        # Our data entries are not widget attributes, so don't let the
+        # default implementation setattr() them
+        self.index = index
+        self._stop_fade()
+        self.set_task(rv, data["task"])
+
+    def fade(self, opacity, done):
+        """Animate the row to 'opacity', then call done()."""
+        self._fade_done = done
+        anim = Animation(opacity=opacity, duration=0.3)
+        anim.bind(on_complete=lambda *args: self._finish_fade())
+        anim.start(self)
+
+    def _finish_fade(self):
+        done, self._fade_done = self._fade_done, None
+        if done is not None:
+            done()
+
+    def _stop_fade(self):
+        # The row is being reused (scrolled, or the list changed): end the
+        # animation but still apply its action, on the next frame so the
+        # list is not changed in the middle of its own layout
+        done, self._fade_done = self._fade_done, None
+        if done is not None:
+            Animation.cancel_all(self, "opacity")
+            Clock.schedule_once(lambda dt: done())
+        self.opacity = 1
+
+    def set_task(self, view, task):
+        pass
+
+
+class TaskRowLayout(RecycleBoxLayout):
+    """
+    Vertical RecycleBoxLayout for rows of one fixed height (default_size[1])
+    and full width. Positions are computed only for the rows on screen.
+    """
+
+    def compute_sizes_from_data(self, data, flags):
+        # RecycleLayout walks all the data after any change; with identical
+        # rows only the entries that changed need new sizing options
+        if [f for f in flags if not f]:
+            self.clear_layout()
+            self.view_opts = [self._row_opts() for _ in data]
+            return
+        opts = self.view_opts
+        for flag in flags:
+            for kind, where in flag.items():
+                if kind == "removed":
+                    del opts[where]
+                elif kind == "inserted":
+                    opts.insert(where, self._row_opts())
+                elif kind == "appended":
+                    opts.extend(self._row_opts() for _ in range(where.start, where.stop))
+                elif kind == "modified":
+                    for i in range(*where.indices(len(opts))):
+                        opts[i] = self._row_opts()
+        if flags:
+            self.clear_layout()
+
+    def _row_opts(self):
+        width, height = self.default_size
+        return {
+            "size": [self.initial_size[0] if width is None else width, height],
+            "size_hint": list(self.default_size_hint),
+            "size_hint_min": list(self.default_size_hint_min),
+            "size_hint_max": list(self.default_size_hint_max),
+            "pos": None,
+            "pos_hint": self.default_pos_hint,
+            "viewclass": self.viewclass,
+            "width_none": width is None,
+            "height_none": height is None,
+        }
+
+    def compute_layout(self, data, flags):
+        RecycleLayout.compute_layout(self, data, flags)
+
+        # Same early exit as RecycleBoxLayout: nothing moved
+        changed = self._changed_views
+        if changed is None or changed and not self._update_sizes(changed):
+            return
+
+        self.clear_layout()
+        self.minimum_size = 0, len(data) * self.default_size[1]
+
+    def clear_layout(self):
+        # RecycleLayout would send every row back to the shared cache, to be
+        # handed out again at random (and refreshed). Instead file each row
+        # as the "dirty" view of its task's current index, which the adapter
+        # reuses as is; rows whose task is gone get spare negative indices
+        # and are refreshed when reused for another task
+        rv = self.recycleview
+        adapter = rv.view_adapter if rv else None
+        if adapter is not None:
+            rows = rv.rows()
+            adapter.views = {}
+            adapter.dirty_views.clear()
+            spare = 0
+            for row in rows:
+                index = rv.index_of(row.task)
+                if index is None:
+                    spare -= 1
+                    index = spare
+                adapter.dirty_views[row.__class__][index] = row
+        # Rows stay in the layout for now: set_visible_views() takes out
+        # the ones no longer on screen, and the rest are not re-added
+        self.view_indices = {}
+        self._size_needs_update = False
+
+    def set_visible_views(self, indices, data, viewport):
+        super().set_visible_views(indices, data, viewport)
+        for row in [row for row in self.children if row not in self.view_indices]:
+            self.remove_widget(row)
+
+    def get_view_index_at(self, pos):
+        count = len(self.view_opts)
+        index = int((self.top - pos[1]) // self.default_size[1])
+        return min(max(index, 0), count - 1)
+
+    def compute_visible_views(self, data, viewport):
+        if not data:
+            return []
+        x, y, w, h = viewport
+        top = self.get_view_index_at((x, y + h))
+        bottom = self.get_view_index_at((x, y))
+        return list(range(top, bottom + 1))
+
+    def refresh_view_layout(self, index, layout, view, viewport):
+        # Fill in the row's place just before it is shown
+        row_height = self.default_size[1]
+        opt = self.view_opts[index]
+        opt["pos"] = layout["pos"] = (self.x, self.top - (index + 1) * row_height)
+        opt["size"] = layout["size"] = [self.width, row_height]
+        super().refresh_view_layout(index, layout, view, viewport)
+
+
+def use_row_layout():
+    """True if this Kivy is one TaskRowLayout's overrides were written for."""
+    return kivy.__version__.startswith(ROW_LAYOUT_KIVY_VERSIONS)
+
+
+class TaskListView(RecycleView):
+    """
+    RecycleView showing task_manager.ordered with one 'row_class' per
+    visible task. on_complete / on_delete are called with the task when a
+    row's buttons are pressed.
+    """
+
+    def __init__(self, task_manager, row_class, row_height=dp(40),
+                 on_complete=None, on_delete=None, **kwargs):
+        super().__init__(**kwargs)
+        self.task_manager = task_manager
+        self.on_complete = on_complete
+        self.on_delete = on_delete
+
+        layout_class = TaskRowLayout if use_row_layout() else RecycleBoxLayout
+        layout = layout_class(
+            orientation="vertical",
+            default_size=(None, row_height),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+        )
+        layout.bind(minimum_height=layout.setter("height"))
+        self.add_widget(layout)
+        self.viewclass = row_class
+
+        self.reload()
+        task_manager.bind(on_data_updated=self._on_tasks_changed)
+
+    def reload(self):
+        """Resync every entry from the TaskManager (full rebuild)."""
+        self.data = [{"task": task} for task in self.task_manager.ordered]
+
+    def index_of(self, task):
+        """Index of a task in the list, or None if it is not in it."""
+        if task is None:
+            return None
+        ordered = self.task_manager.ordered
+        index = self.task_manager.index_of(task)
+        if index < len(ordered) and ordered[index] is task:
+            return index
+        return None
+
+    def rows(self):
+        """Every row widget the view holds (on screen or kept for reuse)."""
+        adapter = self.view_adapter
+        rows = list(adapter.views.values())
+        for views in adapter.dirty_views.values():
+            rows.extend(views.values())
+        return rows
+
+    def complete(self, task):
+        if self.on_complete:
+            self.on_complete(task)
+
+    def delete(self, task):
+        if self.on_delete:
+            self.on_delete(task)
+
+    def _on_tasks_changed(self, instance, data):
+        change = self.task_manager.last_change
+        if change is None:
+            return
+        kind, index, task = change
+        if kind == "insert":
+            self.data.insert(index, {"task": task})
+        elif kind == "remove":
+            self.data.pop(index)
+        elif kind == "update":
+            # Same row, same size: swap the entry without telling the
+            # layout, then refresh the row showing the task (if any)
+            self.data[index]["task"] = task
+            for row in self.rows():
+                if row.task is task:
+                    row.refresh_view_attrs(self, index, self.data[index])
+        else:
+            self.reload()
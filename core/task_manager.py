@@ -1,20 +1,92 @@
-import heapq
-from kivy.animation import Animation
+import bisect
+from kivy.metrics import dp
 from kivymd.uix.list import OneLineAvatarIconListItem
 from kivymd.uix.button import MDIconButton
 from kivymd.uix.boxlayout import MDBoxLayout
 
 from core.subject import Subject
 from core.task import Task
+from core.task_list_view import TaskListView, TaskRow
+
+class TaskItemRow(TaskRow, OneLineAvatarIconListItem):
+    """
+    List item with complete and delete buttons, built once and reused
+    for whichever task scrolls into it
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.task = None
+        self.view = None
+
+        # Create an action buttons container
+        actions_box = MDBoxLayout(
+            orientation="horizontal",
+            size_hint_x=None,
+            width=80,
+            padding=(0, 0, 10, 0)
+        )
+
+        # Complete button
+        self.complete_btn = MDIconButton(
+            icon="check",
+            on_release=lambda btn: self.view.complete(self.task)
+        )
+
+        # Delete button
+        self.delete_btn = MDIconButton(
+            icon="delete",
+            on_release=lambda btn: self.view.delete(self.task)
+        )
+
+        actions_box.add_widget(self.complete_btn)
+        actions_box.add_widget(self.delete_btn)
+        self.add_widget(actions_box)
+
+    def set_task(self, view, task):
+        """
+        Show 'task' in this row, including priority information
+        """
+        self.view = view
+        self.task = task
+        priority_label = task.get_priority_label()
+        self.text = f"{task.title} [{priority_label}]{' [DONE]' if task.completed else ''}"
+        # If it's already completed, disable the button
+        self.complete_btn.disabled = task.completed
+
 
 class TaskManager(Subject, MDBoxLayout):
+    """
+    Holds the tasks and shows them in a virtualized list.
+
+    tasks is kept in insertion order; ordered is the display order
+    (priority, high to low) and is maintained incrementally. Before every
+    notify, last_change is set to (kind, index in ordered, task) with kind
+    "insert", "update", "remove" or "reset" (index and task None), so
+    views can apply just that change.
+    """
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs) 
-        # Must be a BoxLayout to hold the task items
+        # Must be a BoxLayout to hold the task list
         self.orientation = "vertical"
         self.spacing = 10
 
         self.tasks = []
+        self.ordered = []
+        # sort_key() of every task in ordered, for bisect
+        self._keys = []
+        self._by_id = {}
+        self.last_change = None
+
+        self.list_view = TaskListView(
+            self,
+            TaskItemRow,
+            row_height=dp(56),
+            on_complete=self._on_complete_task,
+            on_delete=self._on_delete_task,
+        )
+        self.add_widget(self.list_view)
 
     def add_task(self, title, priority=Task.PRIORITY_MEDIUM):
         """
@@ -22,97 +94,69 @@ class TaskManager(Subject, MDBoxLayout):
         """
         task = Task(title, priority)
         self.tasks.append(task)
+        self._by_id[task.id] = task
+        key = task.sort_key()
+        index = bisect.bisect(self._keys, key)
+        self._keys.insert(index, key)
+        self.ordered.insert(index, task)
+        self.last_change = ("insert", index, task)
         self.notify("TASK_ADDED", task)
-        self.update_display()
 
     def complete_task(self, task):
         """Mark a Task as completed"""
-        if task in self.tasks:
+        if self._by_id.get(task.id) is task:
             task.complete()
+            self.last_change = ("update", self.index_of(task), task)
             self.notify("TASK_COMPLETED", task)
-            self.update_display()
 
     def delete_task(self, task):
         """Remove a task from the list entirely"""
-        if task in self.tasks:
+        if self._by_id.get(task.id) is task:
+            index = self.index_of(task)
+            del self.ordered[index]
+            del self._keys[index]
+            del self._by_id[task.id]
             self.tasks.remove(task)
+            self.last_change = ("remove", index, task)
             self.notify("TASK_REMOVED", task)
-            self.update_display()
 
     def reset_all_tasks(self):
         """Clear all tasks"""
         self.tasks = []
+        self.ordered = []
+        self._keys = []
+        self._by_id = {}
+        self.last_change = ("reset", None, None)
         self.notify("TASKS_RESET", None)
-        self.update_display()
+
+    def index_of(self, task):
+        """Position of a task in the display order (binary search)"""
+        return bisect.bisect_left(self._keys, task.sort_key())
 
     def update_display(self):
         """
-        Clear existing widgets, rebuild the UI with tasks sorted by priority
-        """
-        # Clear the layout
-        self.clear_widgets()
-
-        # Sort tasks by priority (high to low)
-        # __lt__ in Task class already does reverse comparison, so don't use reverse=True
-        sorted_tasks = sorted(self.tasks)
-        
-        # Display tasks in priority order
-        for task in sorted_tasks:
-            # Create a row for each task
-            row_item = self._build_task_row(task)
-            self.add_widget(row_item)
-
-    def _build_task_row(self, task):
+        Rebuild the list from scratch (normally changes are applied one
+        by one as they happen)
         """
-        Build a UI row for the given task with complete and delete buttons
-        Include priority information in the display
-        """
-        priority_label = task.get_priority_label()
-        row = OneLineAvatarIconListItem(
-            text=f"{task.title} [{priority_label}]{' [DONE]' if task.completed else ''}"
-        )
-        
-        # Create an action buttons container
-        actions_box = MDBoxLayout(
-            orientation="horizontal",
-            size_hint_x=None,
-            width=80,
-            padding=(0, 0, 10, 0)
-        )
-        
-        # Complete button
-        complete_btn = MDIconButton(
-            icon="check",
-            on_release=lambda btn: self._on_complete_task(row, task)
-        )
-        # If it's already completed, disable the button
-        complete_btn.disabled = task.completed
-        
-        # Delete button
-        delete_btn = MDIconButton(
-            icon="delete",
-            on_release=lambda btn: self._on_delete_task(row, task)
-        )
-        
-        actions_box.add_widget(complete_btn)
-        actions_box.add_widget(delete_btn)
-        row.add_widget(actions_box)
-        
-        return row
-    
-    def _on_complete_task(self, row_item, task):
+        self.list_view.reload()
+
+    def _on_complete_task(self, task):
         """Animate completion"""
+        row = self.list_view.view_adapter.get_visible_view(self.index_of(task))
+        if row is None:
+            self.complete_task(task)
+            return
         # Animate fade-out
-        anim = Animation(opacity=0.5, duration=0.3)
-        anim.bind(on_complete=lambda *args: self.complete_task(task))
-        anim.start(row_item)
+        row.fade(0.5, lambda: self.complete_task(task))
 
-    def _on_delete_task(self, row_item, task):
+    def _on_delete_task(self, task):
         """Animate deletion"""
+        row = self.list_view.view_adapter.get_visible_view(self.index_of(task))
+        if row is None:
+            self.delete_task(task)
+            return
         # Animate fade-out
-        anim = Animation(opacity=0, duration=0.3)
-        anim.bind(on_complete=lambda *args: self.delete_task(task))
-        anim.start(row_item)
+        row.fade(0, lambda: self.delete_task(task))
 
     def get_all_tasks(self):
         """Return the task list"""
@@ -0,0 +1,93 @@
+"""
+texture_prefetch.py
+
+Keeps a set of images (the tree growth stages) decoded and uploaded ahead
+of time, so showing one is just a texture swap.
+
+PNG decoding is the slow part (tens of milliseconds for a 500x500 tree),
+so it happens on a worker thread. The decoded pixels are handed to the
+main thread, which creates the GL texture (a quick upload) on the next
+frame. get() only has to decode synchronously if asked for an image the
+worker has not finished yet (counted in 'misses').
+"""
+
+import threading
+from collections import deque
+
+from kivy.clock import Clock
+from kivy.core.image import Image as CoreImage, ImageLoader
+
+
+class TexturePrefetcher:
+    """
+    Texture cache for 'paths' (looked up by index) filled by a background
+    decoder. prefetch() queues images, most urgent first.
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        # index -> Texture; only touched on the main thread
+        self.textures = {}
+        self.hits = 0
+        self.misses = 0
+
+        self._queue = deque()
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="texture-prefetch", daemon=True)
+        self._thread.start()
+
+    def prefetch(self, *indices):
+        """Decode these images in the background (the first one first)."""
+        with self._lock:
+            for index in reversed(indices):
+                if not 0 <= index < len(self.paths) or index in self.textures:
+                    continue
+                if index in self._queued:
+                    if index not in self._queue:
+                        continue  # being decoded right now
+                    self._queue.remove(index)
+                self._queued.add(index)
+                self._queue.appendleft(index)
+        self._wake.set()
+
+    def get(self, index):
+        """Texture for image 'index', decoding it now if it is not ready."""
+        texture = self.textures.get(index)
+        if texture is not None:
+            self.hits += 1
+            return texture
+        self.misses += 1
+        texture = CoreImage(self.paths[index], nocache=True).texture
+        self.textures[index] = texture
+        return texture
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait()
+            with self._lock:
+                if not self._queue:
+                    self._wake.clear()
+                    continue
+                index = self._queue.popleft()
+            try:
+                image = ImageLoader.load(self.paths[index], keep_data=True, nocache=True)
+            except Exception as e:
+                print("Error decoding image:", e)
+                with self._lock:
+                    self._queued.discard(index)
+                continue
+            # GL calls have to happen on the main thread
+            Clock.schedule_once(lambda dt, index=index, image=image: self._upload(index, image))
+
+    def _upload(self, index, image):
+        with self._lock:
+            self._queued.discard(index)
+        if index not in self.textures:
+            self.textures[index] = image.texture
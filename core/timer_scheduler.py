@@ -0,0 +1,185 @@
+"""
+timer_scheduler.py
+
+One scheduler for all the app's logical timers. Every Pomodoro tick,
+growth minute and StudyData minute used to be its own kivy Clock event,
+and kivy looks at every event on every frame. TimerScheduler keeps the
+timers in a heap instead and owns a single Clock event, armed for the
+earliest deadline, so a frame costs nothing while no timer is due.
+
+It has the same interface as the clocks in clock.py, so it can be
+injected anywhere a clock is taken (or made the default with set_clock).
+Timers may be added or cancelled from any thread (the heap is guarded by
+a lock); callbacks always run where the underlying clock fires, i.e. on
+the UI thread for kivy's Clock. As with kivy's Clock, an exception in a
+callback propagates; the scheduler stays armed for the timers left.
+"""
+
+import heapq
+import itertools
+import threading
+
+from core.clock import KivyClock
+
+# Timers due within this much of "now" run in the same wake-up (the
+# underlying clock may fire a little early)
+EPSILON = 0.002
+
+
+class Timer:
+    """One logical timer; cancel() is O(1) (the heap entry is skipped later)."""
+    __slots__ = ("scheduler", "callback", "deadline", "interval", "last", "cancelled", "queued")
+
+    def __init__(self, scheduler, callback, deadline, interval, last):
+        self.scheduler = scheduler
+        self.callback = callback
+        self.deadline = deadline
+        self.interval = interval
+        self.last = last
+        self.cancelled = False
+        # True while an entry for this timer sits in the heap
+        self.queued = True
+
+    def cancel(self):
+        with self.scheduler._lock:
+            if not self.cancelled:
+                self.cancelled = True
+                if self.queued:
+                    self.scheduler._cancelled += 1
+
+
+class TimerScheduler:
+    """
+    Heap of timers driven by a single event on 'clock' (kivy's by default).
+
+    Counters: wakeups (times the underlying event fired), fired (timer
+    callbacks run).
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or KivyClock()
+        # Guards the heap, the counters and the armed event; reentrant as
+        # Timer.cancel() takes it too
+        self._lock = threading.RLock()
+        self._heap = []
+        self._order = itertools.count()
+        self._cancelled = 0
+        self._event = None
+        self._armed_for = None
+        self.wakeups = 0
+        self.fired = 0
+
+    def pending(self):
+        """Number of timers still pending."""
+        with self._lock:
+            return len(self._heap) - self._cancelled
+
+    # ----- clock interface ---------------------------------------------------
+
+    def schedule_once(self, callback, timeout=0):
+        return self._add(callback, max(timeout, 0), None)
+
+    def schedule_interval(self, callback, interval):
+        return self._add(callback, interval, interval)
+
+    def unschedule(self, callback):
+        """Cancel every timer of 'callback' (O(n); prefer Timer.cancel())."""
+        with self._lock:
+            for _, _, timer in self._heap:
+                if timer.callback == callback:
+                    timer.cancel()
+
+    def monotonic(self):
+        return self.clock.monotonic()
+
+    def time(self):
+        return self.clock.time()
+
+    # ----- internals -----------------------------------------------------------
+
+    def _add(self, callback, delay, interval):
+        with self._lock:
+            now = self.clock.monotonic()
+            timer = Timer(self, callback, now + delay, interval, now)
+            heapq.heappush(self._heap, (timer.deadline, next(self._order), timer))
+            if self._armed_for is None or timer.deadline < self._armed_for:
+                self._arm()
+        return timer
+
+    def _arm(self):
+        """
+        Point the single underlying event at the earliest live deadline.
+        Called with the lock held.
+        """
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)[2].queued = False
+            self._cancelled -= 1
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+        if not self._heap:
+            self._armed_for = None
+            return
+        deadline = self._heap[0][0]
+        self._armed_for = deadline
+        self._event = self.clock.schedule_once(self._wake, max(deadline - self.clock.monotonic(), 0))
+
+    def _wake(self, dt):
+        with self._lock:
+            self._event = None
+            self._armed_for = None
+            self.wakeups += 1
+            now = self.clock.monotonic()
+            due = self._take_due(now)
+
+        ran = 0
+        try:
+            for timer in due:
+                ran += 1
+                if timer.cancelled:
+                    continue
+                timer_dt = now - timer.last
+                timer.last = now
+                self.fired += 1
+                result = timer.callback(timer_dt)
+                if result is False and timer.interval is not None:
+                    timer.cancel()  # kivy stops an interval returning False
+        finally:
+            with self._lock:
+                # A callback raised: one-shot timers that did not get to
+                # run yet go back in, due right away
+                for timer in due[ran:]:
+                    if timer.interval is None and not timer.cancelled:
+                        heapq.heappush(self._heap, (now, next(self._order), timer))
+                        timer.queued = True
+                # Drop cancelled entries in bulk once they make up half the heap
+                if self._cancelled > len(self._heap) // 2:
+                    self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+                    heapq.heapify(self._heap)
+                    self._cancelled = 0
+                self._arm()
+
+    def _take_due(self, now):
+        """
+        Pop every timer due at 'now' (interval timers are pushed back for
+        their next run). Called with the lock held, so timers scheduled by
+        the callbacks wait for the next wake-up.
+        """
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now + EPSILON:
+            deadline, _, timer = heapq.heappop(heap)
+            timer.queued = False
+            if timer.cancelled:
+                self._cancelled -= 1
+                continue
+            if timer.interval is not None:
+                # Stay on the original grid; skip runs missed in a stall
+                next_deadline = deadline + timer.interval
+                if next_deadline <= now:
+                    next_deadline += ((now - next_deadline) // timer.interval + 1) * timer.interval
+                timer.deadline = next_deadline
+                heapq.heappush(heap, (next_deadline, next(self._order), timer))
+                timer.queued = True
+            due.append(timer)
+        return due
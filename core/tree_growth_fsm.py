@@ -3,7 +3,9 @@ class TreeGrowthFSM:
     Simplified Tree Growth Finite State Machine
     
     This class manages the current growth stage of the tree.
-    Growth is purely time-based and managed by TreeScreen.
+    Growth is purely time-based: the stages are spread evenly over the
+    planned study time, and add_minute() is called once per studied minute
+    (by TreeScreen, or by the headless simulator).
     """
     
     tree_images = [
@@ -27,6 +29,42 @@ class TreeGrowthFSM:
         """
         self.current_stage = 0
         self.total_stages = len(self.tree_images)
+        self.minutes_per_stage = 1
+        self.elapsed_minutes = 0
+
+    def plan(self, study_hours):
+        """
+        Spread the stages over study_hours and start counting from zero.
+        """
+        self.minutes_per_stage = max(study_hours * 60 / self.total_stages, 1)
+        self.elapsed_minutes = 0
+        print(f"Time-based growth: {self.minutes_per_stage:.1f} minutes per stage")
+
+    def add_minute(self):
+        """
+        Count one more studied minute. Returns the stage the tree should be
+        at now (advancing current_stage if it grew).
+        """
+        self.elapsed_minutes += 1
+        stage = min(int(self.elapsed_minutes / self.minutes_per_stage), self.total_stages - 1)
+        if stage > self.current_stage:
+            self.set_stage(stage)
+        return stage
+
+    def resume(self, elapsed_minutes):
+        """
+        Continue a session that already ran for elapsed_minutes (e.g. after
+        a restart). Returns the stage the tree should be at.
+        """
+        self.elapsed_minutes = elapsed_minutes
+        stage = min(int(elapsed_minutes / self.minutes_per_stage), self.total_stages - 1)
+        self.set_stage(stage)
+        return stage
+
+    def reset(self):
+        """Back to the first stage and zero minutes."""
+        self.current_stage = 0
+        self.elapsed_minutes = 0
         
     def set_stage(self, stage_index):
         """
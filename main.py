@@ -1,22 +1,40 @@
+import os
 from kivymd.app import MDApp
 from kivy.uix.screenmanager import ScreenManager
 from screens.home_screen import HomeScreen
 from screens.study_screen import StudyScreen
 from screens.tree_screen import TreeScreen
 from core.study_data import StudyData 
+from core.study_backup import StudyBackup
+from core.study_sync import SyncClient
+from core.clock import set_clock
+from core.timer_scheduler import TimerScheduler
 
 class EvergreenApp(MDApp):
     def build(self):
         sm = ScreenManager()
 
-        study_data = StudyData() 
-        sm.add_widget(StudyScreen(name="study_screen", study_data=study_data))
-        sm.add_widget(TreeScreen(name="tree_screen", study_data=study_data))
+        # All logical timers (Pomodoro, growth, minute counter) share one
+        # Clock event through the scheduler
+        set_clock(TimerScheduler())
+
+        # Sync with other devices when a sync server is configured
+        # (e.g. a local one: python -m core.sync_server)
+        sync_url = os.environ.get("EVERGREEN_SYNC_URL")
+        self.study_data = StudyData(use_journal=True, binary_snapshot=True,
+                                    backup=StudyBackup(),
+                                    sync=SyncClient(sync_url) if sync_url else None)
+        sm.add_widget(StudyScreen(name="study_screen", study_data=self.study_data))
+        sm.add_widget(TreeScreen(name="tree_screen", study_data=self.study_data))
         sm.add_widget(HomeScreen(name="home_screen"))
 
         sm.current = "home_screen"
         
         return sm
+
+    def on_stop(self):
+        # Make sure the last changes reach the disk before we exit
+        self.study_data.flush(timeout=5)
     
 if __name__ == "__main__":
     EvergreenApp().run()
\ No newline at end of file
@@ -1,11 +1,11 @@
 import kivy
 import os
 import random
-import math
 from kivy.clock import Clock
 from kivymd.uix.screen import MDScreen
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.image import Image
+from kivy.core.image import Image as CoreImage
 from kivy.graphics import Color, Rectangle
 from kivy.core.window import Window
 from kivymd.uix.card import MDCard
@@ -22,8 +22,14 @@ from kivy.metrics import dp
 from kivy.animation import Animation
 from datetime import date
 
-from cloud import Cloud
+from cloud import CloudLayer
+from core.clock import get_clock
+from core.digit_display import DigitDisplay
 from core.pomodoro import PomodoroWidget, PomodoroState
+from core.progress_ring import ProgressRing
+from core.session_checkpoint import SessionCheckpoint
+from core.static_layer import StaticLayer
+from core.texture_prefetch import TexturePrefetcher
 from core.right_drawer import RightDrawer
 from core.task_manager import TaskManager
 from core.tree_growth_observer import TreeGrowthObserver
@@ -79,6 +85,21 @@ class PomodoroCard(MDCard):
         )
         main_layout.add_widget(self.timer_layout)
 
+        # Smooth progress of the current block, next to the digits
+        self.progress_ring = ProgressRing(size_hint=(None, 1), width=dp(56))
+        self.timer_layout.add_widget(self.progress_ring)
+
+        # Digit cells are built once and updated in place every second
+        self.digit_display = DigitDisplay(size_hint=(1, 1))
+        self.timer_layout.add_widget(self.digit_display)
+        self.done_label = MDLabel(
+            text="Session Complete!",
+            halign="center",
+            font_style="H6",
+            theme_text_color="Custom",
+            text_color=(1, 1, 1, 1)  # White text
+        )
+
         # Sessions left indicator
         self.sessions_layout = MDBoxLayout(
             orientation="horizontal",
@@ -106,20 +127,31 @@ class PomodoroCard(MDCard):
         )
         self.pomo_widget.size_hint = (1, 1)
 
-    def update_timer_display(self, time_str, block_type, laps_remaining):
-        # Clear old display
-        self.timer_layout.clear_widgets()
+        # The ring animates on its own (in its shader); it only has to be
+        # told about a new block, a pause or a resume
+        trigger_ring = Clock.create_trigger(self.sync_progress_ring, -1)
+        self.pomo_widget.bind(
+            current_block_index=trigger_ring,
+            current_state=trigger_ring,
+            timer_running=trigger_ring,
+        )
+        trigger_ring()
+
+    def sync_progress_ring(self, *args):
+        """Hand the current block (and whether it is running) to the ring"""
+        pomo = self.pomo_widget
+        self.progress_ring.set_block(
+            pomo.block_elapsed(),
+            pomo.current_block_duration,
+            running=pomo.timer_running,
+        )
 
+    def update_timer_display(self, time_str, block_type, laps_remaining):
         # If done
         if time_str == "Done!":
-            done_label = MDLabel(
-                text="Session Complete!",
-                halign="center",
-                font_style="H6",
-                theme_text_color="Custom",
-                text_color=(1, 1, 1, 1)  # White text
-            )
-            self.timer_layout.add_widget(done_label)
+            if self.done_label.parent is None:
+                self.timer_layout.clear_widgets()
+                self.timer_layout.add_widget(self.done_label)
             self.sessions_label.text = "All sessions completed!"
             
             # Notify parent screen (TreeScreen) that Pomodoro is done
@@ -137,26 +169,14 @@ class PomodoroCard(MDCard):
             self.md_bg_color = self.break_color
             self.title_label.text = "Break Time!"
 
-        # Build digit labels with smaller boxes
-        for ch in time_str:
-            digit_container = MDBoxLayout(
-                orientation="vertical",
-                size_hint=(None, None),
-                size=(36, 48),
-                md_bg_color=(0.98, 0.98, 0.98, 1),
-                pos_hint={"center_y": 0.5}
-            )
-            digit_label = MDLabel(
-                text=ch,
-                halign="center",
-                font_style="H5",
-                font_size="20sp",
-                theme_text_color="Custom",
-                text_color=(0.1, 0.1, 0.1, 1),  # Dark text on light background
-                size_hint=(1, 1)
-            )
-            digit_container.add_widget(digit_label)
-            self.timer_layout.add_widget(digit_container)
+        # Back from "Session Complete!" after a reset
+        if self.digit_display.parent is None:
+            self.timer_layout.clear_widgets()
+            self.timer_layout.add_widget(self.progress_ring)
+            self.timer_layout.add_widget(self.digit_display)
+
+        # Swap glyphs in the existing digit cells
+        self.digit_display.set_text(time_str)
 
         # Display the exact number of laps remaining without adjustment
         self.sessions_label.text = f"Sessions left: {laps_remaining}"
@@ -189,18 +209,30 @@ class TreeScreen(MDScreen):
         self.total_minutes = self.total_study_hours * 60
         self.tree_stages = 11  # Total number of tree images
         
-        # Calculate minutes per stage
-        self.minutes_per_stage = max(self.total_minutes / self.tree_stages, 1)
-        print(f"Time-based growth: {self.minutes_per_stage:.1f} minutes per stage")
-        
-        # Track elapsed minutes
-        self.elapsed_minutes = 0
+        # The FSM spreads the stages over the planned minutes
+        self.fsm.plan(self.total_study_hours)
+
+        # Growth timer and session timestamps use the injectable clock
+        self.clock = get_clock()
+
+        # Running session state survives crashes / restarts through this
+        self.checkpoint = SessionCheckpoint()
         
         self.tree_observer = TreeGrowthObserver(self.fsm)
 
         # FloatLayout for main content
         self.layout = FloatLayout()
 
+        # Sky, tree and ground only change on a resize or a growth step, so
+        # they are drawn into one cached offscreen layer (see StaticLayer)
+        self.static_layer = StaticLayer(pos_hint={"x": 0, "y": 0})
+        self.layout.add_widget(self.static_layer)
+
+        # Sky-blue background
+        with self.static_layer.content:
+            Color(0.53, 0.81, 0.98, 1)
+            self.bg_rect = Rectangle(pos=self.layout.pos, size=self.layout.size)
+
         # Status label for current state
         self.status_label = MDLabel(
             text="Ready to start your session",
@@ -231,8 +263,13 @@ class TreeScreen(MDScreen):
 
         # Tree images - update to include all 11 images
         self.tree_folder = os.path.join(os.path.dirname(__file__), "..", "images", "tree_images")
-        self.image_paths = [os.path.join(self.tree_folder, f"{i}.png") for i in range(1, 12)]
+        self.image_paths = [os.path.join(self.tree_folder, name) for name in self.fsm.tree_images]
         self.image_index = 0
+
+        # Stage textures are decoded in the background so a growth step is
+        # only a texture swap; the first one is needed right away
+        self.tree_textures = TexturePrefetcher(self.image_paths)
+        self.tree_textures.prefetch(*range(1, len(self.image_paths)))
         
         # Base dimensions for tree
         self.base_tree_width = 300
@@ -240,11 +277,12 @@ class TreeScreen(MDScreen):
 
         # Create the tree image - DON'T set pos_hint
         self.tree_image = Image(
-            source=self.image_paths[self.image_index],
             size_hint=(None, None),
             size=(self.base_tree_width, self.base_tree_height)
         )
-        self.layout.add_widget(self.tree_image)
+        # Drawn in the static layer (between the sky and the ground), not
+        # as a child of the layout
+        self.static_layer.add(self.tree_image.canvas)
         
         # Update tree growth initially
         self.update_tree_image()
@@ -278,15 +316,20 @@ class TreeScreen(MDScreen):
         self.layout.add_widget(self.pomodoro_card)
         # Timer will start in on_enter
 
-        # Clouds
+        # Clouds: all drawn by one layer widget
+        self.clouds = CloudLayer(os.path.join(os.path.dirname(__file__), "..", "images", "cloud.png"))
+        self.layout.add_widget(self.clouds)
         Clock.schedule_once(self.spawn_one_cloud_randomly, 2)
 
-        # Sky-blue background
-        with self.layout.canvas.before:
-            Color(0.53, 0.81, 0.98, 1)
-            self.bg_rect = Rectangle(pos=self.layout.pos, size=self.layout.size)
-        self.layout.bind(pos=self.reposition_tree, size=self.reposition_tree)
-        self.layout.bind(pos=self._update_bg, size=self._update_bg)
+        self.add_background_elements()
+
+        # Window resizes only schedule a layout pass (see layout_scene), so
+        # the burst of them from a window drag costs one pass per frame
+        self._trigger_layout = Clock.create_trigger(self.layout_scene, -1)
+        # What the last pass laid out for, to skip parts that are unchanged
+        self._ground_box = None
+        # The drawer starts at half the window; it is resized on a resize
+        self._drawer_window_width = Window.width
 
         # Wrap FloatLayout in a Screen + ScreenManager
         self.screen_manager = ScreenManager()
@@ -305,7 +348,7 @@ class TreeScreen(MDScreen):
         # Add nav_layout to MDScreen
         self.add_widget(self.nav_layout)
 
-        Window.bind(on_resize=self.update_drawer_width)
+        Window.bind(on_resize=self._trigger_layout)
 
         # Drawer toggle button
         self.arrow_button = MDIconButton(
@@ -316,17 +359,39 @@ class TreeScreen(MDScreen):
         )
         self.add_widget(self.arrow_button)
 
-        # Update progress bar every second
-        Clock.schedule_interval(self.update_progress_bar, 1)
+        # Progress bar and status label follow the Pomodoro's properties
+        # (no polling): each is only updated when something it shows
+        # changed, once per frame (a new block changes several at once)
+        pomo = self.pomodoro_card.pomo_widget
+        trigger_progress = Clock.create_trigger(self.update_progress_bar, -1)
+        pomo.bind(
+            current_block_time_left=trigger_progress,
+            current_block_duration=trigger_progress,
+            current_state=trigger_progress,
+        )
+        trigger_status = Clock.create_trigger(self.update_status_label, -1)
+        pomo.bind(
+            current_state=trigger_status,
+            laps_completed=trigger_status,
+            total_laps=trigger_status,
+        )
+        trigger_progress()
+        trigger_status()
         
         # Schedule tree growth check every minute
-        Clock.schedule_interval(self.check_tree_growth, 60)
+        self.clock.schedule_interval(self.check_tree_growth, 60)
+
+        # Checkpoint the running session every second
+        self.clock.schedule_interval(self.save_checkpoint, 1)
         
-        # Position the tree after layout is complete
-        Clock.schedule_once(lambda dt: self.reposition_tree(), 0)
+        # Position everything once the layout has its size
+        self._trigger_layout()
         
         # Store the completion popup so we only show it once
         self.completion_popup_shown = False
+
+        # Wall-clock start of the running session (recorded in StudyData)
+        self.session_start = None
     
     def cycle_tree_image(self, instance):
         """Debug function to cycle through tree images"""
@@ -337,41 +402,24 @@ class TreeScreen(MDScreen):
         self.debug_button.text = f"Tree: {self.image_index + 1}/{len(self.image_paths)}"
 
     def spawn_one_cloud_randomly(self, dt):
-        """Spawn a cloud with random size and speed"""
+        """Spawn a cloud with a random size (which sets its depth and speed)"""
         # Check if we have too many clouds already
-        cloud_count = sum(1 for child in self.layout.children if isinstance(child, Cloud))
-        
-        if cloud_count > 5:  # Limit total clouds to 5
+        if self.clouds.count > 5:  # Limit total clouds to 5
             # Still schedule next spawn, but don't create a new cloud
             next_delay = random.uniform(5, 10)  # Longer delay between spawns
             Clock.schedule_once(self.spawn_one_cloud_randomly, next_delay)
             return
-        
-        cloud_path = os.path.join(os.path.dirname(__file__), "..", "images", "cloud.png")
-        
-        # Use slower speed range
-        speed = random.uniform(15, 35)
-        
-        # Vary cloud size
+
+        # Vary cloud size (the size picks the cloud's depth layer)
         size_factor = random.uniform(0.5, 1.5)
-        
-        # Create the cloud with random speed and size
-        cloud = Cloud(
-            source=cloud_path, 
-            speed=speed,
-            size_factor=size_factor
-        )
-        
-        # Position cloud off-screen to the left
-        cloud.size_hint = (None, None)
-        
-        # Vary vertical position more
+
+        # Vary vertical position more; it enters off-screen to the left
         height_range = Window.height // 3
-        cloud.y = random.randint(Window.height - height_range, Window.height - 20)
-        cloud.x = -cloud.width
-        
-        self.layout.add_widget(cloud)
-        
+        self.clouds.add_cloud(
+            size_factor=size_factor,
+            y=random.randint(Window.height - height_range, Window.height - 20)
+        )
+
         # Use longer delays between spawns
         next_delay = random.uniform(5, 15)  # 5-15 seconds between clouds
         Clock.schedule_once(self.spawn_one_cloud_randomly, next_delay)
@@ -381,8 +429,12 @@ class TreeScreen(MDScreen):
         # Start the Pomodoro timer when screen is actually displayed
         if not self.pomodoro_card.pomo_widget.timer_running:
             self.pomodoro_card.pomo_widget.reset_timer(self.total_study_hours)
-            self.pomodoro_card.pomo_widget.start_timer()
-            print("Timer started on screen entry")
+            checkpoint = self.checkpoint.load()
+            if checkpoint and self.can_resume(checkpoint):
+                self.resume_session(checkpoint)
+            else:
+                self.start_new_session(self.total_study_hours)
+                print("Timer started on screen entry")
             
         # Reset the completion popup flag
         self.completion_popup_shown = False
@@ -390,6 +442,78 @@ class TreeScreen(MDScreen):
         # Make sure tree is properly positioned
         self.reposition_tree()
 
+    def can_resume(self, checkpoint):
+        """
+        Whether a checkpoint is a session to pick up: same plan, written
+        today, and the time since it was written (counted as studied by
+        resume_session) still fits in what was left of the plan. Anything
+        else, e.g. yesterday's session or one followed by a long shutdown,
+        starts over instead of fast-forwarding to the end.
+        Call with the Pomodoro reset to the current plan.
+        """
+        if checkpoint["study_hours"] != self.total_study_hours:
+            return False
+        now = self.clock.time()
+        if date.fromtimestamp(checkpoint["written_at"]) != date.fromtimestamp(now):
+            return False
+        pomo = self.pomodoro_card.pomo_widget
+        planned = pomo.schedule.block_start(len(pomo.blocks))
+        gap = now - checkpoint["written_at"]
+        return 0 <= gap < planned - checkpoint["elapsed"]
+
+    def resume_session(self, checkpoint):
+        """
+        Pick up an unfinished session from its checkpoint. The time the app
+        was not running counts as studied, so the timer and the tree are
+        fast-forwarded by it.
+        """
+        pomo = self.pomodoro_card.pomo_widget
+        gap = max(0.0, self.clock.time() - checkpoint["written_at"])
+        self.session_start = checkpoint["session_start"]
+
+        # Tree first: seeking past the end shows the completion popup
+        self.image_index = self.fsm.resume(checkpoint["tree_minutes"] + int(gap // 60))
+        self.update_tree_image()
+        self.debug_button.text = f"Tree: {self.image_index + 1}/{len(self.image_paths)}"
+
+        pomo.seek(checkpoint["elapsed"] + gap)
+        if pomo.current_state != PomodoroState.DONE:
+            pomo.start_timer()
+        print(f"Resumed session at {pomo.elapsed() / 60:.1f} minutes")
+
+    def save_checkpoint(self, dt):
+        """Write the running session to the checkpoint (every second)."""
+        pomo = self.pomodoro_card.pomo_widget
+        if self.session_start is None or not pomo.timer_running:
+            return
+        self.checkpoint.save(
+            self.total_study_hours,
+            self.session_start,
+            pomo.elapsed(),
+            self.fsm.elapsed_minutes,
+            self.fsm.current_stage,
+            self.clock.time(),
+        )
+
+    def layout_scene(self, *args):
+        """
+        Size and place the window-dependent parts (background, ground,
+        drawer, tree) from the final window size. Each part is only updated
+        if what it depends on changed since the last pass.
+        """
+        # The layout fills the window, but its own size is only updated
+        # later in the frame (one property at a time), so use the window's
+        ground_box = (*self.layout.pos, *Window.size)
+        if ground_box != self._ground_box:
+            self._ground_box = ground_box
+            self._update_bg(ground_box[:2], ground_box[2:])
+
+        if Window.width != self._drawer_window_width:
+            self._drawer_window_width = Window.width
+            self.update_drawer_width(Window, *Window.size)
+
+        self.reposition_tree()
+
     def update_drawer_width(self, instance, width, height):
         self.right_drawer.width = width * 0.40
 
@@ -425,17 +549,19 @@ class TreeScreen(MDScreen):
         # Calculate y position
         tree_y = ground_level - (self.tree_image.height * plant_depth)
         
-        # Set the tree position absolutely
-        self.tree_image.pos = (tree_x, tree_y)
-        print(f"Tree positioned at ({tree_x}, {tree_y}) with stage {self.image_index+1}")
+        # Set the tree position absolutely (unless it is already there)
+        if tuple(self.tree_image.pos) != (tree_x, tree_y):
+            self.tree_image.pos = (tree_x, tree_y)
 
-    def _update_bg(self, *args):
-        self.bg_rect.pos = self.layout.pos
-        self.bg_rect.size = self.layout.size
-        self.add_background_elements()
+    def _update_bg(self, pos, size):
+        self.bg_rect.pos = pos
+        self.bg_rect.size = size
+        self._update_ground(pos, size[0])
 
     def on_study_update(self, instance, data):
         """When study data changes, update the tree and reset pomodoro"""
+        if "study_hours" not in instance.changed_keys:
+            return  # e.g. only a task was completed
         old_hours = self.total_study_hours
         
         # Get only current day's study hours
@@ -445,19 +571,13 @@ class TreeScreen(MDScreen):
         self.total_study_hours = current_day_hours
         self.total_minutes = self.total_study_hours * 60
         
-        # Recalculate minutes per stage with new hours
-        self.minutes_per_stage = max(self.total_minutes / self.tree_stages, 1)
-        print(f"Updated time-based growth: {self.minutes_per_stage:.1f} minutes per stage")
+        # Recalculate minutes per stage with new hours (resets elapsed minutes)
+        self.fsm.reset()
+        self.fsm.plan(self.total_study_hours)
         
-        # Reset elapsed minutes
-        self.elapsed_minutes = 0
-        
-        # Only reset the timer if hours actually changed
+        # Only restart the timer if hours actually changed
         if old_hours != self.total_study_hours:
-            # Reset the pomodoro timer with new hours
-            self.pomodoro_card.pomo_widget.reset_timer(self.total_study_hours)
-            # Start the timer
-            self.pomodoro_card.pomo_widget.start_timer()
+            self.start_new_session(self.total_study_hours)
         
         # Reset tree to first stage
         self.image_index = 0
@@ -471,21 +591,17 @@ class TreeScreen(MDScreen):
 
     def check_tree_growth(self, dt):
         """Check if it's time to grow the tree (called every minute)"""
-        # Increment elapsed minutes
-        self.elapsed_minutes += 1
-        
-        # Calculate which stage we should be at based on elapsed minutes
-        if self.minutes_per_stage > 0:
-            new_stage = min(int(self.elapsed_minutes / self.minutes_per_stage), self.tree_stages - 1)
-            
-            # If we need to advance to a new stage
-            if new_stage > self.image_index:
-                self.image_index = new_stage
-                print(f"Tree growing to stage {new_stage+1} after {self.elapsed_minutes} minutes")
-                self.update_tree_image(animate=True)
-                
-                # Update debug button text
-                self.debug_button.text = f"Tree: {self.image_index + 1}/{len(self.image_paths)}"
+        # The FSM counts the minute and works out the stage
+        new_stage = self.fsm.add_minute()
+
+        # If we need to advance to a new stage
+        if new_stage > self.image_index:
+            self.image_index = new_stage
+            print(f"Tree growing to stage {new_stage+1} after {self.fsm.elapsed_minutes} minutes")
+            self.update_tree_image(animate=True)
+
+            # Update debug button text
+            self.debug_button.text = f"Tree: {self.image_index + 1}/{len(self.image_paths)}"
 
     def update_tree_image(self, animate=False):
         """
@@ -498,8 +614,10 @@ class TreeScreen(MDScreen):
         elif self.image_index >= len(self.image_paths):
             self.image_index = len(self.image_paths) - 1
             
-        # Update image
-        self.tree_image.source = self.image_paths[self.image_index]
+        # Update image (a cached texture; no decoding here)
+        self.tree_image.texture = self.tree_textures.get(self.image_index)
+        # Make sure the next stage is ready before it is due
+        self.tree_textures.prefetch(self.image_index + 1)
         
         # Calculate scaling factor based on growth stage
         # Start small (50%) and grow gradually to full size (100%)
@@ -522,8 +640,6 @@ class TreeScreen(MDScreen):
             self.base_tree_height * current_scale
         )
         
-        self.tree_image.reload()
-        
         # If animation requested
         if animate:
             # Remember the original size so we can animate correctly
@@ -548,47 +664,44 @@ class TreeScreen(MDScreen):
         # Make sure tree is properly positioned
         self.reposition_tree()
 
-    def update_progress_bar(self, dt):
-        """Update progress bar to match Pomodoro timer"""
-        # Get current block time left from Pomodoro
-        time_left = self.pomodoro_card.pomo_widget.current_block_time_left
-        total_time = 0
-        
-        # Check which block we're in
-        if self.pomodoro_card.pomo_widget.current_state == PomodoroState.WORK:
-            total_time = self.pomodoro_card.pomo_widget.work_duration
-            state_text = "Work"
-        elif self.pomodoro_card.pomo_widget.current_state == PomodoroState.BREAK:
-            total_time = self.pomodoro_card.pomo_widget.break_duration
-            state_text = "Break"
-        else:
-            state_text = "Done"
-            
+    def update_progress_bar(self, *args):
+        """Show the Pomodoro block's progress (called when it changes)"""
+        pomo = self.pomodoro_card.pomo_widget
+        if pomo.current_state == PomodoroState.DONE:
+            return  # keep the last block's bar
+
         # Set max to match current block total time
+        total_time = pomo.current_block_duration
         if total_time > 0:
             self.progress_bar.max = total_time
-            
+
             # Set value to time remaining (inverted for progress feel)
-            self.progress_bar.value = total_time - time_left
-        
-        # Update status label
-        if self.pomodoro_card.pomo_widget.current_state != PomodoroState.DONE:
+            self.progress_bar.value = total_time - pomo.current_block_time_left
+
+    def update_status_label(self, *args):
+        """Show the Pomodoro block and lap (called when they change)"""
+        pomo = self.pomodoro_card.pomo_widget
+        if pomo.current_state != PomodoroState.DONE:
+            state_text = "Work" if pomo.current_state == PomodoroState.WORK else "Break"
+
             # Calculate current lap number properly based on Pomodoro state
-            if self.pomodoro_card.pomo_widget.current_state == PomodoroState.WORK:
+            if pomo.current_state == PomodoroState.WORK:
                 # During work periods, we're on lap number = completed laps + 1
-                current_lap = self.pomodoro_card.pomo_widget.laps_completed + 1
+                current_lap = pomo.laps_completed + 1
             else:
                 # During break periods, we've just completed a lap, so current lap = completed laps
-                current_lap = self.pomodoro_card.pomo_widget.laps_completed
-                
+                current_lap = pomo.laps_completed
+
             # Ensure we never display more than the total laps
-            current_lap = min(current_lap, self.pomodoro_card.pomo_widget.total_laps)
-            total_laps = self.pomodoro_card.pomo_widget.total_laps
-            
-            laps_text = f"Lap {current_lap}/{total_laps}"
-            self.status_label.text = f"{state_text} Session - {laps_text}"
+            current_lap = min(current_lap, pomo.total_laps)
+
+            text = f"{state_text} Session - Lap {current_lap}/{pomo.total_laps}"
         else:
-            self.status_label.text = "All sessions completed!"
+            text = "All sessions completed!"
+
+        # Only a different string re-renders the label's texture
+        if self.status_label.text != text:
+            self.status_label.text = text
 
     def show_reset_dialog(self, *args):
         self.dialog = MDDialog(
@@ -615,6 +728,7 @@ class TreeScreen(MDScreen):
         
         # Stop the timer
         self.pomodoro_card.pomo_widget.stop_timer()
+        self.record_session()
         
         # Reset task manager
         if self.task_manager:
@@ -625,7 +739,7 @@ class TreeScreen(MDScreen):
             self.right_drawer.refresh_task_list()
         
         # Reset elapsed minutes and tree growth
-        self.elapsed_minutes = 0
+        self.fsm.reset()
         self.image_index = 0
         self.update_tree_image()
         
@@ -636,39 +750,44 @@ class TreeScreen(MDScreen):
         self.manager.current = "study_screen"
         
     def add_background_elements(self):
-        # Remove old elements first to avoid duplication
-        for child in list(self.layout.children):
-            if isinstance(child, Image) and (child.source.endswith('floor.png') or 
-                                          child.source.endswith('grass.png')):
-                self.layout.remove_widget(child)
-        
+        """
+        Ground: one strip of floor tiles with a strip of grass on top. Each
+        strip is a single Rectangle whose texture repeats horizontally, so
+        a resize only changes two rectangles (see _update_ground).
+        Drawn in the static layer after the tree, so the bottom of the
+        tree stays planted in the grass.
+        """
         base_image_path = os.path.join(os.path.dirname(__file__), "..", "images")
-        floor_path = os.path.join(base_image_path, "floor.png")
-        grass_path = os.path.join(base_image_path, "grass.png")
-
-        floor_width = 48
-        floor_height = 96
-        num_floor = math.ceil(Window.width / floor_width) + 1
-        for i in range(num_floor):
-            floor = Image(
-                source=floor_path,
-                size_hint=(None, None),
-                size=(floor_width, floor_height),
-                pos=(i * floor_width, 0)
-            )
-            self.layout.add_widget(floor)
-
-        grass_width = 128
-        grass_height = 64
-        num_grass = math.ceil(Window.width / grass_width) + 1
-        for i in range(num_grass):
-            grass = Image(
-                source=grass_path,
-                size_hint=(None, None),
-                size=(grass_width, grass_height),
-                pos=(i * grass_width, floor_height)
-            )
-            self.layout.add_widget(grass)
+        floor_texture = self._load_tile_texture(os.path.join(base_image_path, "floor.png"))
+        grass_texture = self._load_tile_texture(os.path.join(base_image_path, "grass.png"))
+
+        with self.static_layer.content:
+            Color(1, 1, 1, 1)
+            self.floor_rect = Rectangle(texture=floor_texture)
+            self.grass_rect = Rectangle(texture=grass_texture)
+        # Placed by the first layout pass (layout_scene)
+
+    def _load_tile_texture(self, path):
+        # Own copy (nocache) since the wrap mode is changed
+        texture = CoreImage(path, nocache=True).texture
+        texture.wrap = "repeat"
+        return texture
+
+    def _update_ground(self, pos, width):
+        floor_width, floor_height = 48, 96
+        grass_width, grass_height = 128, 64
+        x, y = pos
+        self._tile_rect(self.floor_rect, x, y, width, floor_width, floor_height)
+        self._tile_rect(self.grass_rect, x, y + floor_height, width, grass_width, grass_height)
+
+    def _tile_rect(self, rect, x, y, width, tile_width, tile_height):
+        """Stretch 'rect' over 'width', repeating its texture every tile_width"""
+        rect.pos = (x, y)
+        rect.size = (width, tile_height)
+        # Keep the texture's own v range (images are loaded flipped)
+        coords = rect.texture.tex_coords
+        repeats = width / tile_width
+        rect.tex_coords = (0, coords[1], repeats, coords[3], repeats, coords[5], 0, coords[7])
 
     def show_tree_growth_notification(self, message):
         """Show a temporary notification for tree growth"""
@@ -703,6 +822,7 @@ class TreeScreen(MDScreen):
         """Show a congratulations popup when study session is complete"""
         if not self.completion_popup_shown:
             self.completion_popup_shown = True
+            self.record_session()
             
             dialog = MDDialog(
                 title="Congratulations!",
@@ -717,8 +837,38 @@ class TreeScreen(MDScreen):
             )
             dialog.open()
 
+    def record_session(self):
+        """Store the session that just ended (finished or abandoned)"""
+        if self.session_start is None:
+            return
+        self.study_data.record_session(
+            self.session_start,
+            self.clock.time(),
+            self.pomodoro_card.pomo_widget.laps_completed,
+            # Hours the session was planned with (total_study_hours may
+            # already hold a new plan replacing it)
+            self.pomodoro_card.pomo_widget.study_hours
+        )
+        self.session_start = None
+        # Nothing left to resume
+        self.checkpoint.clear()
+
+    def start_new_session(self, hours):
+        """
+        Start a fresh Pomodoro session of 'hours'. Every place that starts
+        the timer for a new session goes through here, so the session's
+        start time is always known (record_session needs it) and no stale
+        checkpoint is left to resume. A session still running is recorded
+        first.
+        """
+        self.record_session()
+        pomo = self.pomodoro_card.pomo_widget
+        pomo.reset_timer(hours)
+        pomo.start_timer()
+        self.session_start = self.clock.time()
+        self.checkpoint.clear()
+
     def reset_pomodoro_and_tree(self, new_hours):
         # If you want a custom reset, e.g., re-init with new_hours
         self.pomodoro_card.pomo_widget.study_hours = new_hours
-        self.pomodoro_card.pomo_widget.reset_timer(new_hours)
-        self.pomodoro_card.pomo_widget.start_timer()
\ No newline at end of file
+        self.start_new_session(new_hours)
\ No newline at end of file
@@ -0,0 +1,65 @@
+import os
+import sys
+
+# Kivy reads these on import: no command line parsing, no log files
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+os.environ.setdefault("KIVY_NO_FILELOG", "1")
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Empty working directory for the data files (they use relative paths),
+    with the app's fonts and images linked in.
+    """
+    for name in ("font", "images"):
+        os.symlink(os.path.join(ROOT, name), tmp_path / name)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def ui_app(workdir):
+    """
+    A window and a (not running) MDApp, enough to build and drive the
+    screens without an event loop of their own.
+    """
+    from kivy.base import EventLoop
+    from kivy.core.window import Window
+    from kivymd.app import MDApp
+
+    app = MDApp.get_running_app() or MDApp()
+    EventLoop.ensure_window()
+    yield app
+    for child in list(Window.children):
+        Window.remove_widget(child)
+
+
+def pump(frames=5):
+    """Run a few frames of the Kivy event loop."""
+    from kivy.base import EventLoop
+
+    for _ in range(frames):
+        EventLoop.idle()
+
+
+def build_screens(study_data):
+    """StudyScreen and TreeScreen in a ScreenManager on the window."""
+    from kivy.core.window import Window
+    from kivy.uix.screenmanager import NoTransition, ScreenManager
+    from screens.study_screen import StudyScreen
+    from screens.tree_screen import TreeScreen
+
+    sm = ScreenManager(transition=NoTransition())
+    sm.add_widget(StudyScreen(name="study_screen", study_data=study_data))
+    sm.add_widget(TreeScreen(name="tree_screen", study_data=study_data))
+    sm.current = "study_screen"
+    Window.add_widget(sm)
+    pump()
+    return sm
@@ -0,0 +1,124 @@
+import json
+
+from core import data_file_watch
+from core.data_file_watch import DataFileWatcher, file_signature
+
+
+def write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def test_external_change_is_reported_once(tmp_path):
+    path = str(tmp_path / "data.json")
+    write(path, {"v": 1})
+    changes = []
+    watcher = DataFileWatcher(path, lambda data, sig: changes.append(data))
+
+    watcher._check()
+    assert changes == []
+
+    write(path, {"v": 22})
+    watcher._check()
+    watcher._check()
+    assert changes == [{"v": 22}]
+
+
+def test_own_save_while_waiting_for_the_lock_is_not_reported(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.json")
+    write(path, {"v": 1})
+    changes = []
+    watcher = DataFileWatcher(path, lambda data, sig: changes.append(data))
+
+    # An external write is seen by the first stat ...
+    write(path, {"v": 22})
+    stale = file_signature(path)
+
+    class OwnSaveFirst(data_file_watch.FileLock):
+        def __enter__(self):
+            # ... but before the watcher gets the lock, this process saves
+            # again and records that version as known
+            write(path, {"v": 333})
+            watcher.mark_known(file_signature(path))
+            return super().__enter__()
+
+    monkeypatch.setattr(data_file_watch, "FileLock", OwnSaveFirst)
+    assert stale != watcher.known
+    watcher._check()
+    assert changes == []
+
+
+def other_process_writes(change):
+    from core.study_data import DATA_FILE
+
+    with open(DATA_FILE) as f:
+        data = json.load(f)
+    change(data)
+    write(DATA_FILE, data)
+
+
+def test_shutdown_merge_reads_the_file_on_the_watcher_thread(workdir):
+    import threading
+    from core.study_data import DATA_FILE, StudyData
+
+    study_data = StudyData(shared_file=True, save_debounce=0)
+    study_data.set_study_hours("2024-02-01", 1.0)
+    study_data.writer.flush(timeout=5)
+    other_process_writes(lambda data: data["study_hours"].update({"2024-02-02": 2.0}))
+
+    threads = []
+    read_external = study_data._read_external
+
+    def recording_read():
+        threads.append(threading.current_thread().name)
+        return read_external()
+
+    study_data._read_external = recording_read
+    assert study_data.flush(timeout=5)
+
+    assert threads == ["DataFileWatcher"]
+    assert dict(study_data.get_data()["study_hours"]) == {"2024-02-01": 1.0, "2024-02-02": 2.0}
+    with open(DATA_FILE) as f:
+        assert json.load(f)["study_hours"] == {"2024-02-01": 1.0, "2024-02-02": 2.0}
+
+
+def test_entries_missing_from_the_other_version_are_kept(workdir):
+    from core.study_data import StudyData
+
+    study_data = StudyData(shared_file=True, save_debounce=0)
+    study_data.set_study_hours("2023-01-05", 3.0)
+    study_data.set_study_hours("2024-02-01", 1.0)
+    study_data.complete_task("task-1")
+
+    # E.g. a process that archived January 2023 and knows no task-1
+    records = study_data._diff_external({
+        "study_hours": {"2024-02-01": 1.5, "2024-02-03": 2.0},
+        "tasks_completed": {"task-2": True},
+    })
+    assert sorted(records, key=str) == sorted([
+        {"op": "hours", "date": "2024-02-01", "hours": 1.5},
+        {"op": "hours", "date": "2024-02-03", "hours": 2.0},
+        {"op": "task", "id": "task-2"},
+    ], key=str)
+    study_data.flush(timeout=5)
+
+
+def test_call_runs_on_the_watcher_thread_in_polling_mode_too(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    path = str(tmp_path / "data.json")
+    write(path, {"v": 1})
+    for inotify in (True, False):
+        watcher = DataFileWatcher(path, lambda data, sig: None, poll_interval=30)
+        if not inotify:
+            monkeypatch.setattr(watcher, "_open_inotify", lambda: None)
+        watcher.start()
+        started = time.monotonic()
+        assert watcher.call(lambda: threading.current_thread().name, timeout=5) == "DataFileWatcher"
+        # Woken up, not left to the 30 s poll
+        assert time.monotonic() - started < 5
+        watcher.stop()
+        watcher._thread.join(timeout=5)
+        assert not watcher._thread.is_alive()
+        assert watcher.call(lambda: "late", timeout=1) is None
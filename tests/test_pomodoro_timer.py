@@ -0,0 +1,54 @@
+import random
+
+from core.clock import VirtualClock
+from core.pomodoro import PomodoroWidget
+
+
+class StallingClock(VirtualClock):
+    """VirtualClock whose callbacks sometimes run late, like stalled frames."""
+
+    def __init__(self, stall_rate, max_stall, seed=0):
+        super().__init__(start=0.0, wall_start=0.0)
+        self.stall_rate = stall_rate
+        self.max_stall = max_stall
+        self._rng = random.Random(seed)
+
+    def schedule_once(self, callback, timeout=0):
+        if self._rng.random() < self.stall_rate:
+            timeout += self._rng.uniform(0.2, self.max_stall)
+        return super().schedule_once(callback, timeout)
+
+
+def run_until_done(clock, hours):
+    done_at = []
+
+    def on_update(time_str, block_type, laps_remaining):
+        if block_type == "done":
+            done_at.append(clock.monotonic())
+
+    pomo = PomodoroWidget(study_hours=hours, update_callback=on_update, clock=clock)
+    pomo.start_timer()
+    clock.run_until(lambda: done_at, 24 * 3600)
+    return pomo, done_at[0]
+
+
+def test_stalls_do_not_add_to_the_session():
+    ideal_pomo, ideal = run_until_done(VirtualClock(start=0.0, wall_start=0.0), 4)
+    pomo, done = run_until_done(StallingClock(stall_rate=0.05, max_stall=3.0), 4)
+
+    assert pomo.laps_completed == ideal_pomo.laps_completed == pomo.total_laps
+    # Late by at most the last stall, never by the sum of them
+    assert 0 <= done - ideal <= 3.0
+
+
+def test_pause_keeps_the_exact_time_left():
+    clock = VirtualClock(start=0.0, wall_start=0.0)
+    pomo = PomodoroWidget(study_hours=1, clock=clock)
+    pomo.start_timer()
+    clock.advance(100.4)
+    pomo.stop_timer()
+    clock.advance(500)
+    assert abs(pomo.elapsed() - 100.4) < 1e-6
+    pomo.start_timer()
+    clock.advance(50)
+    assert abs(pomo.elapsed() - 150.4) < 1e-6
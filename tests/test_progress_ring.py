@@ -0,0 +1,41 @@
+import math
+
+from conftest import pump
+
+
+def make_ring(ui_app, side=100):
+    from kivy.core.window import Window
+    from core.progress_ring import ProgressRing
+
+    ring = ProgressRing(size_hint=(None, None), size=(side, side))
+    Window.add_widget(ring)
+    pump()
+    return ring
+
+
+def test_running_ring_updates_once_per_pixel_of_arc_not_per_frame(ui_app):
+    ring = make_ring(ui_app)
+    ring.set_block(0, 25 * 60)
+    assert math.isclose(ring.update_interval(), 25 * 60 / (math.pi * 100))
+
+    updates = ring.time_updates
+    pump(30)
+    # ~0.5 s of frames, well under one pixel's worth of a 25 min block
+    assert ring.time_updates == updates
+
+    # A bigger ring moves more pixels per second
+    ring.size = (200, 200)
+    pump()
+    assert math.isclose(ring.update_interval(), 25 * 60 / (math.pi * 200))
+
+
+def test_short_blocks_update_at_most_once_a_frame_and_pause_stops_them(ui_app):
+    ring = make_ring(ui_app)
+    ring.set_block(0, 1)
+    assert ring.update_interval() == 1 / 60.0
+
+    ring.pause(0.5)
+    updates = ring.time_updates
+    pump(10)
+    assert ring.time_updates == updates
+    assert ring.canvas["paused"] == 1.0
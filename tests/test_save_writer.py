@@ -0,0 +1,42 @@
+import json
+import os
+import time
+
+from core.save_writer import CoalescingWriter
+
+
+def test_callbacks_wait_for_a_deferred_write(tmp_path):
+    path = str(tmp_path / "data.json")
+    allowed = []
+    notified = []
+
+    def on_written():
+        # Only ever called once the data is really on disk
+        with open(path) as f:
+            notified.append(json.load(f))
+
+    writer = CoalescingWriter(path, lambda: {"hours": 3}, debounce=0.01,
+                              can_write=lambda: bool(allowed))
+    writer.request(on_written=on_written)
+
+    deadline = time.monotonic() + 5
+    while writer.deferred < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.deferred >= 3
+    assert notified == [] and not os.path.exists(path)
+
+    allowed.append(True)
+    assert writer.flush(timeout=5)
+    assert writer.writes == 1
+    assert notified == [{"hours": 3}]
+
+
+def test_unchanged_data_still_counts_as_written(tmp_path):
+    path = str(tmp_path / "data.json")
+    notified = []
+    writer = CoalescingWriter(path, lambda: {"hours": 1}, debounce=0.01)
+    writer.request()
+    assert writer.flush(timeout=5)
+    writer.request(on_written=lambda: notified.append(True))
+    assert writer.flush(timeout=5)
+    assert writer.skipped == 1 and notified == [True]
@@ -0,0 +1,56 @@
+import time
+from datetime import date
+
+from conftest import build_screens, pump
+
+
+def enter_tree_screen(workdir, hours, checkpoint_age, elapsed):
+    """
+    TreeScreen entered with 'hours' planned for today and a checkpoint of
+    a session 'elapsed' seconds in, written 'checkpoint_age' seconds ago.
+    """
+    from core.session_checkpoint import SessionCheckpoint
+    from core.sqlite_storage import SqliteStorage
+    from core.study_data import StudyData
+
+    now = time.time()
+    checkpoint = SessionCheckpoint()
+    checkpoint.save(hours, now - checkpoint_age - elapsed, elapsed, 0, 0, now - checkpoint_age)
+    checkpoint.close()
+
+    storage = SqliteStorage(str(workdir / "study.db"))
+    storage.write({"op": "hours", "date": date.today().isoformat(), "hours": hours})
+    sm = build_screens(StudyData(storage=storage))
+    sm.current = "tree_screen"
+    pump()
+    return sm.get_screen("tree_screen")
+
+
+def test_recent_checkpoint_is_resumed(ui_app, workdir):
+    tree_screen = enter_tree_screen(workdir, 2, checkpoint_age=60, elapsed=600)
+
+    pomo = tree_screen.pomodoro_card.pomo_widget
+    assert pomo.timer_running
+    # The 60 s the app was closed count as studied
+    assert 655 < pomo.elapsed() < 670
+
+
+def test_checkpoint_from_yesterday_starts_over(ui_app, workdir):
+    tree_screen = enter_tree_screen(workdir, 2, checkpoint_age=86400, elapsed=600)
+
+    pomo = tree_screen.pomodoro_card.pomo_widget
+    assert pomo.timer_running
+    assert pomo.elapsed() < 5
+    assert tree_screen.image_index == 0
+    assert not tree_screen.completion_popup_shown
+
+
+def test_gap_longer_than_the_plan_starts_over(ui_app, workdir):
+    # 1 h planned (50 min left after 10), closed for an hour
+    age = 60 * 60
+    tree_screen = enter_tree_screen(workdir, 1, checkpoint_age=age, elapsed=600)
+
+    pomo = tree_screen.pomodoro_card.pomo_widget
+    assert pomo.timer_running
+    assert pomo.elapsed() < 5
+    assert not tree_screen.completion_popup_shown
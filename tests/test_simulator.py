@@ -0,0 +1,48 @@
+import pytest
+
+from core.clock import VirtualClock
+from core.simulator import StudySimulator
+
+
+def done_at(simulator):
+    return next(seconds for seconds, event, _ in simulator.trace if event == "done")
+
+
+def simulate(hours):
+    simulator = StudySimulator(hours, clock=VirtualClock(start=0.0, wall_start=1_700_000_000.0))
+    simulator.run()
+    return simulator
+
+
+def test_two_hour_session_trace():
+    simulator = simulate(2)
+    blocks = [(seconds, detail) for seconds, event, detail in simulator.trace if event == "block"]
+    assert blocks == [
+        (0.0, "work"), (1500.0, "break"), (1800.0, "work"), (3300.0, "break"),
+        (3600.0, "work"), (5100.0, "break"), (5400.0, "work"),
+    ]
+    assert simulator.events("lap") == [1, 2, 3, 4]
+    assert simulator.events("done") == [4]
+    assert done_at(simulator) == 6900.0
+
+    stages = simulator.events("stage")
+    assert stages == sorted(stages) and stages[-1] == simulator.fsm.total_stages - 1
+
+    (session,) = simulator.events("save")
+    assert session["op"] == "session"
+    assert session["laps"] == 4 and session["planned_hours"] == 2
+    assert session["end"] - session["start"] == 6900.0
+
+
+@pytest.mark.parametrize("hours", [1, 3.5, 10])
+def test_every_planned_lap_runs_and_the_session_is_saved(hours):
+    simulator = simulate(hours)
+    assert simulator.done
+    assert simulator.events("lap") == list(range(1, simulator.pomodoro.total_laps + 1))
+    assert len(simulator.events("save")) == 1
+    # Ends with the last work block, within the planned time
+    assert done_at(simulator) <= simulator.pomodoro.schedule.block_start(len(simulator.pomodoro.blocks))
+
+
+def test_runs_are_deterministic():
+    assert simulate(3).trace == simulate(3).trace
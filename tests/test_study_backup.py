@@ -0,0 +1,119 @@
+import json
+import os
+from datetime import date, timedelta
+
+from core.study_backup import StudyBackup
+
+
+def day(n):
+    return (date(2020, 1, 1) + timedelta(days=n)).isoformat()
+
+
+def test_bytes_per_backup_stay_flat_as_history_grows(tmp_path):
+    data = {"study_hours": {}, "tasks_completed": {}}
+    backup = StudyBackup(str(tmp_path / "backups"), min_interval=0, keep=None)
+    backup.start(lambda: {"study_hours": dict(data["study_hours"]),
+                          "tasks_completed": dict(data["tasks_completed"])})
+    backup.flush(timeout=10)  # the (empty) base
+
+    per_backup = []
+    for n in range(2000):
+        data["study_hours"][day(n)] = 1.5
+        backup.record({"op": "hours", "date": day(n), "hours": 1.5})
+        before = backup.bytes_written
+        assert backup.flush(timeout=10)
+        per_backup.append(backup.bytes_written - before)
+
+    # A full copy would grow ~2000x; a delta costs the same at any size
+    early = sum(per_backup[:100]) / 100
+    late = sum(per_backup[-100:]) / 100
+    assert late < early * 1.2
+    assert backup.restore()["study_hours"] == data["study_hours"]
+
+
+def test_changes_lost_in_a_crash_are_caught_up_on_start(tmp_path):
+    directory = str(tmp_path / "backups")
+    data = {"study_hours": {day(0): 1.0}, "tasks_completed": {}}
+
+    backup = StudyBackup(directory, min_interval=3600)
+    backup.start(lambda: json.loads(json.dumps(data)))
+    backup.flush(timeout=10)
+    # Recorded, but still waiting out the throttle when the app dies
+    data["study_hours"][day(1)] = 2.0
+    data["tasks_completed"]["task-1"] = True
+    backup.record({"op": "hours", "date": day(1), "hours": 2.0})
+    backup.record({"op": "task", "id": "task-1"})
+
+    restarted = StudyBackup(directory, min_interval=3600)
+    restarted.start(lambda: json.loads(json.dumps(data)))
+    assert restarted.flush(timeout=10)
+
+    restored = restarted.restore()
+    assert restored["study_hours"] == data["study_hours"]
+    assert restored["tasks_completed"] == {"task-1": True}
+
+
+def test_clean_restart_does_not_read_the_chunks(tmp_path):
+    directory = str(tmp_path / "backups")
+    data = {"study_hours": {day(n): n % 3 for n in range(500)}, "tasks_completed": {"a": True}}
+
+    backup = StudyBackup(directory, min_interval=0)
+    backup.start(lambda: json.loads(json.dumps(data)))
+    backup.flush(timeout=10)
+    for n in range(500, 520):
+        data["study_hours"][day(n)] = 2.5
+        backup.record({"op": "hours", "date": day(n), "hours": 2.5})
+        backup.flush(timeout=10)
+
+    restarted = StudyBackup(directory, min_interval=0)
+    restarted.start(lambda: json.loads(json.dumps(data)))
+    assert restarted.flush(timeout=10)
+    # The digests match: nothing to catch up, no chunk was replayed
+    assert restarted.restores == 0
+    assert restarted.backups == 0
+    assert restarted.restore()["study_hours"] == {d: float(h) for d, h in data["study_hours"].items()}
+
+
+def test_old_restore_points_are_pruned_automatically(tmp_path):
+    directory = tmp_path / "backups"
+    data = {"study_hours": {}, "tasks_completed": {}}
+    backup = StudyBackup(str(directory), min_interval=0, keep=5)
+    backup.start(lambda: json.loads(json.dumps(data)))
+    backup.flush(timeout=10)
+
+    for n in range(40):
+        data["study_hours"][day(n)] = float(n)
+        backup.record({"op": "hours", "date": day(n), "hours": float(n)})
+        assert backup.flush(timeout=10)
+        assert len(backup.entries()) <= 2 * 5 + 1
+
+    assert backup.prunes > 0
+    assert backup.restore()["study_hours"] == data["study_hours"]
+    chunks = [name for _, _, names in os.walk(directory / "chunks") for name in names]
+    assert len(chunks) == len(backup.entries())
+
+    # The new base keeps its digest, so a restart still skips the replay
+    restarted = StudyBackup(str(directory), min_interval=0, keep=5)
+    restarted.start(lambda: json.loads(json.dumps(data)))
+    assert restarted.flush(timeout=10)
+    assert restarted.restores == 0
+
+
+def test_base_backup_includes_archived_months(workdir):
+    from core.study_archive import RetentionPolicy, StudyArchive
+    from core.study_data import DATA_FILE, StudyData
+
+    old_day = (date.today() - timedelta(days=400)).isoformat()
+    recent_day = date.today().isoformat()
+    with open(DATA_FILE, "w") as f:
+        json.dump({"study_hours": {old_day: 3.0, recent_day: 1.0},
+                   "tasks_completed": {}, "total_hours": 4.0}, f)
+
+    backup = StudyBackup(str(workdir / "backups"), min_interval=0)
+    study_data = StudyData(retention=RetentionPolicy(hot_days=30),
+                           archive=StudyArchive(str(workdir / "archive")),
+                           backup=backup)
+    assert old_day not in study_data.get_data()["study_hours"]
+    study_data.flush(timeout=10)
+
+    assert backup.restore()["study_hours"] == {old_day: 3.0, recent_day: 1.0}
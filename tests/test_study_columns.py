@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+from core.study_columns import StudyColumns, _Column
+from core.study_data import StudyData
+
+
+def columns(tmp_path):
+    return StudyColumns(str(tmp_path / "hours.col"), str(tmp_path / "tasks.col"))
+
+
+def test_columns_share_one_base(tmp_path):
+    cols = columns(tmp_path)
+    cols.add_completed_task(date(2024, 3, 10))
+    cols.set_hours("2024-03-12", 2.0)
+    # Older than anything stored: both columns are re-based together
+    cols.set_hours("2024-01-01", 1.0)
+    cols.add_completed_task(date(2024, 4, 1))
+
+    assert cols.hours.base == cols.tasks.base == date(2024, 1, 1).toordinal()
+    assert cols.hours.length == cols.tasks.length
+    hours = cols.hours_view(date(2024, 1, 1), date(2024, 4, 1))
+    tasks = cols.tasks_view(date(2024, 1, 1), date(2024, 4, 1))
+    assert len(hours) == len(tasks) == 92
+    # Same index, same day
+    day = lambda i: date(2024, 1, 1) + timedelta(days=i)
+    assert [day(i) for i, h in enumerate(hours) if h] == [date(2024, 1, 1), date(2024, 3, 12)]
+    assert [day(i) for i, n in enumerate(tasks) if n] == [date(2024, 3, 10), date(2024, 4, 1)]
+    cols.close()
+
+
+def test_misaligned_files_are_aligned_on_open(tmp_path):
+    hours = _Column(str(tmp_path / "hours.col"), "d")
+    hours.put(hours.ensure(date(2024, 5, 1).toordinal()), 3.0)
+    hours.close()
+    tasks = _Column(str(tmp_path / "tasks.col"), "i")
+    tasks.put(tasks.ensure(date(2024, 2, 1).toordinal()), 4)
+    tasks.close()
+
+    cols = columns(tmp_path)
+    assert cols.hours.base == cols.tasks.base == date(2024, 2, 1).toordinal()
+    assert cols.hours.length == cols.tasks.length
+    assert cols.total_hours(date(2024, 1, 1), date(2024, 12, 31)) == 3.0
+    assert sum(cols.tasks_view(date(2024, 2, 1), date(2024, 2, 1))) == 4
+    cols.close()
+
+
+def test_remote_task_completions_are_counted_once(workdir):
+    cols = columns(workdir)
+    study_data = StudyData(columns=cols, save_debounce=0)
+    study_data.complete_task("local")
+    study_data.complete_task("local")  # already done: not counted again
+    study_data.apply_remote([
+        {"op": "task", "id": "remote", "date": "2024-06-01"},
+        {"op": "task", "id": "seeded"},  # no known day: counted today
+        {"op": "task", "id": "local"},
+    ])
+
+    today = date.today()
+    assert sum(cols.tasks_view(date(2024, 6, 1), date(2024, 6, 1))) == 1
+    assert sum(cols.tasks_view(today, today)) == 2
+    everything = cols.tasks_view(date.min + timedelta(days=1), date.max)
+    assert sum(everything) == len(study_data.get_data()["tasks_completed"]) == 3
+    study_data.flush(timeout=5)
@@ -0,0 +1,50 @@
+import threading
+
+from kivy.clock import Clock
+
+from core.clock import VirtualClock
+from core.study_data import StudyData
+
+
+class FakeSync:
+    """Just enough of SyncClient for StudyData."""
+
+    def start(self, base_fn, on_remote):
+        self.on_remote = on_remote
+
+    def record(self, record):
+        pass
+
+    def current_records(self, won):
+        return [{"op": "hours", "date": key.partition("/")[2], "hours": entry[0]}
+                for key, entry in won.items()]
+
+    def stop(self):
+        pass
+
+
+def test_background_threads_hand_over_on_kivys_clock(workdir):
+    clock = VirtualClock()
+    sync = FakeSync()
+    study_data = StudyData(sync=sync, clock=clock)
+    queued = len(clock._queue)
+
+    threads = [
+        threading.Thread(target=sync.on_remote,
+                         args=({f"hours/2024-03-{n:02d}": [float(n), 1.0, "phone", n]},))
+        for n in range(1, 21)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Nothing went through the injected (UI-thread only) clock ...
+    assert len(clock._queue) == queued
+    # ... and every hand-over runs on the next kivy frame
+    Clock.tick()
+    hours = study_data.get_data()["study_hours"]
+    assert {day: hours[day] for day in hours} == {
+        f"2024-03-{n:02d}": float(n) for n in range(1, 21)
+    }
+    study_data.flush(timeout=5)
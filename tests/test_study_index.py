@@ -0,0 +1,67 @@
+import random
+from datetime import date, timedelta
+
+from core.study_index import StudyIndex
+
+START = date(2023, 1, 1)
+
+
+def brute_streaks(study_hours, first, last):
+    """(longest run, run ending at 'last') of studied days in [first, last]."""
+    best = run = 0
+    day = first
+    while day <= last:
+        run = run + 1 if study_hours.get(day.isoformat(), 0) > 0 else 0
+        best = max(best, run)
+        day += timedelta(days=1)
+    return best, run
+
+
+def test_index_matches_brute_force_under_random_updates():
+    rng = random.Random(5)
+    index = StudyIndex()
+    study_hours = {}
+
+    for step in range(600):
+        # Mostly within a year, sometimes far outside to force regrowth
+        offset = rng.randrange(365) if rng.random() < 0.95 else rng.randrange(-400, 800)
+        day = (START + timedelta(days=offset)).isoformat()
+        hours = rng.choice([0.0, 0.0, 0.5, 1.0, 2.5])
+        study_hours[day] = hours
+        index.set(day, hours)
+
+        if step % 10:
+            continue
+        assert abs(index.total() - sum(study_hours.values())) < 1e-9
+        for _ in range(20):
+            a = START + timedelta(days=rng.randrange(-450, 850))
+            b = a + timedelta(days=rng.randrange(0, 120))
+            expected = sum(h for d, h in study_hours.items() if a.isoformat() <= d <= b.isoformat())
+            assert abs(index.range_total(a, b) - expected) < 1e-9
+
+        days = sorted(study_hours)
+        first, last = date.fromisoformat(days[0]), date.fromisoformat(days[-1])
+        assert index.longest_streak() == brute_streaks(study_hours, first, last)[0]
+
+        today = START + timedelta(days=rng.randrange(0, 365))
+        streak = brute_streaks(study_hours, first, today)[1]
+        if streak == 0:
+            streak = brute_streaks(study_hours, first, today - timedelta(days=1))[1]
+        assert index.current_streak(today) == streak
+
+
+def test_rebuild_matches_incremental_updates():
+    rng = random.Random(7)
+    study_hours = {
+        (START + timedelta(days=rng.randrange(1000))).isoformat(): rng.choice([0.0, 1.0, 3.0])
+        for _ in range(300)
+    }
+    incremental = StudyIndex()
+    for day, hours in study_hours.items():
+        incremental.set(day, hours)
+    rebuilt = StudyIndex()
+    rebuilt.rebuild(study_hours)
+
+    end = START + timedelta(days=1000)
+    assert rebuilt.summary(START.toordinal(), end.toordinal()) == \
+        incremental.summary(START.toordinal(), end.toordinal())
@@ -0,0 +1,56 @@
+import os
+
+from core.study_journal import StudyJournal
+
+
+def hours(n):
+    return {"op": "hours", "date": f"2024-01-{n:02d}", "hours": float(n)}
+
+
+def replayed(journal):
+    records = []
+    journal.replay(records.append)
+    return records
+
+
+def test_journal_truncated_mid_record_replays_what_is_whole(tmp_path):
+    path = str(tmp_path / "data.journal")
+    journal = StudyJournal(path, str(tmp_path / "data.json"))
+    for n in (1, 2, 3):
+        journal.append(hours(n))
+    journal.close()
+
+    # Crash in the middle of writing the third line
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        f.truncate(size - 12)
+
+    journal = StudyJournal(path, str(tmp_path / "data.json"))
+    assert replayed(journal) == [hours(1), hours(2)]
+
+    # Appending after the torn line must not corrupt the new record
+    journal.append(hours(4))
+    journal.close()
+    assert replayed(StudyJournal(path, str(tmp_path / "data.json"))) == [
+        hours(1), hours(2), hours(4)
+    ]
+
+
+def test_rotate_keeps_records_parked_by_an_interrupted_compaction(tmp_path):
+    path = str(tmp_path / "data.journal")
+    journal = StudyJournal(path, str(tmp_path / "data.json"))
+    journal.append(hours(1))
+    journal.rotate()
+    journal.append(hours(2))
+    journal.close()
+    # ... and the app died before the snapshot was written
+
+    journal = StudyJournal(path, str(tmp_path / "data.json"))
+    assert replayed(journal) == [hours(1), hours(2)]
+    journal.append(hours(3))
+    journal.rotate()
+    assert not os.path.exists(path)
+    assert replayed(journal) == [hours(1), hours(2), hours(3)]
+
+    journal.drop_rotated()
+    assert replayed(journal) == []
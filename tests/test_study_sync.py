@@ -0,0 +1,123 @@
+import os
+import threading
+from datetime import date
+
+import pytest
+
+from core.study_sync import SyncClient, SyncState
+from core.sync_server import SyncServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = SyncServer(("127.0.0.1", 0), str(tmp_path / "server.json"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def client(tmp_path, name, url):
+    return SyncClient(url, state=SyncState(str(tmp_path / f"{name}.json"), replica=name))
+
+
+def test_local_edit_after_sync_beats_the_pulled_value(tmp_path, server):
+    phone = client(tmp_path, "phone", server)
+    laptop = client(tmp_path, "laptop", server)
+
+    phone.record({"op": "hours", "date": "2024-05-01", "hours": 1.0})
+    phone.record({"op": "task", "id": "task-1"})
+    phone.sync_once()
+
+    # Pulled on the sync thread ...
+    won = laptop.sync_once()
+    assert set(won) == {"hours/2024-05-01", "task/task-1"}
+    # ... but the user edits the same day before the UI thread applies it
+    laptop.record({"op": "hours", "date": "2024-05-01", "hours": 3.0})
+
+    records = laptop.current_records(won)
+    assert [(r["op"], r["id"]) for r in records] == [("task", "task-1")]
+    # Carries the day it was completed on the phone
+    assert records[0]["date"] == date.fromtimestamp(phone.state.entries["task/task-1"][1]).isoformat()
+
+    # And the local edit is what both devices end up with
+    laptop.sync_once()
+    assert phone.current_records(phone.sync_once()) == [
+        {"op": "hours", "date": "2024-05-01", "hours": 3.0}
+    ]
+
+
+def test_concurrent_saves_leave_a_valid_state(tmp_path):
+    path = str(tmp_path / "sync.json")
+    state = SyncState(path, replica="me", compact_every=5)
+    errors = []
+
+    def save_many(worker):
+        try:
+            for n in range(50):
+                state.local(f"hours/day-{worker}-{n}", n)
+                state.save()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save_many, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert state.snapshots > 0
+    reloaded = SyncState(path)
+    assert len(reloaded.entries) == 200
+    assert reloaded.entries == state.entries
+
+
+def test_idle_syncs_write_nothing(tmp_path, server):
+    phone = client(tmp_path, "phone", server)
+    for n in range(50):
+        phone.record({"op": "hours", "date": f"2024-05-{n % 28 + 1:02d}", "hours": float(n)})
+    phone.sync_once()
+    phone.sync_once()  # takes over the server's vector
+    appends, snapshots = phone.state.appends, phone.state.snapshots
+
+    for _ in range(5):
+        assert phone.sync_once() == {}
+    assert (phone.state.appends, phone.state.snapshots) == (appends, snapshots)
+
+    # A change costs one log line with just that entry, not the history
+    phone.record({"op": "task", "id": "task-1"})
+    size = os.path.getsize(phone.state.log_path)
+    phone.state.save()
+    assert phone.state.appends == appends + 1
+    assert os.path.getsize(phone.state.log_path) - size < 300
+
+
+def test_snapshot_and_log_reload_to_the_same_state(tmp_path):
+    path = str(tmp_path / "sync.json")
+    state = SyncState(path, replica="me", compact_every=3)
+    for n in range(20):
+        state.local(f"hours/day-{n % 7}", n)
+        state.merge({f"task/other-{n}": [True, float(n), "other", n + 1]})
+        state.save()
+    state.set_peer_vector({"me": 5})
+    state.save()
+    assert state.snapshots > 0 and state.appends > 0
+
+    # A crash mid-append leaves a torn last line
+    with open(state.log_path, "a") as f:
+        f.write('{"entries": {"hours/day-0": [99')
+
+    reloaded = SyncState(path, compact_every=3)
+    assert reloaded.replica == "me"
+    assert reloaded.entries == state.entries
+    assert reloaded.vector == state.vector
+    assert reloaded.counter == state.counter
+    assert reloaded.peer_vector == {"me": 5}
+
+    # The next save starts over from a clean snapshot
+    reloaded.local("hours/day-0", 1.5)
+    reloaded.save()
+    assert not os.path.exists(reloaded.log_path)
+    assert SyncState(path).entries == reloaded.entries
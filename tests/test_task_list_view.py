@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from conftest import pump
+
+
+def check_rows(manager):
+    """Every row on screen shows the task at its index, in its place."""
+    view = manager.list_view
+    layout = view.layout_manager
+    assert [entry["task"] for entry in view.data] == manager.ordered
+
+    visible = view.view_adapter.views
+    assert set(layout.children) == set(visible.values())
+    row_height = layout.default_size[1]
+    for index, row in visible.items():
+        task = manager.ordered[index]
+        assert row.task is task
+        assert row.text.startswith(task.title + " ")
+        assert row.text.endswith("[DONE]") == task.completed
+        assert row.y == layout.top - (index + 1) * row_height
+
+    # No gaps: as many rows as fit (plus partly shown ones), in one run
+    if manager.ordered:
+        fit = min(len(manager.ordered), int(view.height // row_height))
+        indices = sorted(visible)
+        assert len(indices) >= fit
+        assert indices == list(range(indices[0], indices[-1] + 1))
+
+
+@pytest.mark.parametrize("row_layout", [True, False], ids=["row-layout", "fallback"])
+def test_rows_follow_random_task_changes(ui_app, monkeypatch, row_layout):
+    from kivy.core.window import Window
+    from core import task_list_view
+    from core.task import Task
+    from core.task_manager import TaskManager
+
+    monkeypatch.setattr(task_list_view, "use_row_layout", lambda: row_layout)
+    rng = random.Random(18)
+    manager = TaskManager(size_hint=(None, None), size=(400, 300))
+    Window.add_widget(manager)
+    pump()
+
+    priorities = [Task.PRIORITY_LOW, Task.PRIORITY_MEDIUM, Task.PRIORITY_HIGH]
+    for step in range(200):
+        roll = rng.random()
+        if roll < 0.5 or not manager.ordered:
+            manager.add_task(f"task {step}", rng.choice(priorities))
+        elif roll < 0.7:
+            manager.complete_task(rng.choice(manager.ordered))
+        elif roll < 0.9:
+            manager.delete_task(rng.choice(manager.ordered))
+        else:
+            manager.list_view.scroll_y = rng.random()
+        pump(1)
+        check_rows(manager)
+
+    manager.reset_all_tasks()
+    pump(2)
+    assert manager.list_view.data == []
+    assert manager.list_view.layout_manager.children == []
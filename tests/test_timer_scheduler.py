@@ -0,0 +1,146 @@
+import heapq
+import random
+import threading
+
+import pytest
+
+from core.clock import VirtualClock
+from core.timer_scheduler import TimerScheduler
+
+
+def make_scheduler():
+    clock = VirtualClock(start=0.0, wall_start=0.0)
+    return clock, TimerScheduler(clock)
+
+
+def test_timers_fire_in_deadline_order():
+    rng = random.Random(15)
+    clock, scheduler = make_scheduler()
+    fired = []
+    expected = []
+
+    def once(name):
+        return lambda dt: fired.append((round(clock.monotonic(), 3), name))
+
+    # Hundredths of a second, so no two deadlines share a wake-up
+    delays = rng.sample(range(1, 100000), 300)
+    for n, delay in enumerate(delays):
+        scheduler.schedule_once(once(f"once-{n}"), delay / 100)
+        expected.append((delay / 100, f"once-{n}"))
+
+    clock.advance(1000)
+    assert fired == sorted(expected)
+    assert scheduler.fired == 300
+    assert scheduler.pending() == 0
+
+
+def test_intervals_stay_on_their_grid_and_share_one_event():
+    clock, scheduler = make_scheduler()
+    fired = []
+    for name, interval in (("tick", 1.0), ("minute", 60.0), ("pomodoro", 1500.0)):
+        scheduler.schedule_interval(
+            lambda dt, name=name: fired.append((round(clock.monotonic(), 3), name)), interval)
+
+    clock.advance(3000)
+    assert [t for t, name in fired if name == "pomodoro"] == [1500.0, 3000.0]
+    assert [t for t, name in fired if name == "minute"] == [60.0 * n for n in range(1, 51)]
+    assert len([name for _, name in fired if name == "tick"]) == 3000
+    # Timers due together run in the same wake-up
+    assert sorted(fired[-3:]) == [(3000.0, "minute"), (3000.0, "pomodoro"), (3000.0, "tick")]
+    # One underlying clock event at a time, one wake-up per distinct deadline
+    assert len(clock._queue) == 1
+    assert scheduler.wakeups == 3000
+
+
+def test_cancel_and_returning_false_stop_timers():
+    clock, scheduler = make_scheduler()
+    fired = []
+    cancelled = scheduler.schedule_once(lambda dt: fired.append("cancelled"), 5)
+    scheduler.schedule_once(lambda dt: fired.append("kept"), 10)
+    runs = []
+
+    def three_times(dt):
+        runs.append(clock.monotonic())
+        return False if len(runs) == 3 else None
+
+    scheduler.schedule_interval(three_times, 2)
+    cancelled.cancel()
+
+    clock.advance(20)
+    assert fired == ["kept"]
+    assert runs == [2.0, 4.0, 6.0]
+    assert scheduler.pending() == 0
+
+
+class ThreadSafeVirtualClock(VirtualClock):
+    """
+    VirtualClock that other threads may schedule on while it runs. Like
+    kivy's Clock, the lock is not held while callbacks run.
+    """
+
+    def __init__(self):
+        super().__init__(start=0.0, wall_start=0.0)
+        self.lock = threading.Lock()
+
+    def _push(self, callback, delay, interval):
+        with self.lock:
+            return super()._push(callback, delay, interval)
+
+    def advance(self, seconds):
+        end = self.now + seconds
+        while True:
+            with self.lock:
+                if not self._queue or self._queue[0][0] > end:
+                    break
+                due, _, event = heapq.heappop(self._queue)
+            if event.cancelled:
+                continue
+            self.now = due
+            event.callback(due - event.last)
+        self.now = end
+
+
+def test_timers_added_from_other_threads_are_never_lost():
+    clock = ThreadSafeVirtualClock()
+    scheduler = TimerScheduler(clock)
+    fired = []
+    count = 100000
+
+    def add_from_thread():
+        for n in range(count):
+            scheduler.schedule_once(lambda dt, n=n: fired.append(n), 0.01)
+
+    thread = threading.Thread(target=add_from_thread)
+    thread.start()
+    # Meanwhile the UI thread keeps cancelling timers of its own, so the
+    # (long) heap gets compacted over and over
+    while thread.is_alive():
+        for timer in [scheduler.schedule_once(lambda dt: None, 100) for _ in range(2000)]:
+            timer.cancel()
+        clock.advance(0.01)
+    thread.join()
+    clock.advance(1)
+
+    assert sorted(fired) == list(range(count))
+    assert scheduler.pending() == 0
+
+
+def test_callback_errors_propagate_and_the_rest_still_run():
+    clock, scheduler = make_scheduler()
+    fired = []
+
+    def broken(dt):
+        raise ValueError("broken timer")
+
+    scheduler.schedule_once(lambda dt: fired.append("before"), 1)
+    scheduler.schedule_once(broken, 1)
+    scheduler.schedule_once(lambda dt: fired.append("same wake-up"), 1)
+    scheduler.schedule_once(lambda dt: fired.append("later"), 2)
+
+    with pytest.raises(ValueError):
+        clock.advance(1.5)
+    assert fired == ["before"]
+
+    clock.advance(1)
+    assert fired == ["before", "same wake-up", "later"]
+    assert scheduler.pending() == 0
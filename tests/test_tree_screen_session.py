@@ -0,0 +1,59 @@
+from datetime import date
+
+from conftest import build_screens, pump
+
+
+def test_study_then_tree_screen_records_session(ui_app, workdir):
+    from core.sqlite_storage import SqliteStorage
+    from core.study_data import StudyData
+
+    storage = SqliteStorage(str(workdir / "study.db"))
+    study_data = StudyData(storage=storage)
+    sm = build_screens(study_data)
+    study_screen = sm.get_screen("study_screen")
+    tree_screen = sm.get_screen("tree_screen")
+
+    # The user enters today's hours, then the app moves to the tree
+    study_screen.input_field.text = "1"
+    study_screen.on_submit(None)
+    study_screen.switch_to_tree_screen()
+    pump()
+
+    pomo = tree_screen.pomodoro_card.pomo_widget
+    assert pomo.timer_running
+    assert tree_screen.session_start is not None
+
+    # Run the session to its end: the completion popup records it
+    pomo.seek(10 * 3600)
+    pump()
+
+    sessions = storage.sessions_for_day(date.today().isoformat())
+    assert len(sessions) == 1
+    assert sessions[0]["planned_hours"] == 1
+    assert tree_screen.checkpoint.load() is None
+
+
+def test_new_hours_record_the_running_session(ui_app, workdir):
+    from core.sqlite_storage import SqliteStorage
+    from core.study_data import StudyData
+
+    storage = SqliteStorage(str(workdir / "study.db"))
+    study_data = StudyData(storage=storage)
+    sm = build_screens(study_data)
+    tree_screen = sm.get_screen("tree_screen")
+    today = date.today().isoformat()
+
+    study_data.set_study_hours(today, 1)
+    sm.current = "tree_screen"
+    pump()
+    first_start = tree_screen.session_start
+
+    # Changing the plan replaces the running session; the old one is kept
+    study_data.set_study_hours(today, 2)
+    pump()
+
+    sessions = storage.sessions_for_day(today)
+    assert [s["planned_hours"] for s in sessions] == [1]
+    assert sessions[0]["start"] == first_start
+    assert tree_screen.session_start is not None
+    assert tree_screen.pomodoro_card.pomo_widget.timer_running